@@ -0,0 +1,81 @@
+"""Reading the metadata files within tar and zip archives, without extracting them to disk.
+
+Members are read one at a time, in the order they are stored, so compressed tar archives are decompressed in a single
+sequential pass. Each member is identified by the archive's path and its name within it, as "archive!member".
+"""
+
+import tarfile
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple
+
+# Separates an archive's path from the name of a member within it
+MEMBER_SEPARATOR = "!"
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ZIP_SUFFIXES = (".zip",)
+
+
+class ArchiveMember(NamedTuple):
+    """A file within an archive, read into memory, that can be validated in place of a file on disk."""
+
+    archive: Path
+    name: str
+    content: bytes
+
+    def __str__(self) -> str:
+        """Path of the member, as archive!member."""
+        return f"{self.archive}{MEMBER_SEPARATOR}{self.name}"
+
+    def read_bytes(self) -> bytes:
+        """Gets the content of the member, in the same way as Path.read_bytes."""
+        return self.content
+
+
+# A file to validate, either on disk or within an archive
+InputFile = Path | ArchiveMember
+
+
+def is_archive(path: Path) -> bool:
+    """Whether a file is a tar or zip archive, going by its name."""
+    return path.name.lower().endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+def _iter_tar_members(path: Path, pattern: str) -> Iterator[ArchiveMember]:
+    # Read as a stream, as seeking back and forth within a compressed archive means decompressing it repeatedly
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and PurePosixPath(member.name).match(pattern):
+                content = archive.extractfile(member)
+                if content is not None:
+                    yield ArchiveMember(path, member.name, content.read())
+
+
+def _iter_zip_members(path: Path, pattern: str) -> Iterator[ArchiveMember]:
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.infolist():
+            if not member.is_dir() and PurePosixPath(member.filename).match(pattern):
+                yield ArchiveMember(path, member.filename, archive.read(member))
+
+
+def iter_archive_members(path: Path, pattern: str = "*.json") -> Iterator[ArchiveMember]:
+    """Lazily read the members of an archive that match a pattern, in the order they are stored.
+
+    Args:
+        path (Path): Path of a tar archive, optionally compressed, or a zip archive.
+        pattern (str, optional): Filename pattern of the members to read. Defaults to "*.json".
+
+    Raises:
+        ValueError: Raised if the file isn't a known type of archive.
+        tarfile.TarError | zipfile.BadZipFile: Raised if the archive can't be read.
+
+    Yields:
+        ArchiveMember: Each matching member, with its content.
+    """
+    name = path.name.lower()
+    if name.endswith(TAR_SUFFIXES):
+        yield from _iter_tar_members(path, pattern)
+    elif name.endswith(ZIP_SUFFIXES):
+        yield from _iter_zip_members(path, pattern)
+    else:
+        raise ValueError(f"Unknown type of archive: {path}")
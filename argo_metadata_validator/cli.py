@@ -1,47 +1,444 @@
 """CLI entry point for argo-metadata-validator package."""
 
+import io
 import json
+from collections.abc import Iterable
+from contextlib import ExitStack, suppress
+from datetime import timedelta
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
 
 import click
 
-from argo_metadata_validator.models.results import ValidationError
-from argo_metadata_validator.validation import ArgoValidator
+from argo_metadata_validator.constants import (
+    BATCHED_FETCH,
+    DEFAULT_SNAPSHOT_TTL,
+    FETCH_MODES,
+    JSONSCHEMA_ENGINE,
+    SCHEMA_ENGINES,
+)
+from argo_metadata_validator.file_discovery import iter_input_files, iter_manifest
+from argo_metadata_validator.writers import JSON_FORMAT, RESULTS_WRITERS, JsonResultsWriter, open_results_file
 
+# Validation, and its dependencies, are only imported by the commands that need them, so that --help and the
+# other commands start quickly
+if TYPE_CHECKING:
+    from argo_metadata_validator.consistency import ConsistencyIndex
+    from argo_metadata_validator.models.results import ValidationError
+    from argo_metadata_validator.result_store import ResultStore
 
-def output_to_terminal(errors: dict[str, list[ValidationError]]):
+# Number of the most frequent error signatures listed in the terminal by --summary
+SUMMARY_TERMINAL_TOP = 10
+
+
+class DefaultCommandGroup(click.Group):
+    """Command group that runs a default command when the first argument isn't a known sub-command.
+
+    Keeps `argo-validate FILES` working alongside sub-commands such as `argo-validate update-vocabs`.
+    """
+
+    def __init__(self, *args, default_command: str, **kwargs):
+        """Set the name of the command to fall back to."""
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        """Insert the default command name if no sub-command was given."""
+        if not args or (args[0] not in self.commands and args[0] not in self.get_help_option_names(ctx)):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+def output_file_to_terminal(file: str, file_errors: "list[ValidationError]"):
+    """Output the validation errors of a single file to the terminal."""
+    if file_errors:
+        click.echo(click.style(f"{file} has {len(file_errors)} errors", fg="red"))
+    else:
+        click.echo(click.style(f"{file} has no errors", fg="green"))
+    click.echo("-----")
+    for err in file_errors:
+        click.echo(click.style(f"{err.message} at path {err.path}", fg="red"))
+
+
+def output_to_terminal(errors: "dict[str, list[ValidationError]]"):
     """Convert validation errors to terminal output."""
     for file, file_errors in errors.items():
-        if file_errors:
-            click.echo(click.style(f"{file} has {len(file_errors)} errors", fg="red"))
-        else:
-            click.echo(click.style(f"{file} has no errors", fg="green"))
-        click.echo("-----")
-        for err in file_errors:
-            click.echo(click.style(f"{err.message} at path {err.path}", fg="red"))
+        output_file_to_terminal(file, file_errors)
 
 
-def output_to_json_string(errors: dict[str, list[ValidationError]]) -> str:
+def output_to_json_string(errors: "dict[str, list[ValidationError]]") -> str:
     """Convert validation errors to a JSON-string output."""
-    serialised = {}
+    stream = io.StringIO()
+    writer = JsonResultsWriter(stream)
     for file, file_errors in errors.items():
-        serialised[file] = {"is_valid": len(file_errors) == 0, "errors": [x.model_dump() for x in file_errors]}
-    return json.dumps(serialised, indent=2)
+        writer.write(file, file_errors)
+    writer.close()
+    return stream.getvalue()
 
 
-@click.command()
-@click.argument("files")
-@click.option("--quiet", "-q", "quiet_mode", is_flag=True, help="Suppresses terminal output")
-@click.option("--output-file", "-f", help="Path to output JSON file of results")
-def main(files: str, quiet_mode: bool = False, output_file: str = ""):
-    """Main entrypoint when running as CLI.
+def output_results(
+    results: "Iterable[tuple[str, list[ValidationError]]]",
+    quiet_mode: bool = False,
+    output_file: str = "",
+    store: "ResultStore | None" = None,
+    output_format: str = JSON_FORMAT,
+) -> bool:
+    """Output validation results as each file is validated, rather than all at the end.
+
+    Args:
+        results (Iterable[tuple[str, list[ValidationError]]]): File paths and their errors.
+        quiet_mode (bool, optional): Don't output to the terminal. Defaults to False.
+        output_file (str, optional): Path to output file of results, compressed if it ends in .gz. Defaults to "",
+            not writing one.
+        store (ResultStore | None, optional): Store to also add the results to, e.g. for output_error_summary.
+            Defaults to None.
+        output_format (str, optional): Format of the output file, one of RESULTS_WRITERS. Defaults to JSON_FORMAT.
 
-    FILES is a comma-separated list of the JSON files to validate.
+    Returns:
+        bool: Whether any file had errors.
     """
-    file_paths = files.split(",")
-    errors = ArgoValidator().validate(file_paths)
+    is_any_invalid = False
+    with ExitStack() as stack:
+        writer_cls = RESULTS_WRITERS[output_format]
+        writer = writer_cls(stack.enter_context(open_results_file(output_file))) if output_file else None
+        for file, file_errors in store.tee(results) if store is not None else results:
+            is_any_invalid = is_any_invalid or bool(file_errors)
+            if not quiet_mode:
+                output_file_to_terminal(file, file_errors)
+            if writer:
+                writer.write(file, file_errors)
+        if writer:
+            writer.close()
+    return is_any_invalid
+
 
+def output_consistency_conflicts(
+    consistency: "ConsistencyIndex", quiet_mode: bool = False, output_file: str = "", output_format: str = JSON_FORMAT
+):
+    """Output the conflicts between files found by the consistency checks, once every file has been validated."""
+    conflicts = consistency.conflicts()
     if not quiet_mode:
-        output_to_terminal(errors)
-    if output_file:
-        with open(output_file, "w") as file:
-            file.write(output_to_json_string(errors))
+        click.echo(f"Cross-file consistency: {len(conflicts)} of {len(consistency.records)} files have conflicts")
+    output_results(conflicts.items(), quiet_mode, output_file, output_format=output_format)
+
+
+def _get_result_store(summary_file: str) -> "ResultStore | None":
+    """Gets a store to aggregate the results in, if a summary of them is to be output."""
+    if not summary_file:
+        return None
+    from argo_metadata_validator.result_store import ResultStore
+
+    return ResultStore()
+
+
+def output_error_summary(store: "ResultStore", quiet_mode: bool = False, summary_file: str = ""):
+    """Output the errors of a batch aggregated by signature, most frequent first, along with a few example files."""
+    signatures = store.summarise()
+    if not quiet_mode:
+        click.echo(
+            f"Summary: {store.invalid_count} of {len(store)} files have errors, {store.error_count} errors with "
+            f"{len(signatures)} distinct signatures"
+        )
+        for summary in signatures[:SUMMARY_TERMINAL_TOP]:
+            click.echo(f"{summary.count} x {summary.message} at path {summary.path} in {summary.file_count} files")
+    if summary_file:
+        content = {
+            "files": len(store),
+            "invalid_files": store.invalid_count,
+            "errors": store.error_count,
+            "signatures": [x._asdict() for x in signatures],
+        }
+        Path(summary_file).write_text(json.dumps(content, indent=2))
+
+
+def validate_on_server(
+    server: str,
+    files: Iterable[Path],
+    quiet_mode: bool = False,
+    output_file: str = "",
+    fail_fast: bool = False,
+    max_errors: int | None = None,
+    summary_file: str = "",
+    output_format: str = JSON_FORMAT,
+):
+    """Validate files with a running validation server, outputting the results as for local validation."""
+    from argo_metadata_validator.server import validate_with_server
+
+    results = validate_with_server(server, files, 1 if fail_fast else max_errors, fail_fast)
+    store = _get_result_store(summary_file)
+    is_any_invalid = output_results(results, quiet_mode, output_file, store, output_format)
+    if store is not None:
+        output_error_summary(store, quiet_mode, summary_file)
+    if is_any_invalid and fail_fast:
+        raise SystemExit(1)
+
+
+def _default_snapshot_path() -> Path:
+    from argo_metadata_validator.vocab_snapshot import default_snapshot_path
+
+    return default_snapshot_path()
+
+
+vocab_snapshot_option = click.option(
+    "--vocab-snapshot",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=_default_snapshot_path,
+    show_default="$ARGO_VOCAB_SNAPSHOT or user cache directory",
+    help="Local snapshot file of the NVS vocab terms",
+)
+vocab_fetch_mode_option = click.option(
+    "--vocab-fetch-mode",
+    type=click.Choice(FETCH_MODES),
+    default=BATCHED_FETCH,
+    show_default=True,
+    help="Fetch NVS vocabs in a single query (batched) or one query per vocab in parallel (concurrent)",
+)
+schema_engine_option = click.option(
+    "--schema-engine",
+    type=click.Choice(SCHEMA_ENGINES),
+    default=JSONSCHEMA_ENGINE,
+    show_default=True,
+    help="Apply the JSON schemas with jsonschema, or with validators compiled from them, which are faster",
+)
+
+
+@click.group(cls=DefaultCommandGroup, default_command="validate")
+def main():
+    """Validate ARGO metadata JSON files.
+
+    Runs the validate command unless another command is given.
+    """
+
+
+def _check_validate_usage(
+    has_inputs: bool,
+    profile_file: Path | None,
+    profile_extras: bool,
+    local_only: bool,
+    server: str | None,
+):
+    """Check the combination of options given to validate."""
+    if not has_inputs:
+        raise click.UsageError("Provide FILES to validate and/or a --manifest")
+    if profile_extras and profile_file is None:
+        raise click.UsageError("--profile-cprofile and --profile-memory require --profile")
+    if server is not None and local_only:
+        raise click.UsageError("--result-cache, --profile, --cross-file and --stream can't be used with --server")
+
+
+@main.command()
+@click.argument("files", nargs=-1)
+@click.option(
+    "--manifest",
+    "-m",
+    type=click.File("r"),
+    help="File listing paths, directories or globs to validate, one per line. Use - to read from stdin",
+)
+@click.option("--quiet", "-q", "quiet_mode", is_flag=True, help="Suppresses terminal output")
+@click.option("--output-file", "-f", help="Path to output file of results, compressed if it ends in .gz")
+@click.option(
+    "--output-format",
+    type=click.Choice(list(RESULTS_WRITERS)),
+    default=JSON_FORMAT,
+    show_default=True,
+    help="Format of --output-file and --cross-file, each file's results being written as soon as it is validated",
+)
+@vocab_snapshot_option
+@click.option(
+    "--vocab-ttl",
+    type=float,
+    default=DEFAULT_SNAPSHOT_TTL.total_seconds() / 3600,
+    show_default=True,
+    help="Hours before the vocab snapshot is refreshed from NVS",
+)
+@click.option("--offline", is_flag=True, help="Only use the local vocab snapshot, never contact NVS")
+@vocab_fetch_mode_option
+@schema_engine_option
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of processes, 0 for all cores",
+)
+@click.option("--fail-fast", is_flag=True, help="Stop at the first error, exiting with status 1 if any file is invalid")
+@click.option("--max-errors", type=click.IntRange(min=1), help="Maximum number of errors to report per file")
+@click.option(
+    "--result-cache",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="SQLite file of earlier results, files unchanged since they were last validated aren't checked again",
+)
+@click.option(
+    "--profile",
+    "profile_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Path to output JSON of the time taken by each stage and file",
+)
+@click.option("--profile-top", type=click.IntRange(min=0), default=20, show_default=True, help="Slowest files to list")
+@click.option("--profile-cprofile", is_flag=True, help="Include a cProfile of the run in the --profile output")
+@click.option("--profile-memory", is_flag=True, help="Include traced memory allocations in the --profile output")
+@click.option(
+    "--cross-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Check consistency across the files, e.g. duplicate serial numbers, writing conflicts to this file in the "
+    "--output-format",
+)
+@click.option(
+    "--summary",
+    "summary_file",
+    type=click.Path(dir_okay=False),
+    help="Path to output JSON of the errors aggregated by signature, with counts and example files",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Parse each file incrementally, checking SENSORS and PARAMETERS one element at a time to bound memory use",
+)
+@click.option("--server", help="URL of a running 'argo-validate serve' to validate with, instead of in this process")
+def validate(
+    files: tuple[str, ...],
+    manifest: TextIO | None = None,
+    quiet_mode: bool = False,
+    output_file: str = "",
+    output_format: str = JSON_FORMAT,
+    vocab_snapshot: Path | None = None,
+    vocab_ttl: float = 24,
+    offline: bool = False,
+    vocab_fetch_mode: str = BATCHED_FETCH,
+    schema_engine: str = JSONSCHEMA_ENGINE,
+    jobs: int = 1,
+    fail_fast: bool = False,
+    max_errors: int | None = None,
+    result_cache: Path | None = None,
+    profile_file: Path | None = None,
+    profile_top: int = 20,
+    profile_cprofile: bool = False,
+    profile_memory: bool = False,
+    cross_file: Path | None = None,
+    summary_file: str | None = None,
+    stream: bool = False,
+    server: str | None = None,
+):
+    """Validate metadata files.
+
+    FILES are the JSON files to validate, either as separate arguments or comma-separated. Directories are searched
+    recursively for *.json files, and globs such as "data/**/*.json" are expanded. Tar and zip archives are read without
+    extracting them, validating their *.json members. Results are keyed by file path, or by archive!member.
+    """
+    _check_validate_usage(
+        bool(files) or manifest is not None,
+        profile_file,
+        profile_cprofile or profile_memory,
+        stream or any(x is not None for x in [result_cache, profile_file, cross_file]),
+        server,
+    )
+    # Files are found lazily, so validation starts straight away even for a whole archive
+    inputs = chain((x for arg in files for x in arg.split(",")), iter_manifest(manifest) if manifest else [])
+    file_paths = iter_input_files(inputs)
+    if server is not None:
+        validate_on_server(
+            server, file_paths, quiet_mode, output_file, fail_fast, max_errors, summary_file or "", output_format
+        )
+        return
+
+    from argo_metadata_validator.consistency import ConsistencyIndex
+    from argo_metadata_validator.profiling import ValidationProfiler
+    from argo_metadata_validator.result_cache import ResultCache
+    from argo_metadata_validator.validation import ArgoValidator
+
+    cache = ResultCache(result_cache) if result_cache is not None else None
+    consistency = ConsistencyIndex() if cross_file is not None else None
+    profiler = (
+        ValidationProfiler(top_n=profile_top, cprofile=profile_cprofile, trace_memory=profile_memory)
+        if profile_file is not None
+        else None
+    )
+    validator = ArgoValidator(
+        vocab_snapshot=vocab_snapshot,
+        vocab_ttl=timedelta(hours=vocab_ttl),
+        offline=offline,
+        vocab_fetch_mode=vocab_fetch_mode,
+        max_errors=1 if fail_fast else max_errors,
+        result_cache=cache,
+        hooks=[profiler] if profiler else [],
+        schema_engine=schema_engine,
+        streaming=stream,
+    )
+
+    with ExitStack() as stack:
+        if cache is not None:
+            stack.enter_context(cache)
+        if profiler is not None:
+            stack.enter_context(profiler)
+        results = validator.iter_validate(file_paths, jobs=jobs, fail_fast=fail_fast, consistency=consistency)
+        store = _get_result_store(summary_file or "")
+        is_any_invalid = output_results(results, quiet_mode, output_file, store, output_format)
+        if store is not None:
+            output_error_summary(store, quiet_mode, summary_file or "")
+        if consistency is not None:
+            output_consistency_conflicts(consistency, quiet_mode, str(cross_file), output_format)
+
+    if cache is not None and not quiet_mode:
+        click.echo(f"Result cache: {cache.hits} hits, {cache.misses} misses")
+
+    if profiler is not None and profile_file is not None:
+        profiler.write(profile_file)
+        if not quiet_mode:
+            click.echo(f"Profile written to {profile_file}")
+
+    if fail_fast and is_any_invalid:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on")
+@click.option("--port", type=click.IntRange(min=0), default=8765, show_default=True, help="Port to listen on")
+@vocab_snapshot_option
+@click.option("--offline", is_flag=True, help="Only use the local vocab snapshot, never contact NVS")
+@vocab_fetch_mode_option
+@schema_engine_option
+@click.option("--max-errors", type=click.IntRange(min=1), help="Maximum number of errors to report per document")
+@click.option("--quiet", "-q", "quiet_mode", is_flag=True, help="Don't log each request")
+def serve(
+    host: str,
+    port: int,
+    vocab_snapshot: Path | None = None,
+    offline: bool = False,
+    vocab_fetch_mode: str = BATCHED_FETCH,
+    schema_engine: str = JSONSCHEMA_ENGINE,
+    max_errors: int | None = None,
+    quiet_mode: bool = False,
+):
+    """Run a validation server, keeping the vocabs and schemas loaded between requests.
+
+    POST documents to /validate, see argo_metadata_validator.server for details, or use validate --server URL.
+    """
+    from argo_metadata_validator.server import ValidationServer
+    from argo_metadata_validator.validation import ArgoValidator
+
+    validator = ArgoValidator(
+        vocab_snapshot=vocab_snapshot,
+        offline=offline,
+        vocab_fetch_mode=vocab_fetch_mode,
+        max_errors=max_errors,
+        schema_engine=schema_engine,
+    )
+    with ValidationServer(validator, host, port, quiet=quiet_mode) as server:
+        click.echo(f"Serving validation at {server.url}")
+        with suppress(KeyboardInterrupt):
+            server.serve_forever()
+
+
+@main.command("update-vocabs")
+@vocab_snapshot_option
+@click.option("--force", is_flag=True, help="Re-fetch every vocab, even if unchanged on NVS")
+@vocab_fetch_mode_option
+def update_vocabs(vocab_snapshot: Path, force: bool = False, vocab_fetch_mode: str = BATCHED_FETCH):
+    """Create or update the local snapshot of the NVS vocab terms."""
+    from argo_metadata_validator.vocab_snapshot import refresh_snapshot
+
+    snapshot = refresh_snapshot(vocab_snapshot, force=force, fetch_mode=vocab_fetch_mode)
+    n_terms = sum(len(x.active) + len(x.deprecated) for x in snapshot.vocabs.values())
+    click.echo(f"Saved {n_terms} terms from {len(snapshot.vocabs)} vocabs to {vocab_snapshot}")
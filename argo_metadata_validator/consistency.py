@@ -0,0 +1,187 @@
+"""Consistency checks across a batch of files, for problems that no single file shows.
+
+As each file is validated, only the keys the checks need are taken from it, as a ConsistencyRecord, so the batch can
+be streamed without keeping the documents. The ConsistencyIndex then finds, with hash lookups in time linear in the
+size of the batch:
+
+- Platforms, or floats, with the same FLOAT_SERIAL_NO.
+- Sensors, identified by maker, model and serial number, in more than one float, or described by more than one
+  sensor file.
+- Floats whose files_merged names a file that isn't in the batch, or a platform or sensor file that disagrees with
+  the float's own PLATFORM or SENSORS.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from argo_metadata_validator.constants import FLOAT_SCHEMA, PLATFORM_SCHEMA, SENSOR_SCHEMA
+from argo_metadata_validator.models.results import ValidationError
+from argo_metadata_validator.schema_utils import infer_schema_from_data
+
+# Maker, model and serial number of a sensor
+SensorKey = tuple[str, str, str]
+
+
+class SensorRecord(NamedTuple):
+    """A sensor of a file, with a digest of its whole entry to compare it with other files."""
+
+    key: SensorKey
+    digest: str
+    path: str
+
+
+class ConsistencyRecord(NamedTuple):
+    """The parts of a file that the consistency checks use."""
+
+    schema_type: str | None
+    float_serial_no: str | None
+    platform_digest: str | None
+    sensors: tuple[SensorRecord, ...]
+    files_merged: tuple[str, ...]
+
+
+def _digest(value: Any) -> str:
+    """Hash of a JSON value, equal for values that are equal whatever the order of their keys."""
+    content = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def _get_str(data: Any, key: str) -> str | None:
+    """Gets a non-blank string field, None if missing, blank or not a string."""
+    value = data.get(key) if isinstance(data, dict) else None
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def extract_consistency_record(json_data: Any) -> ConsistencyRecord:
+    """Take the keys the consistency checks use from a document, whether or not it is valid.
+
+    Args:
+        json_data (Any): JSON content of a file.
+
+    Returns:
+        ConsistencyRecord: Keys of the file, empty for anything missing or of the wrong type.
+    """
+    try:
+        schema_type = infer_schema_from_data(json_data)
+    except (ValueError, TypeError):
+        return ConsistencyRecord(None, None, None, (), ())
+
+    platform = json_data.get("PLATFORM")
+    sensors = []
+    if schema_type in (FLOAT_SCHEMA, SENSOR_SCHEMA) and isinstance(json_data.get("SENSORS"), list):
+        for index, sensor in enumerate(json_data["SENSORS"]):
+            maker, model = _get_str(sensor, "SENSOR_MAKER"), _get_str(sensor, "SENSOR_MODEL")
+            serial_no = _get_str(sensor, "SENSOR_SERIAL_NO")
+            if maker and model and serial_no:
+                path = f"SENSORS.{index}.SENSOR_SERIAL_NO"
+                sensors.append(SensorRecord((maker, model, serial_no), _digest(sensor), path))
+    files_merged = json_data.get("files_merged") if schema_type == FLOAT_SCHEMA else None
+    return ConsistencyRecord(
+        schema_type=schema_type,
+        float_serial_no=_get_str(platform, "FLOAT_SERIAL_NO") if schema_type != SENSOR_SCHEMA else None,
+        platform_digest=_digest(platform) if schema_type != SENSOR_SCHEMA and isinstance(platform, dict) else None,
+        sensors=tuple(sensors),
+        files_merged=tuple(x for x in files_merged if isinstance(x, str)) if isinstance(files_merged, list) else (),
+    )
+
+
+def _others(files: list[str], file: str) -> str:
+    return ", ".join(x for x in files if x != file)
+
+
+class ConsistencyIndex:
+    """Index of the keys of a batch of files, fed one file at a time, to find conflicts between them."""
+
+    def __init__(self):
+        """Start with an empty batch."""
+        self.records: dict[str, ConsistencyRecord] = {}  # Keyed by file path, in the order added
+
+    def add(self, file: str, json_data: Any):
+        """Index a loaded file."""
+        self.add_record(file, extract_consistency_record(json_data))
+
+    def add_record(self, file: str, record: ConsistencyRecord):
+        """Index the record of a file, e.g. one extracted in another process."""
+        self.records[file] = record
+
+    def conflicts(self) -> dict[str, list[ValidationError]]:
+        """Find the conflicts between the files added so far.
+
+        Returns:
+            dict[str, list[ValidationError]]: Errors of each file with conflicts, keyed by file path in the order the
+                files were added. Each error's path is the field of that file in conflict.
+        """
+        errors: dict[str, list[ValidationError]] = defaultdict(list)
+        self._check_float_serial_nos(errors)
+        self._check_sensors(errors)
+        self._check_files_merged(errors)
+        return {x: errors[x] for x in self.records if x in errors}
+
+    def _check_float_serial_nos(self, errors: dict[str, list[ValidationError]]):
+        """Platforms, and floats, with the same serial number. A float and its own platform file share it."""
+        files_by_serial_no: dict[tuple[str | None, str], list[str]] = defaultdict(list)
+        for file, record in self.records.items():
+            if record.float_serial_no is not None:
+                files_by_serial_no[record.schema_type, record.float_serial_no].append(file)
+
+        for (schema_type, serial_no), files in files_by_serial_no.items():
+            if len(files) > 1:
+                for file in files:
+                    message = f"FLOAT_SERIAL_NO {serial_no} is also used by {schema_type} {_others(files, file)}"
+                    errors[file].append(ValidationError(message=message, path="PLATFORM.FLOAT_SERIAL_NO"))
+
+    def _check_sensors(self, errors: dict[str, list[ValidationError]]):
+        """Sensors in more than one float, or described by more than one sensor file."""
+        paths_by_sensor: dict[tuple[str | None, SensorKey], dict[str, str]] = defaultdict(dict)
+        for file, record in self.records.items():
+            for sensor in record.sensors:
+                # Only the first path of a sensor in a file is kept, e.g. a sensor measuring two things is listed twice
+                paths_by_sensor[record.schema_type, sensor.key].setdefault(file, sensor.path)
+
+        for (schema_type, key), paths in paths_by_sensor.items():
+            if len(paths) > 1:
+                files = list(paths)
+                for file, path in paths.items():
+                    message = f"Sensor {' '.join(key)} is also in {schema_type} {_others(files, file)}"
+                    errors[file].append(ValidationError(message=message, path=path))
+
+    def _check_files_merged(self, errors: dict[str, list[ValidationError]]):
+        """Files named by floats' files_merged that are missing, or disagree with the float."""
+        files_by_name: dict[str, list[str]] = defaultdict(list)
+        for file in self.records:
+            files_by_name[Path(file).name].append(file)
+
+        for file, record in self.records.items():
+            if not record.files_merged:
+                continue
+            float_sensors: dict[SensorKey, set[str]] = defaultdict(set)
+            for sensor in record.sensors:
+                float_sensors[sensor.key].add(sensor.digest)
+            for index, name in enumerate(record.files_merged):
+                path = f"files_merged.{index}"
+                if name not in files_by_name:
+                    errors[file].append(ValidationError(message=f"{name} is not in the batch", path=path))
+                for merged_file in files_by_name.get(name, []):
+                    for message in self._compare_merged_file(record, float_sensors, merged_file):
+                        errors[file].append(ValidationError(message=message, path=path))
+
+    def _compare_merged_file(
+        self, record: ConsistencyRecord, float_sensors: dict[SensorKey, set[str]], merged_file: str
+    ) -> list[str]:
+        """Gets how a platform or sensor file disagrees with the float it was merged into, given the float's sensors."""
+        merged = self.records[merged_file]
+        if merged.schema_type == PLATFORM_SCHEMA and merged.platform_digest != record.platform_digest:
+            return [f"PLATFORM differs from that of {merged_file}"]
+        if merged.schema_type != SENSOR_SCHEMA:
+            return []
+
+        messages = []
+        for sensor in merged.sensors:
+            if sensor.key not in float_sensors:
+                messages.append(f"Sensor {' '.join(sensor.key)} of {merged_file} is not in SENSORS")
+            elif sensor.digest not in float_sensors[sensor.key]:
+                messages.append(f"Sensor {' '.join(sensor.key)} differs from that of {merged_file}")
+        return messages
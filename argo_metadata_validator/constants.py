@@ -1,5 +1,7 @@
 """Definition of constants."""
 
+from datetime import timedelta
+
 DEFAULT_SCHEMA_VERSION = "0.4.0"
 
 # SCHEMA_TYPES
@@ -22,3 +24,18 @@ SCHEMA_TYPES = [
     TRIOS_SCHEMA,
     VENDORS_SCHEMA,
 ]
+
+# VOCAB FETCH MODES
+BATCHED_FETCH = "batched"  # All vocabs in a single SPARQL query
+CONCURRENT_FETCH = "concurrent"  # One SPARQL query per vocab, run in parallel
+
+FETCH_MODES = [BATCHED_FETCH, CONCURRENT_FETCH]
+
+# Age after which the local snapshot of the NVS vocabs is refreshed
+DEFAULT_SNAPSHOT_TTL = timedelta(hours=24)
+
+# SCHEMA VALIDATION ENGINES
+JSONSCHEMA_ENGINE = "jsonschema"  # The jsonschema library's validators
+COMPILED_ENGINE = "compiled"  # Validators compiled into Python functions specialised to each schema
+
+SCHEMA_ENGINES = [JSONSCHEMA_ENGINE, COMPILED_ENGINE]
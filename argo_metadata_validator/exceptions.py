@@ -1,6 +1,6 @@
 """Custom exceptions."""
 
-from argo_metadata_validator.schema_utils import SCHEMA_TYPES
+from argo_metadata_validator.constants import SCHEMA_TYPES
 
 
 class InvalidSchemaTypeError(ValueError):
@@ -10,3 +10,15 @@ class InvalidSchemaTypeError(ValueError):
         """Construct a standard error message."""
         message = f"Unrecognised schema type {provided_type}. Valid options: {', '.join(SCHEMA_TYPES)}"
         super().__init__(message)
+
+
+class VocabSnapshotNotFoundError(FileNotFoundError):
+    """Exception thrown if running offline and there is no usable local snapshot of the NVS vocabs."""
+
+    def __init__(self, snapshot_path: str):
+        """Construct a standard error message."""
+        message = (
+            f"No usable NVS vocab snapshot found at {snapshot_path}. "
+            "Run 'argo-validate update-vocabs' while online to create one."
+        )
+        super().__init__(message)
@@ -0,0 +1,68 @@
+"""Finding the metadata files to validate from directories, globs and manifests."""
+
+import glob
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TextIO
+
+GLOB_CHARS = "*?["
+
+
+def _walk_directory(directory: Path, pattern: str) -> Iterator[Path]:
+    """Recursively yield matching files under a directory, one directory listing at a time, in sorted order."""
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda x: x.name)
+    for entry in entries:
+        path = Path(entry.path)
+        if entry.is_dir():
+            yield from _walk_directory(path, pattern)
+        elif entry.is_file() and path.match(pattern):
+            yield path
+
+
+def iter_input_files(inputs: Iterable[str], pattern: str = "*.json") -> Iterator[Path]:
+    """Lazily expand input paths into the files to validate.
+
+    Each input can be:
+    - a directory, searched recursively for files matching the pattern.
+    - a glob, e.g. "data/**/*.json", where ** matches any number of sub-directories.
+    - a file path, returned as-is even if it doesn't exist so that the validator can report it.
+
+    Args:
+        inputs (Iterable[str]): Directories, globs and file paths.
+        pattern (str, optional): Filename pattern for files found in directories. Defaults to "*.json".
+
+    Yields:
+        Path: Path of each file.
+    """
+    for value in inputs:
+        value = value.strip()
+        if not value:
+            continue
+        path = Path(value)
+        if path.is_dir():
+            yield from _walk_directory(path, pattern)
+        elif any(x in value for x in GLOB_CHARS) and not path.exists():
+            for match in glob.iglob(value, recursive=True):
+                if Path(match).is_file():
+                    yield Path(match)
+        else:
+            yield path
+
+
+def iter_manifest(manifest: TextIO) -> Iterator[str]:
+    """Read inputs from a manifest, e.g. a file or stdin, with one path, directory or glob per line.
+
+    Blank lines and lines starting with # are ignored.
+
+    Args:
+        manifest (TextIO): Open manifest to read from.
+
+    Yields:
+        str: Each input listed in the manifest.
+    """
+    for line in manifest:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
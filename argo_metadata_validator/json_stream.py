@@ -0,0 +1,132 @@
+"""Incremental parsing of JSON documents, for documents too large to comfortably load whole.
+
+This uses ijson, an optional dependency, e.g. `pip install argo-metadata-validator[stream]`, only imported when
+streaming.
+"""
+
+from collections.abc import Collection, Iterator
+from pathlib import Path
+from typing import Any
+
+
+class NotStreamableError(ValueError):
+    """Raised if a document can't be streamed, e.g. as it isn't valid JSON or isn't an object, so should be loaded."""
+
+
+def _import_ijson() -> Any:
+    try:
+        import ijson
+    except ImportError as e:
+        raise ImportError("Streaming needs ijson, install it with `pip install argo-metadata-validator[stream]`") from e
+    return ijson
+
+
+def check_streaming_available():
+    """Check that the incremental JSON parser is installed.
+
+    Raises:
+        ImportError: Raised if ijson isn't installed.
+    """
+    _import_ijson()
+
+
+def _skip_value(events: Iterator[tuple[str, Any]], event: str):
+    """Consume the rest of a value whose first event has been read, without building it."""
+    depth = 1 if event in ("start_map", "start_array") else 0
+    while depth:
+        event, _ = next(events)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+
+
+def _build_value(ijson: Any, events: Iterator[tuple[str, Any]], event: str, value: Any) -> Any:
+    """Build a value whose first event has been read, consuming the rest of its events."""
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1 if event in ("start_map", "start_array") else 0
+    while depth:
+        event, value = next(events)
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+    return builder.value
+
+
+def _iter_entries(
+    ijson: Any, events: Iterator[tuple[str, Any]], streamed_fields: Collection[str], skip_streamed: bool
+) -> Iterator[tuple[str, int | None, Any]]:
+    event, _ = next(events)
+    if event != "start_map":
+        raise NotStreamableError("Only JSON objects can be streamed")
+    for event, value in events:
+        if event == "end_map":
+            break
+        key = value
+        event, value = next(events)
+        if key not in streamed_fields or event != "start_array":
+            yield key, None, _build_value(ijson, events, event, value)
+            continue
+
+        yield key, None, []
+        for index, (event, value) in enumerate(events):
+            if event == "end_array":
+                break
+            if skip_streamed:
+                _skip_value(events, event)
+            else:
+                yield key, index, _build_value(ijson, events, event, value)
+    # Anything after the document is invalid, which the parser only reports once it is read
+    for _ in events:
+        pass
+
+
+def iter_json_stream(
+    file: Path, streamed_fields: Collection[str], skip_streamed: bool = False
+) -> Iterator[tuple[str, int | None, Any]]:
+    """Parse a JSON object incrementally, one top level entry, or element of some of its arrays, at a time.
+
+    Only one entry or element is built at a time, so memory use is bounded by the size of the largest of them rather
+    than the size of the document.
+
+    Args:
+        file (Path): Path to the file.
+        streamed_fields (Collection[str]): Top level fields whose arrays are yielded one element at a time.
+        skip_streamed (bool, optional): Skip over the elements of the streamed arrays, without building them.
+            Defaults to False.
+
+    Raises:
+        NotStreamableError: Raised if the file isn't valid JSON, or isn't an object.
+        ImportError: Raised if ijson isn't installed.
+
+    Yields:
+        tuple[str, int | None, Any]: Field, None and value of each top level entry, in the order of the document. A
+            streamed array is yielded as an empty list, followed by the field, index and value of each element.
+    """
+    ijson = _import_ijson()
+    with open(file, "rb") as f:
+        try:
+            yield from _iter_entries(ijson, iter(ijson.basic_parse(f, use_float=True)), streamed_fields, skip_streamed)
+        except (ijson.JSONError, UnicodeDecodeError) as e:
+            raise NotStreamableError(f"Unable to stream {file}") from e
+
+
+def read_json_skeleton(file: Path, streamed_fields: Collection[str]) -> dict[str, Any]:
+    """Read the top level of a JSON object, leaving its streamed arrays empty, see iter_json_stream.
+
+    Raises:
+        NotStreamableError: Raised if the file isn't valid JSON, or isn't an object.
+    """
+    return {key: value for key, _, value in iter_json_stream(file, streamed_fields, skip_streamed=True)}
+
+
+def read_json_array(file: Path, field: str) -> list[Any]:
+    """Read a single top level array of a JSON object, whole.
+
+    Raises:
+        NotStreamableError: Raised if the file isn't valid JSON, or isn't an object.
+    """
+    return [value for key, index, value in iter_json_stream(file, [field]) if key == field and index is not None]
@@ -0,0 +1,38 @@
+"""Union of the top-level models, for parsing a document of any schema type."""
+
+from functools import lru_cache
+from typing import Annotated, Any
+
+from pydantic import BaseModel, Discriminator, Tag, TypeAdapter
+
+from argo_metadata_validator.constants import FLOAT_SCHEMA, PLATFORM_SCHEMA, SENSOR_SCHEMA
+from argo_metadata_validator.models.float import Float
+from argo_metadata_validator.models.platform import Platform
+from argo_metadata_validator.models.sensor import Sensor
+from argo_metadata_validator.schema_utils import infer_schema_from_data
+
+MODEL_SCHEMA_TYPES: dict[type[BaseModel], str] = {Float: FLOAT_SCHEMA, Platform: PLATFORM_SCHEMA, Sensor: SENSOR_SCHEMA}
+
+
+def _get_schema_tag(data: Any) -> str | None:
+    """Gets which model a document is for, in the same way as the schema type is inferred for validation."""
+    if isinstance(data, BaseModel):
+        return MODEL_SCHEMA_TYPES.get(type(data))
+    try:
+        return infer_schema_from_data(data)
+    except (ValueError, TypeError):
+        return None
+
+
+ArgoMetadata = Annotated[
+    Annotated[Float, Tag(FLOAT_SCHEMA)]
+    | Annotated[Platform, Tag(PLATFORM_SCHEMA)]
+    | Annotated[Sensor, Tag(SENSOR_SCHEMA)],
+    Discriminator(_get_schema_tag),
+]
+
+
+@lru_cache(maxsize=1)
+def get_metadata_adapter() -> TypeAdapter[ArgoMetadata]:
+    """Gets the adapter for parsing any document into its model, built once as it is costly to create."""
+    return TypeAdapter(ArgoMetadata)
@@ -0,0 +1,172 @@
+"""Instrumentation of validation, timing each stage of each file."""
+
+import cProfile
+import heapq
+import json
+import pstats
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+# Stages of validation reported to hooks
+STAGE_LOAD = "load"  # Reading and decoding the JSON file
+STAGE_CACHE = "cache"  # Hashing the file and looking it up in the result cache
+STAGE_SCHEMA = "schema"  # JSON schema validation
+STAGE_VOCAB = "vocab"  # Checking vocab terms, including any fetching of vocabs the file needs
+STAGE_VOCAB_FETCH = "vocab_fetch"  # Fetching vocabs from NVS or the snapshot, not attributed to a file
+STAGE_PARSE = "parse"  # Parsing into Pydantic models
+STAGE_CONSISTENCY = "consistency"  # Indexing the file for the consistency checks across files
+
+# Number of entries in the cProfile and memory allocation listings
+PROFILE_LISTING_SIZE = 30
+
+
+class ValidationHooks:
+    """Base class for receiving timings from an ArgoValidator, override the methods needed.
+
+    Hooks are called in the process the validator was created in, including for files validated by worker processes.
+    The stages are only timed when a validator has hooks, so there is no overhead otherwise.
+    """
+
+    def on_stage(self, stage: str, seconds: float, file: str | None = None):
+        """Called after each stage.
+
+        Args:
+            stage (str): Name of the stage, one of the STAGE_ constants.
+            seconds (float): Wall time of the stage.
+            file (str | None, optional): File the stage was for, None for stages not tied to a file.
+        """
+
+    def on_file(self, file: str, seconds: float, stages: dict[str, float]):
+        """Called after each file has been validated.
+
+        Args:
+            file (str): File path.
+            seconds (float): Total wall time of the file's stages.
+            stages (dict[str, float]): Wall time of each stage, keyed by stage name.
+        """
+
+
+class ValidationProfiler(ValidationHooks):
+    """Hooks that gather timing statistics, optionally along with cProfile and tracemalloc captures.
+
+    Use as a context manager around the validation, so that the overall time and any captures cover it, e.g.
+
+        profiler = ValidationProfiler()
+        with profiler:
+            ArgoValidator(hooks=[profiler]).validate(files)
+        profiler.write(Path("profile.json"))
+    """
+
+    def __init__(self, top_n: int = 20, cprofile: bool = False, trace_memory: bool = False):
+        """Set up the profiler.
+
+        Args:
+            top_n (int, optional): Number of slowest files to list. Defaults to 20.
+            cprofile (bool, optional): Capture a cProfile of the run, only covering this process when validating
+                in parallel. Defaults to False.
+            trace_memory (bool, optional): Trace memory allocations, which slows validation down. Defaults to False.
+        """
+        self.top_n = top_n
+        self.stages: dict[str, dict[str, float]] = {}
+        self.files: dict[str, dict[str, Any]] = {}
+        self._slowest: list[tuple[float, str]] = []
+        self._profile = cProfile.Profile() if cprofile else None
+        self.trace_memory = trace_memory
+        self._memory_snapshot: tracemalloc.Snapshot | None = None
+        self._peak_memory: int | None = None
+        self._start: float | None = None
+        self.wall_seconds: float | None = None
+
+    def on_stage(self, stage: str, seconds: float, file: str | None = None):
+        """Add a stage's time to its totals."""
+        stats = self.stages.setdefault(stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        stats["count"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def on_file(self, file: str, seconds: float, stages: dict[str, float]):
+        """Record a file's timings, keeping track of the slowest files."""
+        self.files[file] = {"seconds": seconds, "stages": stages}
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, (seconds, file))
+        elif self.top_n:
+            heapq.heappushpop(self._slowest, (seconds, file))
+
+    def start(self):
+        """Start timing, and any captures."""
+        if self.trace_memory:
+            tracemalloc.start()
+        if self._profile is not None:
+            self._profile.enable()
+        self._start = perf_counter()
+
+    def stop(self):
+        """Stop timing, and any captures."""
+        if self._start is not None:
+            self.wall_seconds = perf_counter() - self._start
+        if self._profile is not None:
+            self._profile.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._peak_memory = tracemalloc.get_traced_memory()[1]
+            self._memory_snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+    def __enter__(self) -> "ValidationProfiler":
+        """Start profiling."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop profiling."""
+        self.stop()
+
+    def slowest_files(self) -> list[dict[str, Any]]:
+        """Gets the timings of the slowest files, slowest first."""
+        return [{"file": file, **self.files[file]} for _, file in sorted(self._slowest, reverse=True)]
+
+    def _cprofile_stats(self) -> list[dict[str, Any]]:
+        assert self._profile is not None
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for location, timings in stats.stats.items():  # type: ignore[attr-defined]
+            (file, line, function), (_, n_calls, total, cumulative, _) = location, timings
+            rows.append(
+                {
+                    "function": f"{file}:{line}({function})",
+                    "calls": n_calls,
+                    "total_seconds": total,
+                    "cumulative_seconds": cumulative,
+                }
+            )
+        return sorted(rows, key=lambda x: x["cumulative_seconds"], reverse=True)[:PROFILE_LISTING_SIZE]
+
+    def _memory_stats(self) -> dict[str, Any]:
+        assert self._memory_snapshot is not None
+        top = self._memory_snapshot.statistics("lineno")[:PROFILE_LISTING_SIZE]
+        return {
+            "peak_bytes": self._peak_memory,
+            "top_allocations": [{"location": str(x.traceback), "size_bytes": x.size, "count": x.count} for x in top],
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Gets the gathered statistics in a JSON-serialisable form."""
+        stats: dict[str, Any] = {
+            "wall_seconds": self.wall_seconds,
+            "n_files": len(self.files),
+            "stages": {
+                stage: {**x, "mean_seconds": x["total_seconds"] / x["count"]} for stage, x in self.stages.items()
+            },
+            "slowest_files": self.slowest_files(),
+            "files": self.files,
+        }
+        if self._profile is not None:
+            stats["cprofile"] = self._cprofile_stats()
+        if self._memory_snapshot is not None:
+            stats["memory"] = self._memory_stats()
+        return stats
+
+    def write(self, path: Path):
+        """Write the statistics to a JSON file."""
+        path.write_text(json.dumps(self.to_dict(), indent=2))
@@ -0,0 +1,175 @@
+"""Persistent cache of validation results, so that unchanged files aren't re-validated on every run."""
+
+import hashlib
+import json
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+
+from argo_metadata_validator.models.results import ValidationError
+from argo_metadata_validator.schema_utils import get_schema_fingerprint
+
+# Bump if the validation logic changes in a way that alters the errors, older results are then ignored
+RESULT_CACHE_FORMAT_VERSION = 1
+
+# Number of new results written before they are committed to the database
+COMMIT_INTERVAL = 100
+
+
+def hash_file(file: Path) -> str:
+    """Gets the SHA-256 hash of a file's content."""
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_content(content: bytes) -> str:
+    """Gets the SHA-256 hash of content already in memory, the same as hash_file of a file with that content."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class ResultCache:
+    """SQLite store of validation errors, keyed by the content hash of each file.
+
+    Each result records the schema it was validated against and the date of each NVS vocab it used, so it is only
+    reused while those are unchanged. A change to one vocab only invalidates the results of files that use it.
+    """
+
+    def __init__(self, path: str | Path):
+        """Open the cache database, creating it if needed.
+
+        Args:
+            path (str | Path): SQLite database file.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                content_hash TEXT NOT NULL,
+                max_errors INTEGER NOT NULL,
+                format_version INTEGER NOT NULL,
+                schema_version TEXT NOT NULL,
+                schema_fingerprint TEXT NOT NULL,
+                vocab_dates TEXT NOT NULL,
+                errors TEXT NOT NULL,
+                PRIMARY KEY (content_hash, max_errors)
+            )
+            """
+        )
+        self.hits = 0
+        self.misses = 0
+        self._n_uncommitted = 0
+
+    def get(
+        self, content_hash: str, max_errors: int | None, get_vocab_dates: Callable[[], dict[str, str]]
+    ) -> list[ValidationError] | None:
+        """Look up the errors of a file, if they were cached under the current schema and vocabs.
+
+        Args:
+            content_hash (str): Hash of the file content, from hash_file.
+            max_errors (int | None): Error limit the file is being validated with.
+            get_vocab_dates (Callable[[], dict[str, str]]): Gets the current date of each vocab, only called if the
+                cached result depends on any vocabs.
+
+        Returns:
+            list[ValidationError] | None: Cached errors, or None if there is no current result.
+        """
+        row = self.connection.execute(
+            "SELECT format_version, schema_version, schema_fingerprint, vocab_dates, errors FROM results "
+            "WHERE content_hash = ? AND max_errors = ?",
+            (content_hash, -1 if max_errors is None else max_errors),
+        ).fetchone()
+        if row is None or not self._is_current(*row[:4], get_vocab_dates):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return [ValidationError(**x) for x in json.loads(row[4])]
+
+    @staticmethod
+    def _is_current(
+        format_version: int,
+        schema_version: str,
+        schema_fingerprint: str,
+        vocab_dates: str,
+        get_vocab_dates: Callable[[], dict[str, str]],
+    ) -> bool:
+        if format_version != RESULT_CACHE_FORMAT_VERSION:
+            return False
+        if schema_fingerprint != get_schema_fingerprint(schema_version):
+            return False
+        used_vocab_dates = json.loads(vocab_dates)
+        if not used_vocab_dates:
+            return True
+        current_vocab_dates = get_vocab_dates()
+        return all(current_vocab_dates.get(vocab) == date for vocab, date in used_vocab_dates.items())
+
+    def put(
+        self,
+        content_hash: str,
+        max_errors: int | None,
+        schema_version: str,
+        vocabs: list[str],
+        errors: list[ValidationError],
+        get_vocab_dates: Callable[[], dict[str, str]],
+    ):
+        """Store the errors of a file.
+
+        The result isn't stored if any of the vocabs it used has no date, as it couldn't then be invalidated.
+
+        Args:
+            content_hash (str): Hash of the file content, from hash_file.
+            max_errors (int | None): Error limit the file was validated with.
+            schema_version (str): Schema version the file was validated against.
+            vocabs (list[str]): Names of the vocabs the file's terms were checked against.
+            errors (list[ValidationError]): Errors found in the file.
+            get_vocab_dates (Callable[[], dict[str, str]]): Gets the current date of each vocab, only called if the
+                file used any vocabs.
+        """
+        current_vocab_dates = get_vocab_dates() if vocabs else {}
+        if any(x not in current_vocab_dates for x in vocabs):
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                content_hash,
+                -1 if max_errors is None else max_errors,
+                RESULT_CACHE_FORMAT_VERSION,
+                schema_version,
+                get_schema_fingerprint(schema_version),
+                json.dumps({x: current_vocab_dates[x] for x in sorted(vocabs)}),
+                json.dumps([x.model_dump() for x in errors]),
+            ),
+        )
+        self._n_uncommitted += 1
+        if self._n_uncommitted >= COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self):
+        """Write any new results to the database."""
+        self.connection.commit()
+        self._n_uncommitted = 0
+
+    def clear(self):
+        """Remove every cached result."""
+        self.connection.execute("DELETE FROM results")
+        self.commit()
+
+    def close(self):
+        """Commit any new results and close the database."""
+        self.commit()
+        self.connection.close()
+
+    def __enter__(self) -> "ResultCache":
+        """Use the cache as a context manager, closing it at the end."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the cache."""
+        self.close()
@@ -0,0 +1,154 @@
+"""Compact store of the results of validating a large batch of files.
+
+A batch of millions of files has few distinct errors, e.g. the same unknown vocab term used over and over, so each
+distinct (message, path) is kept once, as an ErrorRecord, and each file only keeps the ids of its errors. The errors
+are also aggregated as they are added, by signature: the message, and the path with the array indices replaced by *.
+"""
+
+import re
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from typing import NamedTuple
+
+from argo_metadata_validator.models.results import ValidationError
+
+# Array indices within an error path, e.g. the 3 of SENSORS.3.SENSOR_MODEL
+_PATH_INDEX_REGEX = re.compile(r"(?<![^.])\d+(?![^.])")
+DEFAULT_MAX_EXAMPLE_FILES = 3
+
+
+class ErrorRecord(NamedTuple):
+    """A distinct error, shared by every file that has it."""
+
+    message: str
+    path: str | None
+
+
+class ErrorSummary(NamedTuple):
+    """Errors of a batch that share a signature, i.e. the same message, and the same path but for array indices."""
+
+    message: str
+    path: str | None  # With the array indices replaced by *
+    count: int  # Number of times the error occurs
+    file_count: int  # Number of files with the error
+    example_files: tuple[str, ...]  # The first few files with the error
+
+
+def get_error_signature(message: str, path: str | None) -> tuple[str, str | None]:
+    """Gets the signature that errors are aggregated by, the message and the path without its array indices."""
+    return message, _PATH_INDEX_REGEX.sub("*", path) if path is not None else None
+
+
+class ResultStore(Mapping[str, list[ValidationError]]):
+    """Compact store of the errors of each file of a batch, along with an aggregate of them by signature.
+
+    It is a read-only mapping of each file path to its errors, in the order the files were added, the same as the
+    results of ArgoValidator.validate. The ValidationError models are only created as each file's errors are looked
+    up, so that they don't all have to be kept.
+    """
+
+    def __init__(self, max_example_files: int = DEFAULT_MAX_EXAMPLE_FILES):
+        """Start with no files.
+
+        Args:
+            max_example_files (int, optional): Number of files with each signature to keep as examples. Defaults to
+                DEFAULT_MAX_EXAMPLE_FILES.
+        """
+        self.max_example_files = max_example_files
+        self._files: dict[str, int] = {}  # Index of each file
+        self._ends = array("Q")  # Of each file's error ids, in _error_ids
+        self._error_ids = array("L")
+        self._records: list[ErrorRecord] = []
+        self._record_ids: dict[ErrorRecord, int] = {}
+        self._record_signatures = array("L")  # Id of the signature of each record
+        self._signatures: list[tuple[str, str | None]] = []
+        self._signature_ids: dict[tuple[str, str | None], int] = {}
+        self._counts: list[int] = []  # Of each signature
+        self._file_counts: list[int] = []
+        self._example_files: list[list[str]] = []
+        self.invalid_count = 0
+
+    def __getitem__(self, file: str) -> list[ValidationError]:
+        """Gets the errors of a file."""
+        index = self._files[file]
+        start = self._ends[index - 1] if index else 0
+        records = [self._records[x] for x in self._error_ids[start : self._ends[index]]]
+        return [ValidationError.model_construct(message=x.message, path=x.path) for x in records]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the file paths, in the order they were added."""
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        """Number of files."""
+        return len(self._files)
+
+    @property
+    def error_count(self) -> int:
+        """Number of errors across every file."""
+        return len(self._error_ids)
+
+    def add(self, file: str, errors: Iterable[ValidationError]):
+        """Add the errors of a file.
+
+        A file that has already been added, e.g. as it was given twice, or both by itself and within a directory, is
+        the same file, so keeps its first errors and isn't counted again.
+        """
+        if file in self._files:
+            return
+        signature_ids = set()
+        for error in errors:
+            record_id = self._get_record_id(error.message, error.path)
+            self._error_ids.append(record_id)
+            signature_id = self._record_signatures[record_id]
+            self._counts[signature_id] += 1
+            signature_ids.add(signature_id)
+        for signature_id in sorted(signature_ids):
+            self._file_counts[signature_id] += 1
+            if len(self._example_files[signature_id]) < self.max_example_files:
+                self._example_files[signature_id].append(file)
+        self._files[file] = len(self._ends)
+        self._ends.append(len(self._error_ids))
+        self.invalid_count += bool(signature_ids)
+
+    def tee(self, results: Iterable[tuple[str, list[ValidationError]]]) -> Iterator[tuple[str, list[ValidationError]]]:
+        """Add results to the store as they pass through, e.g. from ArgoValidator.iter_validate."""
+        for file, errors in results:
+            self.add(file, errors)
+            yield file, errors
+
+    def _get_record_id(self, message: str, path: str | None) -> int:
+        record = ErrorRecord(message, path)
+        record_id = self._record_ids.get(record)
+        if record_id is not None:
+            return record_id
+
+        record = ErrorRecord(sys.intern(message), sys.intern(path) if path is not None else None)
+        record_id = self._record_ids[record] = len(self._records)
+        self._records.append(record)
+        signature = get_error_signature(record.message, record.path)
+        signature_id = self._signature_ids.get(signature)
+        if signature_id is None:
+            signature_id = self._signature_ids[signature] = len(self._signatures)
+            self._signatures.append(signature)
+            self._counts.append(0)
+            self._file_counts.append(0)
+            self._example_files.append([])
+        self._record_signatures.append(signature_id)
+        return record_id
+
+    def summarise(self, top: int | None = None) -> list[ErrorSummary]:
+        """Gets the errors aggregated by signature.
+
+        Args:
+            top (int | None, optional): Only the most frequent signatures. Defaults to None, all of them.
+
+        Returns:
+            list[ErrorSummary]: The signatures, most frequent first, then in the order first seen.
+        """
+        order = sorted(range(len(self._signatures)), key=lambda x: -self._counts[x])[:top]
+        return [
+            ErrorSummary(*self._signatures[x], self._counts[x], self._file_counts[x], tuple(self._example_files[x]))
+            for x in order
+        ]
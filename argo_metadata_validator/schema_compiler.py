@@ -0,0 +1,556 @@
+"""Compiles draft-07 JSON schemas into specialised Python validation functions.
+
+Each distinct subschema becomes a pair of generated functions, a check returning whether an instance is valid, and
+an error generator yielding (message, path) for every error, in the same order and with the same messages as the
+jsonschema Draft7Validator. Valid documents, the common case, only run the checks, which don't build any paths or
+messages, and the error generators only descend into the parts of a document that the checks find invalid.
+
+Schemas using keywords the compiler doesn't support raise UnsupportedSchemaError, so that the jsonschema validator
+can be used for them instead.
+"""
+
+import json
+import re
+from collections.abc import Callable, Iterator
+from fractions import Fraction
+from itertools import pairwise
+from numbers import Number
+from typing import Any, NamedTuple
+
+DRAFT7_META_SCHEMAS = {"http://json-schema.org/draft-07/schema", "http://json-schema.org/draft-07/schema#"}
+
+# Checks of each JSON type, on a value called instance
+_TYPE_CHECKS = {
+    "array": "isinstance(instance, list)",
+    "boolean": "isinstance(instance, bool)",
+    "integer": "_is_integer(instance)",
+    "null": "instance is None",
+    "number": "_is_number(instance)",
+    "object": "isinstance(instance, dict)",
+    "string": "isinstance(instance, str)",
+}
+
+# Draft-07 keywords that aren't compiled, schemas using them are left to jsonschema
+_UNSUPPORTED_KEYWORDS = {"dependencies"}
+
+
+class UnsupportedSchemaError(ValueError):
+    """Raised when a schema uses something the compiler doesn't support."""
+
+
+class SchemaError(NamedTuple):
+    """Error found by a CompiledValidator, with the same message and path as the jsonschema error."""
+
+    message: str
+    path: tuple[str | int, ...]
+
+
+def _is_integer(instance: Any) -> bool:
+    if isinstance(instance, bool):
+        return False
+    return isinstance(instance, int) or (isinstance(instance, float) and instance.is_integer())
+
+
+def _is_number(instance: Any) -> bool:
+    return isinstance(instance, Number) and not isinstance(instance, bool)
+
+
+def _is_multiple_of(instance: Any, divisor: Any) -> bool:
+    """Whether a number is a multiple of another, in the same way as jsonschema."""
+    if isinstance(divisor, float):
+        quotient = instance / divisor
+        try:
+            return int(quotient) == quotient
+        except OverflowError:
+            # As in jsonschema, falling back to exact arithmetic when the quotient is too large for a float
+            return (Fraction(instance) / Fraction(divisor)).denominator == 1
+    return instance % divisor == 0
+
+
+_TRUE, _FALSE = object(), object()
+
+
+def _unbool(instance: Any) -> Any:
+    """Stand-in for a boolean that isn't equal to 1 or 0, as JSON schema considers them different."""
+    if instance is True:
+        return _TRUE
+    if instance is False:
+        return _FALSE
+    return instance
+
+
+def equal(one: Any, two: Any) -> bool:
+    """Whether two JSON values are equal in the way jsonschema compares them, e.g. for const and enum.
+
+    The same as == except that booleans aren't equal to 1 or 0, including within arrays and objects.
+    """
+    if one is two:
+        return True
+    if isinstance(one, str) or isinstance(two, str):
+        return one == two
+    if isinstance(one, list) and isinstance(two, list):
+        return len(one) == len(two) and all(equal(x, y) for x, y in zip(one, two, strict=True))
+    if isinstance(one, dict) and isinstance(two, dict):
+        return len(one) == len(two) and all(k in two and equal(v, two[k]) for k, v in one.items())
+    return _unbool(one) == _unbool(two)
+
+
+def uniq(instance: list) -> bool:
+    """Whether the items of an array are unique, in the same way as jsonschema's uniqueItems.
+
+    As jsonschema, the items are compared with their neighbours once sorted if they can be, otherwise pairwise.
+    """
+    try:
+        ordered = sorted(_unbool(x) for x in instance)
+        return not any(equal(x, y) for x, y in pairwise(ordered))
+    except (NotImplementedError, TypeError):
+        seen: list = []
+        for item in map(_unbool, instance):
+            if any(equal(x, item) for x in seen):
+                return False
+            seen.append(item)
+    return True
+
+
+def extras_msg(extras: list) -> tuple[str, str]:
+    """Gets the list of unexpected items or properties, and its verb, for an error message as jsonschema words it."""
+    return ", ".join(repr(x) for x in extras), "was" if len(extras) == 1 else "were"
+
+
+def freeze_json(instance: Any) -> Any:
+    """Hashable copy of a JSON value, equal to the copy of another value if jsonschema considers them equal."""
+    if isinstance(instance, dict):
+        return frozenset((k, freeze_json(v)) for k, v in instance.items())
+    if isinstance(instance, list):
+        return tuple(freeze_json(x) for x in instance)
+    if isinstance(instance, bool):
+        return _TRUE if instance else _FALSE
+    return instance
+
+
+def is_unique(instance: list) -> bool:
+    """Whether the items of an array are unique, by hashing them rather than comparing every pair as jsonschema does.
+
+    Arrays that seem to have duplicates are checked again with jsonschema, to give the same verdict in every case.
+    """
+    try:
+        if len(set(map(freeze_json, instance))) == len(instance):
+            return True
+    except TypeError:
+        pass
+    return uniq(instance)
+
+
+def _additional_properties_message(extras: list, schema: dict) -> str:
+    if "patternProperties" in schema:
+        patterns = ", ".join(repr(x) for x in sorted(schema["patternProperties"]))
+        verb = "does" if len(extras) == 1 else "do"
+        return f"{', '.join(repr(x) for x in sorted(extras))} {verb} not match any of the regexes: {patterns}"
+    joined, verb = extras_msg(sorted(extras, key=str))
+    return f"Additional properties are not allowed ({joined} {verb} unexpected)"
+
+
+def _one_of_message(instance: Any, subschemas: list, checks: tuple[Callable[[Any], bool], ...]) -> str | None:
+    """Gets the error of a oneOf, if the instance isn't valid under exactly one of the subschemas."""
+    valid = [i for i, check in enumerate(checks) if check(instance)]
+    if not valid:
+        return f"{instance!r} is not valid under any of the given schemas"
+    if len(valid) > 1:
+        # jsonschema reports the other valid subschemas, then the first
+        reprs = ", ".join(repr(subschemas[i]) for i in [*valid[1:], valid[0]])
+        return f"{instance!r} is valid under each of {reprs}"
+    return None
+
+
+# Runtime helpers available to the generated code
+_RUNTIME = {
+    "_equal": equal,
+    "_is_unique": is_unique,
+    "_extras_msg": extras_msg,
+    "_is_integer": _is_integer,
+    "_is_number": _is_number,
+    "_is_multiple_of": _is_multiple_of,
+    "_additional_properties_message": _additional_properties_message,
+    "_one_of_message": _one_of_message,
+}
+
+
+def _indent(lines: list[str], levels: int = 1) -> list[str]:
+    return ["    " * levels + x for x in lines]
+
+
+class _Keyword(NamedTuple):
+    """Generated code for a keyword of a schema, within its check function and within its error generator."""
+
+    check: list[str]
+    errors: list[str]
+
+
+class _SchemaCompiler:
+    """Generates the source of the check and error generator of each distinct subschema of a schema."""
+
+    def __init__(self, resolve_ref: Callable[[str], Any] | None):
+        self.resolve_ref = resolve_ref
+        self.namespace: dict[str, Any] = dict(_RUNTIME)
+        self.source: list[str] = []
+        self.compiled: dict[str, int] = {}  # Index of the functions of each subschema, keyed by its JSON
+        self.trivial: set[int] = set()  # Subschemas that accept anything
+
+    def constant(self, value: Any) -> str:
+        """Gets the name of a constant for the generated code."""
+        name = f"_k{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def compile(self, schema: Any) -> int:
+        """Generates the functions of a subschema, returning their index, _i{index} checks and _e{index} errors."""
+        key = json.dumps(schema)
+        if key in self.compiled:
+            return self.compiled[key]
+        index = len(self.compiled)
+        self.compiled[key] = index
+
+        if schema is True or schema is False:
+            message = self.constant("False schema does not allow ")
+            keywords = [] if schema else [_Keyword(["return False"], [f"yield {message} + repr(instance), path"])]
+        elif isinstance(schema, dict):
+            if "$ref" in schema:
+                # As in draft-07, keywords alongside a $ref are ignored
+                keywords = [self.ref(schema["$ref"])]
+            else:
+                keywords = [self.keyword(k, v, schema) for k, v in schema.items()]
+        else:
+            raise UnsupportedSchemaError(f"Invalid schema {schema!r}")
+
+        check = [x for keyword in keywords for x in keyword.check]
+        errors = [x for keyword in keywords for x in keyword.errors]
+        if not check:
+            self.trivial.add(index)
+        self.source += [f"def _i{index}(instance):", *_indent(check), "    return True", ""]
+        # The trailing yield makes it a generator even if the schema never has any errors
+        self.source += [f"def _e{index}(instance, path):", *_indent(errors), "    return", "    yield", ""]
+        return index
+
+    def error(self, message: str, with_instance: bool = True) -> str:
+        """Line yielding an error, whose message is the repr of the instance followed by a message, or a message."""
+        if with_instance:
+            return f"yield repr(instance) + {self.constant(message)}, path"
+        return f"yield {self.constant(message)}, path"
+
+    def failure(self, condition: str, message: str, with_instance: bool = True) -> _Keyword:
+        """Keyword that fails with a message, if a condition holds."""
+        return _Keyword(
+            [f"if {condition}:", "    return False"], [f"if {condition}:", f"    {self.error(message, with_instance)}"]
+        )
+
+    def descend(self, schema: Any, instance: str = "instance", path: str = "path") -> tuple[str, list[str]] | None:
+        """Gets a check of a value against a subschema, and the code yielding its errors, or None if always valid."""
+        index = self.compile(schema)
+        if index in self.trivial:
+            return None
+        if schema is False:
+            # As in jsonschema, the error of a false subschema has the path of the instance containing the value
+            path = "path"
+        errors = [f"if not _i{index}({instance}):", f"    yield from _e{index}({instance}, {path})"]
+        return f"_i{index}({instance})", errors
+
+    def keyword(self, name: str, value: Any, schema: dict) -> _Keyword:
+        method = getattr(self, f"keyword_{name}", None)
+        if name in _UNSUPPORTED_KEYWORDS:
+            raise UnsupportedSchemaError(f"The {name} keyword isn't supported")
+        if method is None:
+            # Not a validation keyword, e.g. a title or description
+            return _Keyword([], [])
+        return method(value, schema)
+
+    def ref(self, ref: str) -> _Keyword:
+        if self.resolve_ref is None:
+            raise UnsupportedSchemaError(f"Unable to resolve reference {ref}")
+        descended = self.descend(self.resolve_ref(ref))
+        if descended is None:
+            return _Keyword([], [])
+        check, errors = descended
+        return _Keyword([f"if not {check}:", "    return False"], errors)
+
+    def _descend_each(self, descended: list[tuple[str, list[str]] | None]) -> _Keyword:
+        check, errors = [], []
+        for x in descended:
+            if x is not None:
+                check += [f"if not {x[0]}:", "    return False"]
+                errors += x[1]
+        return _Keyword(check, errors)
+
+    def _guarded(self, condition: str, keyword: _Keyword) -> _Keyword:
+        """Only apply a keyword to instances of a type."""
+        if not keyword.check:
+            return keyword
+        return _Keyword([f"if {condition}:", *_indent(keyword.check)], [f"if {condition}:", *_indent(keyword.errors)])
+
+    def keyword_type(self, value: Any, schema: dict) -> _Keyword:
+        types = value if isinstance(value, list) else [value]
+        if any(x not in _TYPE_CHECKS for x in types):
+            raise UnsupportedSchemaError(f"Unknown type {value!r}")
+        condition = " or ".join(_TYPE_CHECKS[x] for x in types) or "False"
+        return self.failure(f"not ({condition})", f" is not of type {', '.join(repr(x) for x in types)}")
+
+    def keyword_const(self, value: Any, schema: dict) -> _Keyword:
+        if isinstance(value, str):
+            condition = f"instance != {self.constant(value)}"
+        elif value is None or isinstance(value, bool):
+            condition = f"instance is not {value!r}"
+        else:
+            condition = f"not _equal(instance, {self.constant(value)})"
+        return self.failure(condition, f"{value!r} was expected", with_instance=False)
+
+    def keyword_enum(self, value: Any, schema: dict) -> _Keyword:
+        if not isinstance(value, list):
+            raise UnsupportedSchemaError(f"Invalid enum {value!r}")
+        if all(isinstance(x, str) for x in value):
+            condition = f"not (isinstance(instance, str) and instance in {self.constant(frozenset(value))})"
+        else:
+            condition = f"not any(_equal(x, instance) for x in {self.constant(value)})"
+        return self.failure(condition, f" is not one of {value!r}")
+
+    def keyword_required(self, value: Any, schema: dict) -> _Keyword:
+        if not all(isinstance(x, str) for x in value):
+            raise UnsupportedSchemaError(f"Invalid required {value!r}")
+        if not value:
+            return _Keyword([], [])
+        check = [f"if not {self.constant(frozenset(value))} <= instance.keys():", "    return False"]
+        errors = [
+            y
+            for x in value
+            for y in [f"if {x!r} not in instance:", f"    {self.error(f'{x!r} is a required property', False)}"]
+        ]
+        return self._guarded("isinstance(instance, dict)", _Keyword(check, errors))
+
+    def keyword_properties(self, value: Any, schema: dict) -> _Keyword:
+        check, errors = [], []
+        for name, subschema in value.items():
+            descended = self.descend(subschema, f"instance[{name!r}]", f"path + ({name!r},)")
+            if descended is not None:
+                check += [f"if {name!r} in instance and not {descended[0]}:", "    return False"]
+                errors += [f"if {name!r} in instance:", *_indent(descended[1])]
+        return self._guarded("isinstance(instance, dict)", _Keyword(check, errors))
+
+    def keyword_patternProperties(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        check, errors = [], []
+        for pattern, subschema in value.items():
+            descended = self.descend(subschema, "value", "path + (name,)")
+            if descended is not None:
+                regex = self.constant(re.compile(pattern))
+                check += ["for name, value in instance.items():"]
+                check += [f"    if {regex}.search(name) and not {descended[0]}:", "        return False"]
+                errors += ["for name, value in instance.items():", f"    if {regex}.search(name):"]
+                errors += _indent(descended[1], 2)
+        return self._guarded("isinstance(instance, dict)", _Keyword(check, errors))
+
+    def keyword_additionalProperties(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        properties = self.constant(frozenset(schema.get("properties", {})))
+        extra = f"name not in {properties}"
+        if schema.get("patternProperties"):
+            extra += f" and not {self.constant(re.compile('|'.join(schema['patternProperties'])))}.search(name)"
+        extras = f"[name for name in instance if {extra}]"
+
+        if isinstance(value, dict):
+            descended = self.descend(value, "instance[name]", "path + (name,)")
+            if descended is None:
+                return _Keyword([], [])
+            check = [f"for name in {extras}:", f"    if not {descended[0]}:", "        return False"]
+            errors = [f"for name in set({extras}):", *_indent(descended[1])]
+        elif not value:
+            check = ["for name in instance:", f"    if {extra}:", "        return False"]
+            message = f"_additional_properties_message(extras, {self.constant(schema)})"
+            errors = [f"extras = {extras}", "if extras:", f"    yield {message}, path"]
+        else:
+            return _Keyword([], [])
+        return self._guarded("isinstance(instance, dict)", _Keyword(check, errors))
+
+    def keyword_propertyNames(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        descended = self.descend(value, "name")
+        if descended is None:
+            return _Keyword([], [])
+        check = ["for name in instance:", f"    if not {descended[0]}:", "        return False"]
+        errors = ["for name in instance:", *_indent(descended[1])]
+        return self._guarded("isinstance(instance, dict)", _Keyword(check, errors))
+
+    def keyword_items(self, value: Any, schema: dict) -> _Keyword:
+        check, errors = [], []
+        if isinstance(value, list):
+            for index, subschema in enumerate(value):
+                descended = self.descend(subschema, f"instance[{index}]", f"path + ({index},)")
+                if descended is not None:
+                    check += [f"if len(instance) > {index} and not {descended[0]}:", "    return False"]
+                    errors += [f"if len(instance) > {index}:", *_indent(descended[1])]
+        else:
+            descended = self.descend(value, "item", "path + (index,)")
+            if descended is not None:
+                check = ["for item in instance:", f"    if not {descended[0]}:", "        return False"]
+                errors = ["for index, item in enumerate(instance):", *_indent(descended[1])]
+        return self._guarded("isinstance(instance, list)", _Keyword(check, errors))
+
+    def keyword_additionalItems(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        items = schema.get("items", {})
+        if isinstance(items, dict):
+            return _Keyword([], [])
+        if not isinstance(items, list):
+            raise UnsupportedSchemaError(f"Invalid items {items!r} alongside additionalItems")
+        start = len(items)
+        if isinstance(value, dict):
+            descended = self.descend(value, "item", "path + (index,)")
+            if descended is None:
+                return _Keyword([], [])
+            check = [f"for item in instance[{start}:]:", f"    if not {descended[0]}:", "        return False"]
+            errors = [f"for index, item in enumerate(instance[{start}:], start={start}):", *_indent(descended[1])]
+        elif not value:
+            check = [f"if len(instance) > {start}:", "    return False"]
+            message = f"'Additional items are not allowed (%s %s unexpected)' % _extras_msg(instance[{start}:])"
+            errors = [f"if len(instance) > {start}:", f"    yield {message}, path"]
+        else:
+            return _Keyword([], [])
+        return self._guarded("isinstance(instance, list)", _Keyword(check, errors))
+
+    def keyword_contains(self, value: Any, schema: dict) -> _Keyword:
+        condition = f"isinstance(instance, list) and not any(_i{self.compile(value)}(item) for item in instance)"
+        message = "'None of ' + repr(instance) + ' are valid under the given schema'"
+        return _Keyword([f"if {condition}:", "    return False"], [f"if {condition}:", f"    yield {message}, path"])
+
+    def _limit(self, condition: str, value: Any, message: str) -> _Keyword:
+        return self.failure(condition.format(self.constant(value)), message)
+
+    def keyword_minimum(self, value: Any, schema: dict) -> _Keyword:
+        return self._limit("_is_number(instance) and instance < {}", value, f" is less than the minimum of {value!r}")
+
+    def keyword_maximum(self, value: Any, schema: dict) -> _Keyword:
+        message = f" is greater than the maximum of {value!r}"
+        return self._limit("_is_number(instance) and instance > {}", value, message)
+
+    def keyword_exclusiveMinimum(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = f" is less than or equal to the minimum of {value!r}"
+        return self._limit("_is_number(instance) and instance <= {}", value, message)
+
+    def keyword_exclusiveMaximum(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = f" is greater than or equal to the maximum of {value!r}"
+        return self._limit("_is_number(instance) and instance >= {}", value, message)
+
+    def keyword_multipleOf(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = f" is not a multiple of {value}"
+        return self._limit("_is_number(instance) and not _is_multiple_of(instance, {})", value, message)
+
+    def keyword_minItems(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = " should be non-empty" if value == 1 else " is too short"
+        return self._limit("isinstance(instance, list) and len(instance) < {}", value, message)
+
+    def keyword_maxItems(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = " is expected to be empty" if value == 0 else " is too long"
+        return self._limit("isinstance(instance, list) and len(instance) > {}", value, message)
+
+    def keyword_minLength(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = " should be non-empty" if value == 1 else " is too short"
+        return self._limit("isinstance(instance, str) and len(instance) < {}", value, message)
+
+    def keyword_maxLength(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = " is expected to be empty" if value == 0 else " is too long"
+        return self._limit("isinstance(instance, str) and len(instance) > {}", value, message)
+
+    def keyword_minProperties(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = " should be non-empty" if value == 1 else " does not have enough properties"
+        return self._limit("isinstance(instance, dict) and len(instance) < {}", value, message)
+
+    def keyword_maxProperties(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        message = " is expected to be empty" if value == 0 else " has too many properties"
+        return self._limit("isinstance(instance, dict) and len(instance) > {}", value, message)
+
+    def keyword_uniqueItems(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        if not value:
+            return _Keyword([], [])
+        return self.failure("isinstance(instance, list) and not _is_unique(instance)", " has non-unique elements")
+
+    def keyword_pattern(self, value: Any, schema: dict) -> _Keyword:
+        regex = self.constant(re.compile(value))
+        return self.failure(f"isinstance(instance, str) and not {regex}.search(instance)", f" does not match {value!r}")
+
+    def keyword_allOf(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        return self._descend_each([self.descend(x) for x in value])
+
+    def keyword_anyOf(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        checks = [self.descend(x) for x in value]
+        if any(x is None for x in checks):
+            return _Keyword([], [])
+        condition = " or ".join(x[0] for x in checks if x is not None) or "False"
+        return self.failure(f"not ({condition})", " is not valid under any of the given schemas")
+
+    def keyword_oneOf(self, value: Any, schema: dict) -> _Keyword:  # noqa: N802
+        checks = "(" + "".join(f"_i{self.compile(x)}, " for x in value) + ")"
+        message = f"_one_of_message(instance, {self.constant(value)}, {checks})"
+        check = [f"if sum(1 for check in {checks} if check(instance)) != 1:", "    return False"]
+        errors = [f"message = {message}", "if message is not None:", "    yield message, path"]
+        return _Keyword(check, errors)
+
+    def keyword_not(self, value: Any, schema: dict) -> _Keyword:
+        return self.failure(f"_i{self.compile(value)}(instance)", f" should not be valid under {value!r}")
+
+    def keyword_if(self, value: Any, schema: dict) -> _Keyword:
+        branches = [self.descend(schema[x]) if x in schema else None for x in ["then", "else"]]
+        if branches == [None, None]:
+            return _Keyword([], [])
+        check, errors = [f"if _i{self.compile(value)}(instance):"], [f"if _i{self.compile(value)}(instance):"]
+        for n, branch in enumerate(branches):
+            if n == 1:
+                check.append("else:")
+                errors.append("else:")
+            if branch is None:
+                check.append("    pass")
+                errors.append("    pass")
+            else:
+                check += [f"    if not {branch[0]}:", "        return False"]
+                errors += _indent(branch[1])
+        return _Keyword(check, errors)
+
+
+class CompiledValidator:
+    """Validates instances of a draft-07 schema with generated functions, finding the same errors as jsonschema.
+
+    Format isn't asserted, as with jsonschema validators created without a format checker.
+    """
+
+    def __init__(self, schema: Any, resolve_ref: Callable[[str], Any] | None = None):
+        """Compile a schema.
+
+        Args:
+            schema (Any): Draft-07 schema.
+            resolve_ref (Callable[[str], Any] | None, optional): Gets the schema a $ref refers to. Defaults to None,
+                in which case schemas with references are unsupported.
+
+        Raises:
+            UnsupportedSchemaError: Raised if the schema isn't draft-07, or uses a keyword that isn't supported.
+        """
+        meta_schema = schema.get("$schema") if isinstance(schema, dict) else None
+        if meta_schema is not None and meta_schema not in DRAFT7_META_SCHEMAS:
+            raise UnsupportedSchemaError(f"Only draft-07 schemas are supported, not {schema['$schema']}")
+        compiler = _SchemaCompiler(resolve_ref)
+        index = compiler.compile(schema)
+        self.schema = schema
+        self.source = "\n".join(compiler.source)
+        namespace = compiler.namespace
+        exec(compile(self.source, "<compiled schema>", "exec"), namespace)  # noqa: S102
+        self._is_valid: Callable[[Any], bool] = namespace[f"_i{index}"]
+        self._iter_errors: Callable[[Any, tuple], Iterator[tuple[str, tuple]]] = namespace[f"_e{index}"]
+
+    def is_valid(self, instance: Any) -> bool:
+        """Whether an instance is valid under the schema."""
+        return self._is_valid(instance)
+
+    def iter_errors(self, instance: Any) -> Iterator[SchemaError]:
+        """Lazily find the errors of an instance, in the same order as jsonschema finds them.
+
+        Args:
+            instance (Any): Instance to validate.
+
+        Yields:
+            Iterator[SchemaError]: Each error found.
+        """
+        if self._is_valid(instance):
+            return
+        for message, path in self._iter_errors(instance, ()):
+            yield SchemaError(message, path)
@@ -1,21 +1,51 @@
 """Utilities related to the schema validation."""
 
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache, partial
 from pathlib import Path
+from typing import Any, NamedTuple
 
 import jsonschema.validators
 from jsonschema.protocols import Validator
 from referencing import Registry, Resource
+from referencing.jsonschema import DRAFT7
 
 import argo_metadata_validator
 from argo_metadata_validator.constants import (
+    COMPILED_ENGINE,
     DEFAULT_SCHEMA_VERSION,
     FLOAT_SCHEMA,
+    JSONSCHEMA_ENGINE,
     PLATFORM_SCHEMA,
+    SCHEMA_ENGINES,
     SCHEMA_TYPES,
     SENSOR_SCHEMA,
 )
 from argo_metadata_validator.exceptions import InvalidSchemaTypeError
-from argo_metadata_validator.utils import load_json
+from argo_metadata_validator.schema_compiler import CompiledValidator, UnsupportedSchemaError
+from argo_metadata_validator.utils import load_json, parse_json
+
+# Matches e.g. "^SDN:R25::" or "^SDN:(R27|L22)::" at the start of a vocab field's pattern
+VOCAB_PATTERN_REGEX = re.compile(r"^\^SDN:\(?([\w|]+)\)?::")
+
+# Maximum number of (schema_type, version) validators, and schema versions, kept in memory at once
+VALIDATOR_CACHE_SIZE = 32
+
+# Bump if the structure of the schema bundle files changes, older bundles are then rebuilt
+SCHEMA_BUNDLE_FORMAT_VERSION = 1
+SCHEMA_BUNDLE_DIR_ENV_VAR = "ARGO_SCHEMA_BUNDLE_DIR"
+# Prefix of the URIs that references left in a bundle, i.e. circular ones, are resolved with
+BUNDLE_URI_PREFIX = "urn:argo-schema:"
+# Only versions like this have their bundles cached on disk, as the version is used in the file name
+BUNDLE_VERSION_REGEX = re.compile(r"\d+(\.\d+)*")
+
+# Keywords of an object's schema that only look at its keys, or at the values of keys that aren't its properties
+_KEY_KEYWORDS = {"required", "additionalProperties", "propertyNames", "minProperties", "maxProperties", "uniqueItems"}
+# Keywords of an array's schema that can be checked one element at a time
+_STREAMED_ARRAY_KEYWORDS = {"type", "items", "minItems", "uniqueItems"}
 
 
 def _get_schema_dir(version: str = DEFAULT_SCHEMA_VERSION) -> Path:
@@ -49,15 +79,208 @@ def _get_schema_file(schema_type: str, version: str = DEFAULT_SCHEMA_VERSION) ->
     return schema_dir / f"argo.{schema_type}.schema.json"
 
 
-def _retrieve_from_filesystem(uri: str):
-    schema_dir = _get_schema_dir()
-    file = Path(uri).name
-    path = schema_dir / file
-    return Resource.from_contents(load_json(path))
+def _get_bundle_dir() -> Path:
+    """Gets where schema bundles are cached, ARGO_SCHEMA_BUNDLE_DIR if set, otherwise the user's cache directory."""
+    if os.environ.get(SCHEMA_BUNDLE_DIR_ENV_VAR):
+        return Path(os.environ[SCHEMA_BUNDLE_DIR_ENV_VAR])
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return cache_dir / "argo-metadata-validator" / "schema_bundles"
+
+
+def _get_schema_sources(version: str) -> dict[str, list[int]]:
+    """Gets the size and modification time of each of a version's schema files, to tell if a bundle is stale."""
+    sources = {}
+    for schema_file in sorted(_get_schema_dir(version).glob("*.json")):
+        stat = schema_file.stat()
+        sources[schema_file.name] = [stat.st_size, stat.st_mtime_ns]
+    return sources
+
+
+def _resolve_pointer(schema: Any, pointer: str) -> Any:
+    node = schema
+    for part in pointer.split("/")[1:]:
+        part = part.replace("~1", "/").replace("~0", "~")
+        node = node[int(part)] if isinstance(node, list) else node[part]
+    return node
+
+
+def _split_ref(ref: str, document: str) -> tuple[str, str]:
+    """Split a reference into the file name of the schema it refers to and the JSON pointer within it."""
+    uri, _, pointer = ref.partition("#")
+    return (Path(uri).name if uri else document), pointer
+
+
+def _get_bundle_uri(document: str, pointer: str) -> str:
+    return f"{BUNDLE_URI_PREFIX}{document}#{pointer}"
+
+
+def _dereference_document(schema: Any, document: str, schemas: dict[str, Any]) -> Any:
+    """Dereference a whole schema, keeping its top level intact so that what's within it can still be referred to."""
+    if not isinstance(schema, dict):
+        return schema
+    bundled = {k: _dereference(v, document, schemas, ()) for k, v in schema.items() if k != "$ref"}
+    if isinstance(schema.get("$ref"), str):
+        bundled["$ref"] = _get_bundle_uri(*_split_ref(schema["$ref"], document))
+    return bundled
+
+
+def _dereference(node: Any, document: str, schemas: dict[str, Any], resolving: tuple[tuple[str, str], ...]) -> Any:
+    """Copy a schema node with its references replaced by what they refer to, recursively.
 
+    As in draft-07, which the schemas use, any keywords alongside a $ref are ignored, so the node is replaced whole.
 
-def _get_registry():
-    return Registry(retrieve=_retrieve_from_filesystem)
+    Args:
+        node (Any): Schema node.
+        document (str): File name of the schema the node is in, which its references are relative to.
+        schemas (dict[str, Any]): Every schema of the version, keyed by file name.
+        resolving (tuple[tuple[str, str], ...]): References being inlined above this node, to detect cycles.
+    """
+    if isinstance(node, list):
+        return [_dereference(x, document, schemas, resolving) for x in node]
+    if not isinstance(node, dict):
+        return node
+    ref = node.get("$ref")
+    if not isinstance(ref, str):
+        return {k: _dereference(v, document, schemas, resolving) for k, v in node.items()}
+
+    target = _split_ref(ref, document)
+    if target in resolving or (target[1] and not target[1].startswith("/")):
+        # Circular references can't be inlined, and anchors can't be looked up here, so point them at the bundle's
+        # copy of the schema instead
+        return {**node, "$ref": _get_bundle_uri(*target)}
+    try:
+        resolved = _resolve_pointer(schemas[target[0]], target[1])
+    except (KeyError, IndexError, ValueError, TypeError) as e:
+        raise ValueError(f"Unable to resolve reference {ref} in {document}") from e
+    return _dereference(resolved, target[0], schemas, (*resolving, target))
+
+
+def build_schema_bundle(version: str = DEFAULT_SCHEMA_VERSION) -> dict[str, Any]:
+    """Builds the bundle of a schema version, each of its schemas with the references between them inlined.
+
+    Args:
+        version (str, optional): Schema version, defaults to DEFAULT_SCHEMA_VERSION.
+
+    Raises:
+        FileNotFoundError: Raised if there are no schemas for the version.
+
+    Returns:
+        dict[str, Any]: Bundle, with the dereferenced schemas keyed by file name, the fingerprint of the schema files
+            and the size and modification time of each, to tell when it is stale.
+    """
+    schema_dir = _get_schema_dir(version)
+    sources = _get_schema_sources(version)
+    if not sources:
+        raise FileNotFoundError(f"No schemas found for version {version} in {schema_dir}")
+
+    digest = hashlib.sha256()
+    schemas = {}
+    for name in sources:
+        content = (schema_dir / name).read_bytes()
+        digest.update(name.encode())
+        digest.update(content)
+        schemas[name] = parse_json(content)
+    return {
+        "format_version": SCHEMA_BUNDLE_FORMAT_VERSION,
+        "version": version,
+        "fingerprint": digest.hexdigest(),
+        "sources": sources,
+        "schemas": {name: _dereference_document(schema, name, schemas) for name, schema in schemas.items()},
+    }
+
+
+def _read_bundle(bundle_file: Path) -> dict[str, Any] | None:
+    try:
+        bundle = load_json(bundle_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(bundle, dict) or bundle.get("format_version") != SCHEMA_BUNDLE_FORMAT_VERSION:
+        return None
+    return bundle
+
+
+def _write_bundle(bundle_file: Path, bundle: dict[str, Any]):
+    """Write a bundle, via a temporary file so that other processes never read a partial one."""
+    temp_file = bundle_file.with_name(f"{bundle_file.name}.{os.getpid()}.tmp")
+    try:
+        bundle_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file.write_text(json.dumps(bundle, separators=(",", ":")))
+        os.replace(temp_file, bundle_file)
+    except OSError:
+        # The bundle is only a cache, so carry on without saving it, e.g. if the cache directory is read-only
+        temp_file.unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def get_schema_bundle(version: str = DEFAULT_SCHEMA_VERSION) -> dict[str, Any]:
+    """Gets the bundle of a schema version, see build_schema_bundle.
+
+    Bundles are built on first use and saved, in ARGO_SCHEMA_BUNDLE_DIR or the user's cache directory, so that later
+    runs load each version in a single read. A saved bundle is rebuilt once any of the version's schema files change.
+
+    Args:
+        version (str, optional): Schema version, defaults to DEFAULT_SCHEMA_VERSION.
+
+    Returns:
+        dict[str, Any]: The bundle.
+    """
+    if not BUNDLE_VERSION_REGEX.fullmatch(version):
+        return build_schema_bundle(version)
+
+    bundle_file = _get_bundle_dir() / f"{version}.json"
+    bundle = _read_bundle(bundle_file)
+    if bundle is not None and bundle.get("version") == version and bundle["sources"] == _get_schema_sources(version):
+        return bundle
+    bundle = build_schema_bundle(version)
+    _write_bundle(bundle_file, bundle)
+    return bundle
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def _get_bundle_registry(version: str = DEFAULT_SCHEMA_VERSION) -> Registry:
+    """Gets a registry of a version's bundled schemas, for any references that couldn't be inlined.
+
+    There is no retrieval of schemas, so nothing is read from disk as references are resolved.
+    """
+    schemas = get_schema_bundle(version)["schemas"]
+    return Registry().with_resources(
+        (f"{BUNDLE_URI_PREFIX}{name}", Resource.from_contents(schema, default_specification=DRAFT7))
+        for name, schema in schemas.items()
+    )
+
+
+def _find_vocab_fields(node: Any, fields: dict[str, list[str]]):
+    if isinstance(node, dict):
+        for name, sub_schema in (node.get("properties") or {}).items():
+            if not isinstance(sub_schema, dict):
+                continue
+            # Vocab fields are either a single string or an array of them
+            for field_schema in [sub_schema, sub_schema.get("items")]:
+                if isinstance(field_schema, dict) and (
+                    match := VOCAB_PATTERN_REGEX.match(field_schema.get("pattern", ""))
+                ):
+                    fields[name] = sorted(set(fields.get(name, [])) | set(match.group(1).split("|")))
+        for value in node.values():
+            _find_vocab_fields(value, fields)
+    elif isinstance(node, list):
+        for value in node:
+            _find_vocab_fields(value, fields)
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def get_vocab_field_collections(version: str = DEFAULT_SCHEMA_VERSION) -> dict[str, list[str]]:
+    """Gets which vocabs each field is allowed to take terms from, based on the SDN patterns in the schemas.
+
+    Args:
+        version (str, optional): Schema version, defaults to DEFAULT_SCHEMA_VERSION.
+
+    Returns:
+        dict[str, list[str]]: Vocab names keyed by field name, e.g. {"SENSOR_MODEL": ["L22", "R27"]}.
+    """
+    fields: dict[str, list[str]] = {}
+    for schema in get_schema_bundle(version)["schemas"].values():
+        _find_vocab_fields(schema, fields)
+    return fields
 
 
 def infer_schema_from_data(data: dict) -> str:
@@ -85,9 +308,15 @@ def infer_version_from_data(data: dict) -> str:
     return DEFAULT_SCHEMA_VERSION
 
 
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
 def get_json_validator(schema_type: str, version: str = DEFAULT_SCHEMA_VERSION) -> Validator:
     """Returns a jsonschema Validator for the given schema version.
 
+    The schema is taken from the version's bundle, see get_schema_bundle, so its references to the version's other
+    schemas are already inlined. Validators are cached by (schema_type, version) for the life of the process, the
+    least recently used being evicted once VALIDATOR_CACHE_SIZE is reached. Use clear_schema_cache to drop them
+    explicitly.
+
     Args:
         schema_type (str): Which schema type, e.g. float, sensor.
         version (str, optional): Schema version, defaults to DEFAULT_SCHEMA_VERSION.
@@ -96,9 +325,187 @@ def get_json_validator(schema_type: str, version: str = DEFAULT_SCHEMA_VERSION)
         Validator: validator with the appropriate schema loaded in.
     """
     schema_file = _get_schema_file(schema_type, version)
-    schema = load_json(schema_file)
-    registry = _get_registry()
+    schemas = get_schema_bundle(version)["schemas"]
+    if schema_file.name not in schemas:
+        raise FileNotFoundError(f"No {schema_type} schema found for version {version}")
+    schema = schemas[schema_file.name]
+    registry = _get_bundle_registry(version)
 
     validator_cls = jsonschema.validators.validator_for(schema)
     validator: Validator = validator_cls(schema, registry=registry)
     return validator
+
+
+def _resolve_bundle_ref(schemas: dict[str, Any], ref: str) -> Any:
+    """Gets the part of a bundle's schemas that a reference left in the bundle refers to."""
+    if not ref.startswith(BUNDLE_URI_PREFIX):
+        raise UnsupportedSchemaError(f"Unable to resolve reference {ref}")
+    document, pointer = _split_ref(ref.removeprefix(BUNDLE_URI_PREFIX), "")
+    if pointer and not pointer.startswith("/"):
+        raise UnsupportedSchemaError(f"Anchors aren't supported, unable to resolve reference {ref}")
+    try:
+        return _resolve_pointer(schemas[document], pointer)
+    except (KeyError, IndexError, ValueError, TypeError) as e:
+        raise UnsupportedSchemaError(f"Unable to resolve reference {ref}") from e
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def get_compiled_validator(schema_type: str, version: str = DEFAULT_SCHEMA_VERSION) -> CompiledValidator | Validator:
+    """Returns a validator for the given schema version, compiled into Python functions specialised to the schema.
+
+    It finds the same errors as the validator from get_json_validator, with the same messages and paths, but is
+    faster. Schemas that the compiler doesn't support get the jsonschema validator instead. Cached in the same way as
+    get_json_validator.
+
+    Args:
+        schema_type (str): Which schema type, e.g. float, sensor.
+        version (str, optional): Schema version, defaults to DEFAULT_SCHEMA_VERSION.
+
+    Returns:
+        CompiledValidator | Validator: validator with the appropriate schema compiled in.
+    """
+    validator = get_json_validator(schema_type, version)
+    if not isinstance(validator, jsonschema.Draft7Validator):
+        return validator
+    try:
+        return CompiledValidator(validator.schema, partial(_resolve_bundle_ref, get_schema_bundle(version)["schemas"]))
+    except UnsupportedSchemaError:
+        return validator
+
+
+def get_schema_validator(
+    schema_type: str, version: str = DEFAULT_SCHEMA_VERSION, engine: str = JSONSCHEMA_ENGINE
+) -> CompiledValidator | Validator:
+    """Returns a validator for the given schema version from one of the SCHEMA_ENGINES.
+
+    Args:
+        schema_type (str): Which schema type, e.g. float, sensor.
+        version (str, optional): Schema version, defaults to DEFAULT_SCHEMA_VERSION.
+        engine (str, optional): Which engine validates, one of SCHEMA_ENGINES. Defaults to JSONSCHEMA_ENGINE.
+
+    Raises:
+        ValueError: Raised if the engine is unknown.
+
+    Returns:
+        CompiledValidator | Validator: validator with the appropriate schema loaded in.
+    """
+    if engine == JSONSCHEMA_ENGINE:
+        return get_json_validator(schema_type, version)
+    if engine == COMPILED_ENGINE:
+        return get_compiled_validator(schema_type, version)
+    raise ValueError(f"Unknown schema engine {engine}, expected one of {', '.join(SCHEMA_ENGINES)}")
+
+
+class StreamedArray(NamedTuple):
+    """How to validate an array of a document one element at a time, see get_stream_plan."""
+
+    items: CompiledValidator | Validator  # Validator of each element
+    min_items: int
+    unique_items: bool
+    keywords: tuple[str, ...]  # Keywords of the array's schema, in the order their errors are found
+
+
+class StreamPlan(NamedTuple):
+    """How to validate a document whose arrays are streamed, see get_stream_plan."""
+
+    skeleton: CompiledValidator | Validator  # Validator of the document with its streamed arrays allowing anything
+    properties: tuple[str, ...]  # Properties of the schema, in the order their errors are found
+    arrays: dict[str, StreamedArray]  # Keyed by field
+
+
+def _build_validator(schema: Any, version: str, engine: str) -> CompiledValidator | Validator:
+    """Builds a validator, not cached, of part of one of a version's bundled schemas."""
+    if engine == COMPILED_ENGINE:
+        try:
+            return CompiledValidator(schema, partial(_resolve_bundle_ref, get_schema_bundle(version)["schemas"]))
+        except UnsupportedSchemaError:
+            pass
+    return jsonschema.Draft7Validator(schema, registry=_get_bundle_registry(version))
+
+
+def _get_streamed_array(schema: Any, version: str, engine: str) -> StreamedArray | None:
+    if not isinstance(schema, dict) or schema.get("type") != "array":
+        return None
+    keywords = tuple(x for x in schema if x in jsonschema.Draft7Validator.VALIDATORS)
+    items = schema.get("items", True)
+    if not set(keywords) <= _STREAMED_ARRAY_KEYWORDS or not isinstance(items, dict | bool):
+        return None
+    return StreamedArray(
+        items=_build_validator(items, version, engine),
+        min_items=schema.get("minItems", 0),
+        unique_items=schema.get("uniqueItems", False),
+        keywords=keywords,
+    )
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def get_stream_plan(
+    schema_type: str,
+    version: str = DEFAULT_SCHEMA_VERSION,
+    engine: str = JSONSCHEMA_ENGINE,
+    fields: tuple[str, ...] = (),
+) -> StreamPlan | None:
+    """Works out how to validate a document one element of its arrays at a time, finding the same errors.
+
+    The rest of the document is validated against the schema with the arrays allowing anything, and each element
+    against the schema of the array's items. The errors are then put back in the order that validating the whole
+    document finds them. This is only possible if the top level of the schema checks its properties before anything
+    else that could fail, and the arrays' schemas only check their items, minItems and uniqueItems.
+
+    Args:
+        schema_type (str): Which schema type, e.g. float, sensor.
+        version (str, optional): Schema version, defaults to DEFAULT_SCHEMA_VERSION.
+        engine (str, optional): Which engine validates, one of SCHEMA_ENGINES. Defaults to JSONSCHEMA_ENGINE.
+        fields (tuple[str, ...], optional): Top level fields to stream, if they are arrays in the schema. Others are
+            validated with the rest of the document.
+
+    Raises:
+        ValueError: Raised if the engine is unknown.
+
+    Returns:
+        StreamPlan | None: How to validate the document, or None if the schema can't be validated in parts.
+    """
+    # Also checks the engine is known
+    get_schema_validator(schema_type, version, engine)
+    validator = get_json_validator(schema_type, version)
+    schema = validator.schema
+    if not isinstance(validator, jsonschema.Draft7Validator) or not isinstance(schema, dict):
+        return None
+    keywords = [x for x in schema if x in jsonschema.Draft7Validator.VALIDATORS]
+    properties = schema.get("properties", {})
+    if (
+        schema.get("type") != "object"
+        or not isinstance(properties, dict)
+        or not set(keywords) <= {"type", "properties", *_KEY_KEYWORDS}
+        or any(x in _KEY_KEYWORDS for x in keywords[: keywords.index("properties") if properties else 0])
+    ):
+        return None
+
+    arrays = {}
+    for field in fields:
+        if array := _get_streamed_array(properties.get(field), version, engine):
+            arrays[field] = array
+    skeleton_schema = {**schema, "properties": {k: True if k in arrays else v for k, v in properties.items()}}
+    return StreamPlan(_build_validator(skeleton_schema, version, engine), tuple(properties), arrays)
+
+
+def get_schema_fingerprint(version: str = DEFAULT_SCHEMA_VERSION) -> str:
+    """Gets a hash of all the schema files of a version, which changes whenever any of them is edited.
+
+    Args:
+        version (str, optional): Schema version, defaults to DEFAULT_SCHEMA_VERSION.
+
+    Returns:
+        str: SHA-256 hash of the schema files, recorded in the version's bundle.
+    """
+    return get_schema_bundle(version)["fingerprint"]
+
+
+def clear_schema_cache():
+    """Drop all cached validators and schema information, e.g. after schema files have changed on disk."""
+    get_json_validator.cache_clear()
+    get_compiled_validator.cache_clear()
+    get_stream_plan.cache_clear()
+    get_schema_bundle.cache_clear()
+    _get_bundle_registry.cache_clear()
+    get_vocab_field_collections.cache_clear()
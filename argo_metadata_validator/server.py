@@ -0,0 +1,220 @@
+"""Long-running validation service, keeping the vocabs and schema validators loaded between requests.
+
+Start it with `argo-validate serve`, then POST documents to /validate, either a single document, named with the
+`name` query parameter, or a batch as {"documents": {name: document, ...}}. The response is the same JSON as
+`argo-validate -f`, keyed by document name. The `max_errors` query parameter limits the errors per document.
+Validate files against a running server with `argo-validate --server URL FILES`.
+"""
+
+import io
+import json
+import threading
+from collections.abc import Iterable, Iterator
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from argo_metadata_validator.models.results import ValidationError
+from argo_metadata_validator.utils import parse_json
+from argo_metadata_validator.validation import ArgoValidator, check_files_exist, load_input
+from argo_metadata_validator.writers import JsonResultsWriter
+
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
+# Name given to a single document POSTed without a name query parameter
+DEFAULT_DOCUMENT_NAME = "document"
+# Requests larger than this are rejected, rather than read into memory
+MAX_REQUEST_BYTES = 256 * 1024 * 1024
+# Number of files sent to the server in each request by the client
+CLIENT_BATCH_SIZE = 50
+CLIENT_TIMEOUT = 300
+# Error of a document that isn't a JSON object, so can't be validated against any schema
+NOT_AN_OBJECT_MESSAGE = "Document must be a JSON object"
+
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    """Handles requests to a ValidationServer, each in its own thread."""
+
+    server: "ValidationServer"
+    protocol_version = "HTTP/1.1"  # Keep connections alive between requests
+
+    def do_GET(self):
+        """Report that the server is up, at /health."""
+        if urlsplit(self.path).path != "/health":
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+            return
+        self._send_json(HTTPStatus.OK, json.dumps({"status": "ok"}).encode())
+
+    def do_POST(self):
+        """Validate the documents POSTed to /validate."""
+        url = urlsplit(self.path)
+        if url.path != "/validate":
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+            return
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+            return
+        if int(length) > MAX_REQUEST_BYTES:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Requests are limited to {MAX_REQUEST_BYTES} bytes")
+            return
+
+        query = parse_qs(url.query)
+        # Read the whole body first, even if the request is rejected, so the connection can be used for the next one
+        content = self.rfile.read(int(length))
+        try:
+            max_errors = _get_max_errors(query)
+            body = parse_json(content)
+            documents = _get_documents(body, query.get("name", [DEFAULT_DOCUMENT_NAME])[0])
+            results = {name: self._validate_document(x, max_errors) for name, x in documents.items()}
+        except (ValueError, TypeError, OSError) as e:
+            # E.g. documents that don't match the structure of any schema type, or of an unknown format_version
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except Exception as e:
+            # Always answer, rather than dropping the connection
+            self.log_error("Error validating request: %r", e)
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Internal error: {e!r}")
+            return
+        self._send_json(HTTPStatus.OK, _results_to_json(results).encode())
+
+    def _validate_document(self, document: Any, max_errors: int | None) -> list[ValidationError]:
+        if not isinstance(document, dict):
+            return [ValidationError(message=NOT_AN_OBJECT_MESSAGE)]
+        return self.server.validator.validate_json_data(document)[:max_errors]
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        self._send_json(status, json.dumps({"error": message}).encode())
+
+    def _send_json(self, status: HTTPStatus, content: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any):  # noqa: A002
+        """Only log requests if the server isn't quiet."""
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def _results_to_json(results: dict[str, list[ValidationError]]) -> str:
+    """Gets the results in the same JSON as `argo-validate -f`."""
+    stream = io.StringIO()
+    writer = JsonResultsWriter(stream)
+    for name, errors in results.items():
+        writer.write(name, errors)
+    writer.close()
+    return stream.getvalue()
+
+
+def _get_max_errors(query: dict[str, list[str]]) -> int | None:
+    """Gets the limit of errors reported per document, from the max_errors query parameter.
+
+    Raises:
+        ValueError: Raised if the limit isn't a positive integer, as 0 would report invalid documents as valid.
+    """
+    if "max_errors" not in query:
+        return None
+    value = query["max_errors"][0]
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f"max_errors must be a positive integer, not {value!r}")
+    return int(value)
+
+
+def _get_documents(body: Any, name: str) -> dict[str, Any]:
+    """Gets the documents to validate, keyed by name, from a request body."""
+    if isinstance(body, dict) and "documents" in body:
+        if not isinstance(body["documents"], dict):
+            raise ValueError("documents must be an object of documents keyed by name")
+        return body["documents"]
+    return {name: body}
+
+
+class ValidationServer(ThreadingHTTPServer):
+    """HTTP server validating documents with a shared ArgoValidator, answering requests concurrently.
+
+    The vocabs and schema validators are loaded when the server is created, so requests don't wait for them.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        validator: ArgoValidator,
+        host: str = DEFAULT_SERVER_HOST,
+        port: int = DEFAULT_SERVER_PORT,
+        quiet: bool = False,
+    ):
+        """Load everything validation needs, then bind the server.
+
+        Args:
+            validator (ArgoValidator): Validator to use for every request.
+            host (str, optional): Address to listen on. Defaults to DEFAULT_SERVER_HOST, only local connections.
+            port (int, optional): Port to listen on, 0 for any free port. Defaults to DEFAULT_SERVER_PORT.
+            quiet (bool, optional): Don't log each request. Defaults to False.
+        """
+        validator.warm()
+        self.validator = validator
+        self.quiet = quiet
+        super().__init__((host, port), ValidationRequestHandler)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_in_thread(self) -> threading.Thread:
+        """Serve requests in a background thread, until shutdown is called."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def validate_with_server(
+    url: str,
+    files: Iterable[str | Path],
+    max_errors: int | None = None,
+    fail_fast: bool = False,
+    batch_size: int = CLIENT_BATCH_SIZE,
+) -> Iterator[tuple[str, list[ValidationError]]]:
+    """Validate files with a running ValidationServer, in batches.
+
+    Args:
+        url (str): Base URL of the server.
+        files (Iterable[str | Path]): Files to validate, consumed lazily.
+        max_errors (int | None, optional): Maximum number of errors to report per file. Defaults to None, no limit.
+        fail_fast (bool, optional): Stop after the first file that has errors. Defaults to False.
+        batch_size (int, optional): Number of files to send in each request. Defaults to CLIENT_BATCH_SIZE.
+
+    Raises:
+        requests.HTTPError: Raised if the server rejects a request.
+
+    Yields:
+        Iterator[tuple[str, list[ValidationError]]]: File paths and their errors, in the order given.
+    """
+    # Only the client needs requests, so it isn't loaded by the server
+    import requests
+
+    iterator = check_files_exist(files)
+    params = {"max_errors": max_errors} if max_errors is not None else {}
+    with requests.Session() as session:
+        while batch := list(islice(iterator, batch_size)):
+            documents = {str(x): load_input(x) for x in batch}
+            response = session.post(
+                f"{url.rstrip('/')}/validate", params=params, json={"documents": documents}, timeout=CLIENT_TIMEOUT
+            )
+            if not response.ok:
+                raise requests.HTTPError(
+                    f"Validation server returned {response.status_code}: {response.text}", response=response
+                )
+            for file, result in response.json().items():
+                errors = [ValidationError(**x) for x in result["errors"]]
+                yield file, errors
+                if fail_fast and errors:
+                    return
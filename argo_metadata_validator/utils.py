@@ -1,17 +1,117 @@
 """General utilities."""
 
 import json
+import mmap
+import os
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+JSON_BACKEND_ENV_VAR = "ARGO_JSON_BACKEND"
+AUTO_JSON_BACKEND = "auto"
+
+# Files at least this large are memory-mapped rather than read into memory, if the JSON backend can parse a buffer
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+JsonLoads = Callable[[Any], Any]
+
+
+def _get_orjson_loads() -> JsonLoads:
+    import orjson
+
+    return orjson.loads
+
+
+def _get_msgspec_loads() -> JsonLoads:
+    import msgspec
+
+    return msgspec.json.decode
+
+
+def _get_stdlib_loads() -> JsonLoads:
+    return json.loads
+
+
+# Parsers that can be used by load_json, in order of preference. The optional ones are only imported when needed
+JSON_BACKENDS: dict[str, Callable[[], JsonLoads]] = {
+    "orjson": _get_orjson_loads,
+    "msgspec": _get_msgspec_loads,
+    "json": _get_stdlib_loads,
+}
+# Backends that can parse a memoryview directly, without first copying it to bytes
+BUFFER_JSON_BACKENDS = ["orjson", "msgspec"]
+
+
+@lru_cache
+def get_json_backend(backend: str | None = None) -> tuple[str, JsonLoads]:
+    """Gets the JSON parser to use.
+
+    Args:
+        backend (str | None, optional): One of JSON_BACKENDS, or "auto" for the fastest one that is installed.
+            Defaults to None, using ARGO_JSON_BACKEND if set, otherwise "auto".
+
+    Raises:
+        ValueError: Raised if the backend isn't known.
+        ImportError: Raised if a specifically requested backend isn't installed.
+
+    Returns:
+        tuple[str, JsonLoads]: Name of the backend and its parse function.
+    """
+    backend = backend or os.environ.get(JSON_BACKEND_ENV_VAR) or AUTO_JSON_BACKEND
+    if backend == AUTO_JSON_BACKEND:
+        for name, get_loads in JSON_BACKENDS.items():
+            try:
+                return name, get_loads()
+            except ImportError:
+                continue
+    if backend not in JSON_BACKENDS:
+        raise ValueError(
+            f"Unknown JSON backend {backend}. Valid options: {', '.join([AUTO_JSON_BACKEND, *JSON_BACKENDS])}"
+        )
+    return backend, JSON_BACKENDS[backend]()
+
+
+def _loads(content: Any, backend: str, loads: JsonLoads) -> Any:
+    if backend == "json":
+        return loads(content)
+    try:
+        return loads(content)
+    except Exception:
+        # The fast parsers are stricter than the standard library, e.g. rejecting NaN or a byte order mark, so fall
+        # back to it so that the same files are accepted, or rejected, whichever backend is used
+        return json.loads(bytes(content))
+
+
+def parse_json(content: bytes) -> Any:
+    """Parse JSON content with the fastest JSON backend available, see get_json_backend.
+
+    Args:
+        content (bytes): Encoded JSON.
+
+    Returns:
+        Any: Parsed JSON content.
+    """
+    backend, loads = get_json_backend()
+    return _loads(content, backend, loads)
+
 
 def load_json(file: Path) -> Any:
     """Load content from a JSON file.
 
+    The file is read as bytes, without decoding to a string first, and parsed with the fastest JSON backend available,
+    see get_json_backend. Large files are memory-mapped, if the backend supports it.
+
     Args:
         file (Path): Path to the file.
 
     Returns:
         Any: Loaded JSON content.
     """
-    return json.loads(file.read_text())
+    backend, loads = get_json_backend()
+    with open(file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD or backend not in BUFFER_JSON_BACKENDS:
+            return _loads(f.read(), backend, loads)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as content:
+            return _loads(content, backend, loads)
@@ -1,72 +1,837 @@
 """Validation functionality for ARGO metadata."""
 
-import re
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
 
 from jsonschema.exceptions import ValidationError as JsonValidationError
+from pydantic import ValidationError as PydanticValidationError
 
-from argo_metadata_validator.constants import FLOAT_SCHEMA, PLATFORM_SCHEMA, SENSOR_SCHEMA
-from argo_metadata_validator.models.float import Float
-from argo_metadata_validator.models.platform import Platform
+from argo_metadata_validator.archives import ArchiveMember, InputFile, is_archive, iter_archive_members
+from argo_metadata_validator.consistency import ConsistencyIndex, ConsistencyRecord, extract_consistency_record
+from argo_metadata_validator.constants import (
+    DEFAULT_SCHEMA_VERSION,
+    FLOAT_SCHEMA,
+    JSONSCHEMA_ENGINE,
+    PLATFORM_SCHEMA,
+    SCHEMA_ENGINES,
+    SENSOR_SCHEMA,
+)
+from argo_metadata_validator.json_stream import (
+    NotStreamableError,
+    check_streaming_available,
+    iter_json_stream,
+    read_json_array,
+    read_json_skeleton,
+)
 from argo_metadata_validator.models.results import ValidationError
-from argo_metadata_validator.models.sensor import Sensor
-from argo_metadata_validator.schema_utils import get_json_validator, infer_schema_from_data, infer_version_from_data
-from argo_metadata_validator.utils import load_json
-from argo_metadata_validator.vocab_utils import VocabTerms, expand_vocab, get_all_terms_from_argo_vocabs
+from argo_metadata_validator.profiling import (
+    STAGE_CACHE,
+    STAGE_CONSISTENCY,
+    STAGE_LOAD,
+    STAGE_PARSE,
+    STAGE_SCHEMA,
+    STAGE_VOCAB,
+    STAGE_VOCAB_FETCH,
+    ValidationHooks,
+)
+from argo_metadata_validator.result_cache import ResultCache, hash_content, hash_file
+from argo_metadata_validator.schema_compiler import freeze_json, is_unique
+from argo_metadata_validator.schema_utils import (
+    StreamedArray,
+    StreamPlan,
+    get_schema_validator,
+    get_stream_plan,
+    get_vocab_field_collections,
+    infer_schema_from_data,
+    infer_version_from_data,
+)
+from argo_metadata_validator.utils import load_json, parse_json
+from argo_metadata_validator.vocab_snapshot import DEFAULT_SNAPSHOT_TTL, VocabSnapshot, get_snapshot
+from argo_metadata_validator.vocab_utils import (
+    ALL_ARGO_VOCABS,
+    BATCHED_FETCH,
+    VOCAB_TERM_SUFFIX_PATTERN,
+    LazyVocabTerms,
+    TermStatus,
+    VocabTerms,
+    get_context_expander,
+    get_terms_from_vocabs,
+    get_vocab_dates,
+    get_vocab_from_uri,
+)
 
+if TYPE_CHECKING:
+    from argo_metadata_validator.models.float import Float
+    from argo_metadata_validator.models.platform import Platform
+    from argo_metadata_validator.models.sensor import Sensor
+    from argo_metadata_validator.schema_compiler import SchemaError
 
-def _parse_json_error(error: JsonValidationError) -> ValidationError:
+T = TypeVar("T")
+
+# Fields that hold vocab terms, keyed by the top level field they are within
+VOCAB_FIELDS: dict[str, list[str]] = {
+    "SENSORS": ["SENSOR", "SENSOR_MAKER", "SENSOR_MODEL"],
+    "PARAMETERS": ["PARAMETER", "PARAMETER_SENSOR"],
+    "PLATFORM": [
+        "DATA_TYPE",
+        "POSITIONING_SYSTEM",
+        "TRANS_SYSTEM",
+        "PLATFORM_FAMILY",
+        "PLATFORM_TYPE",
+        "PLATFORM_MAKER",
+        "WMO_INST_TYPE",
+        "CONTROLLER_BOARD_TYPE_PRIMARY",
+        "CONTROLLER_BOARD_TYPE_SECONDARY",
+    ],
+}
+
+# Top level arrays that are validated one element at a time when streaming
+STREAMED_FIELDS = ("SENSORS", "PARAMETERS")
+# Top level fields that the schema type and version are inferred from, in order of precedence
+INFO_FIELDS = ["float_info", "platform_info", "sensor_info"]
+
+# Maximum number of distinct vocab terms whose verdicts are kept, after which they are forgotten and re-resolved
+TERM_VERDICT_CACHE_SIZE = 100_000
+
+
+def _run_stage(timings: dict[str, float] | None, stage: str, func: Callable[..., T], *args) -> T:
+    """Run a stage of validation, adding its time to the timings unless they are None, i.e. timing is disabled."""
+    if timings is None:
+        return func(*args)
+    start = perf_counter()
+    try:
+        return func(*args)
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + perf_counter() - start
+
+
+def _parse_json_error(error: "JsonValidationError | SchemaError") -> ValidationError:
     return ValidationError(message=error.message, path=".".join([str(x) for x in error.path]))
 
 
+class _FileResult(NamedTuple):
+    """Errors of a file along with what they depend on, for the result cache."""
+
+    errors: list[ValidationError]
+    schema_version: str
+    vocabs: list[str]  # Vocabs the file's terms were checked against
+    timings: dict[str, float] | None = None  # Time of each stage, if being timed
+    record: ConsistencyRecord | None = None  # Keys for the consistency checks across files, if being checked
+
+
+def _iter_vocab_occurrences(
+    json_data: Any, fields: dict[str, list[str]], start: int = 0
+) -> Iterator[tuple[str, str, str]]:
+    """Yields the error path, sub-field name and value of every vocab term used in the given fields.
+
+    Items of the fields are numbered from start in the paths, e.g. for an element of a streamed array.
+    """
+    for field, sub_fields in fields.items():
+        items = json_data[field]
+        if type(items) is not list:
+            items = [items]
+        for idx, item in enumerate(items, start):
+            for x in [sub_field for sub_field in sub_fields if sub_field in item]:
+                # Sometimes dealing with lists here. Making everything a list for simplicity
+                values = item[x]
+                if not isinstance(values, list):
+                    values = [values]
+                for val in values:
+                    yield f"{field}.{idx}.{x}", x, val
+
+
+def _get_context_vocabs(json_data: Any) -> list[str]:
+    """Gets the ARGO vocabs that a document's @context refers to."""
+    vocabs = {get_vocab_from_uri(str(x)) for x in json_data["@context"].values()}
+    return [x for x in ALL_ARGO_VOCABS if x in vocabs]
+
+
+def _warm_schema_cache(engine: str = JSONSCHEMA_ENGINE):
+    for schema_type in [FLOAT_SCHEMA, PLATFORM_SCHEMA, SENSOR_SCHEMA]:
+        get_schema_validator(schema_type, version=DEFAULT_SCHEMA_VERSION, engine=engine)
+
+
+# Validator used within each worker process of a parallel validation, and whether it times each stage
+_worker_validator: "ArgoValidator | None" = None
+_worker_timed = False
+
+
+def _init_worker(
+    vocabs: dict[str, VocabTerms], max_errors: int | None, timed: bool, schema_engine: str, streaming: bool
+):
+    """Set up a worker process once, with the vocab terms already loaded by the parent and compiled schemas."""
+    global _worker_validator, _worker_timed
+    _worker_validator = ArgoValidator(max_errors=max_errors, schema_engine=schema_engine, streaming=streaming)
+    _worker_validator.argo_vocabs = LazyVocabTerms(_worker_validator._load_vocabs, vocabs)
+    _worker_timed = timed
+    _warm_schema_cache(schema_engine)
+
+
+def load_input(file: InputFile) -> Any:
+    """Load the JSON of a file, or of an archive member already read into memory.
+
+    Args:
+        file (InputFile): File path, or archive member, e.g. from check_files_exist.
+
+    Returns:
+        Any: Parsed JSON content.
+    """
+    if isinstance(file, ArchiveMember):
+        return parse_json(file.content)
+    return load_json(file)
+
+
+def _hash_input(file: InputFile) -> str:
+    """Gets the hash of the content of a file, or of an archive member, for the result cache."""
+    if isinstance(file, ArchiveMember):
+        return hash_content(file.content)
+    return hash_file(file)
+
+
+def _validate_files_in_worker(files: tuple[InputFile, ...], with_records: bool = False) -> list[_FileResult]:
+    assert _worker_validator is not None
+    results = []
+    for file in files:
+        # Timings are sent back with the results, for the parent process to pass to its hooks
+        timings: dict[str, float] | None = {} if _worker_timed else None
+        result, json_data = _worker_validator._validate_content(file, None, timings, keep_data=with_records)
+        if with_records:
+            # Only the keys are sent back for the consistency checks, not the whole document
+            result = result._replace(
+                record=_run_stage(timings, STAGE_CONSISTENCY, extract_consistency_record, json_data)
+            )
+        results.append(result)
+    return results
+
+
+class _StreamedArrayState:
+    """What is kept of a streamed array while its elements go by, a hash of each rather than the elements."""
+
+    def __init__(self, field: str, array: StreamedArray):
+        """Start before the first element."""
+        self.field = field
+        self.array = array
+        self.length = 0
+        self.head: list[Any] = []  # First elements, as many as minItems, for its error message
+        self.hashes: set[int] = set()
+        self.maybe_duplicates = False  # Whether elements with the same hash were seen, to check uniqueItems
+        self.item_errors: list[ValidationError] = []
+        self.vocab_errors: list[ValidationError] = []
+
+    def add(self, index: int, element: Any) -> list[ValidationError]:
+        """Validate an element against the schema of the array's items, returning its errors."""
+        self.length += 1
+        if len(self.head) < self.array.min_items:
+            self.head.append(element)
+        if self.array.unique_items and not self.maybe_duplicates:
+            try:
+                digest = hash(freeze_json(element))
+            except TypeError:
+                self.maybe_duplicates = True
+            else:
+                self.maybe_duplicates = digest in self.hashes
+                self.hashes.add(digest)
+        prefix = [self.field, str(index)]
+        errors = [
+            ValidationError(message=x.message, path=".".join(prefix + [str(y) for y in x.path]))
+            for x in self.array.items.iter_errors(element)
+        ]
+        self.item_errors += errors
+        return errors
+
+    def get_schema_errors(self, file: Path) -> list[ValidationError]:
+        """Gets the errors of the array once every element has been added, in the order jsonschema finds them.
+
+        Only if elements seem to be duplicated is the array read again, whole, to check them as jsonschema does.
+        """
+        errors = []
+        for keyword in self.array.keywords:
+            if keyword == "items":
+                errors += self.item_errors
+            elif keyword == "minItems" and self.length < self.array.min_items:
+                message = "should be non-empty" if self.array.min_items == 1 else "is too short"
+                errors.append(ValidationError(message=f"{self.head!r} {message}", path=self.field))
+            elif keyword == "uniqueItems" and self.array.unique_items and self.maybe_duplicates:
+                elements = read_json_array(file, self.field)
+                if not is_unique(elements):
+                    errors.append(ValidationError(message=f"{elements!r} has non-unique elements", path=self.field))
+        return errors
+
+
+class _StreamedFile:
+    """A file being validated as it is parsed, see ArgoValidator._validate_stream."""
+
+    def __init__(self, validator: "ArgoValidator", file: Path, timings: dict[str, float] | None):
+        """Start before the file is read."""
+        self.validator = validator
+        self.file = file
+        self.timings = timings
+        self.skeleton: dict[str, Any] = {}  # Top level of the document, with the streamed arrays left empty
+        self.started = False  # Whether the first element of a streamed array has been reached
+        self.schema_type = self.schema_version = ""
+        self.plan: StreamPlan | None = None
+        self.header: dict[str, Any] = {}  # What the vocab check of an element needs from the rest of the document
+        self.arrays: dict[str, _StreamedArrayState] = {}
+        self.has_errors = False  # Whether any element is invalid, after which their vocab terms aren't checked
+
+    def validate(self) -> _FileResult:
+        """Read through the file, validating each element of the streamed arrays as it is reached."""
+        entries = iter_json_stream(self.file, STREAMED_FIELDS)
+        try:
+            while (entry := _run_stage(self.timings, STAGE_LOAD, next, entries, None)) is not None:
+                field, index, value = entry
+                if index is not None:
+                    self._add_element(field, index, value)
+                elif field in self.skeleton:
+                    # Only the last of duplicated fields counts, which can't be known until the end
+                    raise NotStreamableError(f"Duplicate field {field}")
+                else:
+                    self.skeleton[field] = value
+        finally:
+            entries.close()
+        return self._finish()
+
+    def _start(self):
+        """Work out how to validate the elements, from the rest of the document, read first if it comes after them."""
+        self.started = True
+        header = self.skeleton
+        if "@context" not in header or not any(x in header for x in INFO_FIELDS):
+            header = _run_stage(self.timings, STAGE_LOAD, read_json_skeleton, self.file, STREAMED_FIELDS)
+        try:
+            self.schema_type = infer_schema_from_data(header)
+            self.schema_version = infer_version_from_data(header)
+            self.plan = get_stream_plan(
+                self.schema_type, self.schema_version, self.validator.schema_engine, STREAMED_FIELDS
+            )
+        except (ValueError, TypeError, OSError):
+            # The document is collected whole, so that validating it gives the usual errors
+            return
+        if self.plan is None or not isinstance(header.get("@context"), dict):
+            self.plan = None
+            return
+
+        info_field = next(x for x in INFO_FIELDS if x in header)
+        self.header = {"@context": header["@context"], info_field: header[info_field]}
+        self.arrays = {x: _StreamedArrayState(x, array) for x, array in self.plan.arrays.items()}
+        _run_stage(self.timings, STAGE_VOCAB, self.validator.argo_vocabs.load, _get_context_vocabs(self.header))
+
+    def _add_element(self, field: str, index: int, element: Any):
+        if not self.started:
+            self._start()
+        state = self.arrays.get(field)
+        if state is None:
+            self.skeleton[field].append(element)
+            return
+        if _run_stage(self.timings, STAGE_SCHEMA, state.add, index, element):
+            self.has_errors = True
+        elif not self.has_errors:
+            state.vocab_errors += _run_stage(
+                self.timings,
+                STAGE_VOCAB,
+                self.validator._check_vocab_terms,
+                {**self.header, field: [element]},
+                {field: VOCAB_FIELDS[field]},
+                index,
+            )
+
+    def _finish(self) -> _FileResult:
+        if self.plan is None:
+            # Nothing was streamed, so the skeleton is the whole document
+            return self.validator._validate_json_data_for_cache(self.skeleton, self.timings)
+        if any(not isinstance(self.skeleton.get(x, []), list) for x in self.arrays):
+            # A field that is usually an array isn't, so its elements weren't streamed and it wasn't validated
+            raise NotStreamableError("Streamed field isn't an array")
+        try:
+            inferred = (infer_schema_from_data(self.skeleton), infer_version_from_data(self.skeleton))
+        except (ValueError, TypeError) as e:
+            raise NotStreamableError("Schema type changed") from e
+        if inferred != (self.schema_type, self.schema_version):
+            # Only possible for documents with fields that say different things, after the streamed arrays
+            raise NotStreamableError("Schema type changed")
+
+        max_errors = self.validator.max_errors
+        errors = _run_stage(self.timings, STAGE_SCHEMA, self._get_schema_errors)
+        if errors:
+            return _FileResult(errors[:max_errors], self.schema_version, [], self.timings)
+        errors = []
+        for field, sub_fields in VOCAB_FIELDS.items():
+            if field in self.arrays:
+                errors += self.arrays[field].vocab_errors
+            elif field in self.skeleton:
+                errors += _run_stage(
+                    self.timings, STAGE_VOCAB, self.validator._check_vocab_terms, self.skeleton, {field: sub_fields}
+                )
+        return _FileResult(errors[:max_errors], self.schema_version, _get_context_vocabs(self.header), self.timings)
+
+    def _get_schema_errors(self) -> list[ValidationError]:
+        """Gets the errors of the whole document, in the same order as validating it whole."""
+        assert self.plan is not None
+        by_property: dict[str, list[ValidationError]] = {}
+        others = []
+        for error in self.plan.skeleton.iter_errors(self.skeleton):
+            if error.path:
+                by_property.setdefault(str(error.path[0]), []).append(_parse_json_error(error))
+            else:
+                others.append(_parse_json_error(error))
+        errors = []
+        for field in self.plan.properties:
+            if field in self.arrays and field in self.skeleton:
+                errors += self.arrays[field].get_schema_errors(self.file)
+            else:
+                errors += by_property.get(field, [])
+        # The plan only streams documents whose schema checks its properties before anything else
+        return errors + others
+
+
+class _PendingChunk(NamedTuple):
+    """Chunk of files being validated by a worker process, along with any results already in the cache."""
+
+    files: tuple[InputFile, ...]
+    content_hashes: list[str | None]
+    cached: list[list[ValidationError] | None]
+    timings: list[dict[str, float] | None]
+    future: Future | None  # Validating the files without a cached result
+
+
+def _chunked(items: Iterable[InputFile], size: int) -> Iterator[tuple[InputFile, ...]]:
+    iterator = iter(items)
+    while chunk := tuple(islice(iterator, size)):
+        yield chunk
+
+
+class ParseResult(NamedTuple):
+    """Result of parsing a file, with either the model or the validation errors."""
+
+    file: str
+    model: "Sensor | Float | Platform | None"
+    errors: list[ValidationError]
+
+
+def check_files_exist(files: Iterable[str | InputFile]) -> Iterator[InputFile]:
+    """Lazily check each file exists as it is reached, expanding archives into their JSON members.
+
+    Args:
+        files (Iterable[str | InputFile]): File paths, or archive members.
+
+    Raises:
+        Exception: Raised if a file doesn't exist.
+
+    Yields:
+        InputFile: Each file, or member of an archive, to validate.
+    """
+    for file in files:
+        if isinstance(file, ArchiveMember):
+            yield file
+            continue
+        file = Path(file)
+        if not file.exists():
+            raise Exception(f"Provided JSON file could not be found: {file}")
+        if is_archive(file) and file.is_file():
+            yield from iter_archive_members(file)
+        else:
+            yield file
+
+
 class ArgoValidator:
     """Validator class for ARGO metadata."""
 
-    all_json_data: dict[str, Any] = {}  # Keyed by the original filename
-    validation_errors: dict[str, list[ValidationError]] = {}  # Keyed by the original filename
-    argo_vocab_terms: VocabTerms
+    # Number of files sent to a worker process at a time when validating in parallel
+    PARALLEL_CHUNK_SIZE = 8
+
+    all_json_data: dict[str, Any] = {}  # Keyed by the file path
+    validation_errors: dict[str, list[ValidationError]] = {}  # Keyed by the file path
+    argo_vocabs: LazyVocabTerms
+
+    def __init__(
+        self,
+        vocab_snapshot: str | Path | None = None,
+        vocab_ttl: timedelta = DEFAULT_SNAPSHOT_TTL,
+        offline: bool = False,
+        vocab_fetch_mode: str = BATCHED_FETCH,
+        max_errors: int | None = None,
+        result_cache: str | Path | ResultCache | None = None,
+        hooks: Iterable[ValidationHooks] = (),
+        schema_engine: str = JSONSCHEMA_ENGINE,
+        streaming: bool = False,
+    ):
+        """Initialise the validator, ARGO vocab terms are loaded per vocab the first time each is needed.
+
+        Args:
+            vocab_snapshot (str | Path | None, optional): Local snapshot file of the NVS vocab terms, created or
+                refreshed as needed. If None the terms are fetched from NVS.
+            vocab_ttl (timedelta, optional): Age after which the snapshot is refreshed. Defaults to 24 hours.
+            offline (bool, optional): Only use the local snapshot, never contact NVS. Defaults to False.
+            vocab_fetch_mode (str, optional): How to query NVS, one of FETCH_MODES. Defaults to BATCHED_FETCH.
+            max_errors (int | None, optional): Stop checking a file once it has this many errors. Defaults to None,
+                collecting every error.
+            result_cache (str | Path | ResultCache | None, optional): Cache, or its SQLite file, of earlier results.
+                Files that are unchanged since they were cached, and whose schema and vocabs are unchanged, aren't
+                validated again. Defaults to None, validating every file.
+            hooks (Iterable[ValidationHooks], optional): Hooks to receive the time of each stage and file, e.g. a
+                ValidationProfiler. Stages are only timed if there are hooks. Defaults to none.
+            schema_engine (str, optional): Which engine applies the JSON schemas, one of SCHEMA_ENGINES. The compiled
+                engine finds the same errors as jsonschema, but faster. Defaults to JSONSCHEMA_ENGINE.
+            streaming (bool, optional): Have iter_validate parse each file incrementally, validating the elements of
+                its SENSORS and PARAMETERS one at a time, so memory use is bounded by the size of an element rather
+                than of the file. The same errors are found. Needs ijson. Defaults to False, loading each file whole.
+
+        Raises:
+            ValueError: Raised if the schema engine is unknown.
+            ImportError: Raised if streaming but ijson isn't installed.
+        """
+        if schema_engine not in SCHEMA_ENGINES:
+            raise ValueError(f"Unknown schema engine {schema_engine}, expected one of {', '.join(SCHEMA_ENGINES)}")
+        if streaming:
+            check_streaming_available()
+        self.schema_engine = schema_engine
+        self.streaming = streaming
+        self.hooks = list(hooks)
+        self.max_errors = max_errors
+        self.result_cache = ResultCache(result_cache) if isinstance(result_cache, str | Path) else result_cache
+        self.vocab_snapshot_path = Path(vocab_snapshot) if vocab_snapshot is not None else None
+        self.vocab_ttl = vocab_ttl
+        self.offline = offline
+        self.vocab_fetch_mode = vocab_fetch_mode
+        self._vocab_snapshot: VocabSnapshot | None = None
+        self._vocab_dates: dict[str, str] | None = None
+        self._term_verdicts: dict[tuple, tuple[str, TermStatus]] = {}  # Expanded URI and status of each term seen
+        self._term_verdicts_source: LazyVocabTerms | None = None
+        self.argo_vocabs = LazyVocabTerms(self._load_vocabs)
 
-    def __init__(self):
-        """Initialise by pre-loading the ARGO vocab terms."""
-        self.argo_vocab_terms = get_all_terms_from_argo_vocabs()
+    def warm(self):
+        """Load every vocab and build the schema validators up front, rather than when first needed."""
+        self.argo_vocabs.load(ALL_ARGO_VOCABS)
+        _warm_schema_cache(self.schema_engine)
+
+    @property
+    def argo_vocab_terms(self) -> VocabTerms:
+        """Combined terms of all the ARGO vocabs, loading any that haven't been needed yet."""
+        return self.argo_vocabs.get_all_terms()
+
+    def _uses_snapshot(self) -> bool:
+        return self.vocab_snapshot_path is not None or self.offline
+
+    def _get_vocab_snapshot(self) -> VocabSnapshot:
+        if self._vocab_snapshot is None:
+            self._vocab_snapshot = get_snapshot(
+                self.vocab_snapshot_path, ttl=self.vocab_ttl, offline=self.offline, fetch_mode=self.vocab_fetch_mode
+            )
+        return self._vocab_snapshot
+
+    def _load_vocabs(self, vocabs: list[str]) -> dict[str, VocabTerms]:
+        timings: dict[str, float] | None = {} if self.hooks else None
+        terms = _run_stage(timings, STAGE_VOCAB_FETCH, self._fetch_vocabs, vocabs)
+        if timings is not None:
+            self._report_stages(timings)
+        return terms
+
+    def _fetch_vocabs(self, vocabs: list[str]) -> dict[str, VocabTerms]:
+        if not self._uses_snapshot():
+            return get_terms_from_vocabs(vocabs, fetch_mode=self.vocab_fetch_mode)
+        snapshot = self._get_vocab_snapshot()
+        return {x: snapshot.vocabs.get(x, VocabTerms(active=[], deprecated=[])) for x in vocabs}
+
+    def _get_vocab_dates(self) -> dict[str, str]:
+        """Gets the last-modified date of each vocab the terms come from, fetched at most once."""
+        if self._vocab_dates is None:
+            if self._uses_snapshot():
+                self._vocab_dates = self._get_vocab_snapshot().vocab_dates
+            else:
+                self._vocab_dates = get_vocab_dates(ALL_ARGO_VOCABS)
+        return self._vocab_dates
 
     def load_json_data(self, json_files: list[str]):
         """Take a list of JSON files and load content into memory.
 
         Args:
-            json_files (list[str]): List of file paths.
+            json_files (list[str]): List of file paths, archives are expanded into their JSON members.
         """
-        json_file_paths = [Path(x) for x in json_files]
-
         self.all_json_data = {}
-        for file in json_file_paths:
-            if not file.exists():
-                raise Exception(f"Provided JSON file could not be found: {file}")
-
+        for file in check_files_exist(json_files):
             # Load the JSON into memory
-            self.all_json_data[file.name] = load_json(file)
+            self.all_json_data[str(file)] = load_input(file)
 
-    def validate(self, json_files: list[str]) -> dict[str, list[ValidationError]]:
+    def validate(self, json_files: list[str], jobs: int = 1) -> dict[str, list[ValidationError]]:
         """Takes a list of JSON files and validates each.
 
+        The JSON data of each file is kept in all_json_data, unless validating in parallel or with a result cache,
+        where files are only loaded if their result isn't cached.
+
         Args:
             json_files (list[str]): List of file paths.
+            jobs (int, optional): Number of processes to validate with, 0 to use all CPU cores. Defaults to 1.
 
         Returns:
-            dict[str, list[str]]: Errors, keyed by the input filename.
+            dict[str, list[str]]: Errors, keyed by the input file path.
         """
-        self.load_json_data(json_files)
+        if jobs != 1 and len(json_files) > 1:
+            return self._validate_parallel(json_files, jobs or os.cpu_count() or 1)
+
+        json_file_paths = list(check_files_exist(json_files))
 
+        self.all_json_data = {}
         self.validation_errors = {}
-        for file, json_data in self.all_json_data.items():
-            self.validation_errors[file] = self._validate_json(json_data)
+        for file in json_file_paths:
+            timings: dict[str, float] | None = {} if self.hooks else None
+            if self.result_cache is not None:
+                # Looked up by the hash of the file's bytes first, so that files with a cached result aren't parsed
+                self.validation_errors[str(file)] = self._validate_file(file, None, timings)
+                continue
+            self.all_json_data[str(file)] = json_data = _run_stage(timings, STAGE_LOAD, load_input, file)
+            self.validation_errors[str(file)] = self._validate_file(file, json_data, timings)
+        if self.result_cache is not None:
+            self.result_cache.commit()
+        return self.validation_errors
+
+    def _validate_parallel(self, json_files: list[str], jobs: int) -> dict[str, list[ValidationError]]:
+        """Validate files across a pool of processes, giving the same results, in the same order, as in serial.
 
-            if not self.validation_errors[file]:
-                self.validation_errors[file] += self._validate_vocabs(json_data)
+        The JSON data is loaded within the workers so isn't kept in all_json_data.
+        """
+        json_file_paths = list(check_files_exist(json_files))
+
+        self.all_json_data = {}
+        try:
+            self.validation_errors = dict(self._iter_validate_parallel(json_file_paths, jobs))
+        finally:
+            if self.result_cache is not None:
+                self.result_cache.commit()
         return self.validation_errors
 
-    def parse(self, json_file: str) -> Sensor | Float | Platform:
+    def iter_validate(
+        self,
+        json_files: Iterable[str | Path],
+        jobs: int = 1,
+        fail_fast: bool = False,
+        consistency: ConsistencyIndex | None = None,
+    ) -> Iterator[tuple[str, list[ValidationError]]]:
+        """Validate files one at a time, yielding the errors for each as soon as it is done.
+
+        Unlike validate, neither the JSON data nor the errors are kept, so memory use doesn't grow with the number
+        of files. The files can be a lazy iterable, which is only consumed as validation progresses.
+
+        Args:
+            json_files (Iterable[str | Path]): File paths.
+            jobs (int, optional): Number of processes to validate with, 0 to use all CPU cores. Defaults to 1.
+            fail_fast (bool, optional): Stop after the first file that has errors. Defaults to False.
+            consistency (ConsistencyIndex | None, optional): Index to add each file's keys to, in the same pass, for
+                the consistency checks across files. Call its conflicts method once the files are done. Defaults to
+                None, not checking consistency.
+
+        Yields:
+            tuple[str, list[ValidationError]]: File path and its errors, in the same order as the input files.
+        """
+        if jobs != 1:
+            results = self._iter_validate_parallel(
+                check_files_exist(json_files), jobs or os.cpu_count() or 1, consistency
+            )
+        else:
+            results = ((str(x), self._validate_file(x, consistency=consistency)) for x in check_files_exist(json_files))
+
+        try:
+            for file, errors in results:
+                yield file, errors
+                if fail_fast and errors:
+                    results.close()
+                    return
+        finally:
+            if self.result_cache is not None:
+                self.result_cache.commit()
+
+    def _validate_file(
+        self,
+        file: InputFile,
+        json_data: Any = None,
+        timings: dict[str, float] | None = None,
+        consistency: ConsistencyIndex | None = None,
+    ) -> list[ValidationError]:
+        """Validate a file, reusing its cached result if there is one, loading the JSON only if needed."""
+        if timings is None and self.hooks:
+            timings = {}
+
+        if self.result_cache is None:
+            result, json_data = self._validate_content(file, json_data, timings, keep_data=consistency is not None)
+            errors = result.errors
+        else:
+            content_hash = _run_stage(timings, STAGE_CACHE, _hash_input, file)
+            errors = _run_stage(
+                timings, STAGE_CACHE, self.result_cache.get, content_hash, self.max_errors, self._get_vocab_dates
+            )
+            if errors is None:
+                result, json_data = self._validate_content(file, json_data, timings, keep_data=consistency is not None)
+                self._cache_result(content_hash, result)
+                errors = result.errors
+
+        if consistency is not None:
+            self._index_file(consistency, file, json_data, timings)
+        if timings is not None:
+            self._report_file(str(file), timings)
+        return errors
+
+    def _validate_content(
+        self, file: InputFile, json_data: Any, timings: dict[str, float] | None, keep_data: bool = False
+    ) -> tuple[_FileResult, Any]:
+        """Validate a file, streaming it if enabled, unless it is already loaded or the loaded data is to be kept.
+
+        Returns:
+            tuple[_FileResult, Any]: Result, and the JSON data, None if the file was streamed.
+        """
+        # Archive members are already in memory, so there is nothing to gain from streaming them
+        if json_data is None and self.streaming and not keep_data and not isinstance(file, ArchiveMember):
+            return self._validate_stream(file, timings), None
+        if json_data is None:
+            json_data = _run_stage(timings, STAGE_LOAD, load_input, file)
+        return self._validate_json_data_for_cache(json_data, timings), json_data
+
+    def _validate_stream(self, file: Path, timings: dict[str, float] | None = None) -> _FileResult:
+        """Validate a file as it is parsed, finding the same errors as validating it whole.
+
+        The elements of its STREAMED_FIELDS are validated one at a time, against the schema of the array's items, with
+        their vocab terms checked while they are in memory. Only the rest of the document, and a hash of each element
+        for uniqueItems, is kept until the end. Files that can't be streamed, e.g. as they aren't valid JSON or the
+        schema doesn't allow it, are loaded whole instead.
+        """
+        try:
+            return _StreamedFile(self, file, timings).validate()
+        except NotStreamableError:
+            json_data = _run_stage(timings, STAGE_LOAD, load_input, file)
+            return self._validate_json_data_for_cache(json_data, timings)
+
+    @staticmethod
+    def _index_file(consistency: ConsistencyIndex, file: InputFile, json_data: Any, timings: dict[str, float] | None):
+        """Add a file to the consistency index, loading it if it wasn't, e.g. as its result was in the cache."""
+        if json_data is None:
+            json_data = _run_stage(timings, STAGE_LOAD, load_input, file)
+        _run_stage(timings, STAGE_CONSISTENCY, consistency.add, str(file), json_data)
+
+    def _report_stages(self, timings: dict[str, float], file: str | None = None):
+        for stage, seconds in timings.items():
+            for hook in self.hooks:
+                hook.on_stage(stage, seconds, file)
+
+    def _report_file(self, file: str, timings: dict[str, float]):
+        self._report_stages(timings, file)
+        seconds = sum(timings.values())
+        for hook in self.hooks:
+            hook.on_file(file, seconds, timings)
+
+    def _cache_result(self, content_hash: str, result: _FileResult):
+        assert self.result_cache is not None
+        self.result_cache.put(
+            content_hash, self.max_errors, result.schema_version, result.vocabs, result.errors, self._get_vocab_dates
+        )
+
+    def _iter_validate_parallel(
+        self, json_file_paths: Iterable[InputFile], jobs: int, consistency: ConsistencyIndex | None = None
+    ) -> Iterator[tuple[str, list[ValidationError]]]:
+        # Workers are given every vocab up front so none of them has to fetch from NVS
+        self.warm()
+
+        # Only a few chunks per worker are in flight at once, so the input is consumed lazily and results are
+        # yielded in order as they complete
+        pending: deque[_PendingChunk] = deque()
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(
+                self.argo_vocabs.get_loaded(),
+                self.max_errors,
+                bool(self.hooks),
+                self.schema_engine,
+                self.streaming,
+            ),
+        ) as executor:
+            try:
+                for chunk in _chunked(json_file_paths, self.PARALLEL_CHUNK_SIZE):
+                    pending.append(self._submit_chunk(executor, chunk, consistency is not None))
+                    if len(pending) >= jobs * 4:
+                        yield from self._collect_chunk(pending.popleft(), consistency)
+                while pending:
+                    yield from self._collect_chunk(pending.popleft(), consistency)
+            finally:
+                # If the caller stops early, don't wait for the chunks it will never see
+                for x in pending:
+                    if x.future is not None:
+                        x.future.cancel()
+
+    def _submit_chunk(
+        self, executor: ProcessPoolExecutor, chunk: tuple[InputFile, ...], with_records: bool = False
+    ) -> _PendingChunk:
+        """Send the files of a chunk that don't have a cached result to a worker."""
+        timings: list[dict[str, float] | None] = [{} if self.hooks else None for _ in chunk]
+        if self.result_cache is None:
+            future = executor.submit(_validate_files_in_worker, chunk, with_records)
+            return _PendingChunk(chunk, [None] * len(chunk), [None] * len(chunk), timings, future)
+
+        cache = self.result_cache
+        content_hashes: list[str | None] = [
+            _run_stage(x, STAGE_CACHE, _hash_input, file) for file, x in zip(chunk, timings, strict=True)
+        ]
+        cached = [
+            _run_stage(x, STAGE_CACHE, cache.get, content_hash, self.max_errors, self._get_vocab_dates)
+            for content_hash, x in zip(content_hashes, timings, strict=True)
+        ]
+        to_validate = tuple(file for file, errors in zip(chunk, cached, strict=True) if errors is None)
+        future = executor.submit(_validate_files_in_worker, to_validate, with_records) if to_validate else None
+        return _PendingChunk(chunk, content_hashes, cached, timings, future)
+
+    def _collect_chunk(
+        self, pending: _PendingChunk, consistency: ConsistencyIndex | None = None
+    ) -> Iterator[tuple[str, list[ValidationError]]]:
+        results = iter(pending.future.result() if pending.future is not None else [])
+        for file, content_hash, errors, timings in zip(
+            pending.files, pending.content_hashes, pending.cached, pending.timings, strict=True
+        ):
+            if errors is None:
+                result = next(results)
+                if content_hash is not None:
+                    self._cache_result(content_hash, result)
+                if timings is not None and result.timings:
+                    timings.update(result.timings)
+                if consistency is not None and result.record is not None:
+                    consistency.add_record(str(file), result.record)
+                errors = result.errors
+            elif consistency is not None:
+                self._index_file(consistency, file, None, timings)
+            if timings is not None:
+                self._report_file(str(file), timings)
+            yield str(file), errors
+
+    def validate_json_data(self, json_data: Any) -> list[ValidationError]:
+        """Validate already loaded JSON data, against the schema then, if that passes, the vocabs.
+
+        Args:
+            json_data (Any): JSON content to check.
+
+        Returns:
+            list[ValidationError]: List of errors.
+        """
+        timings: dict[str, float] | None = {} if self.hooks else None
+        errors = self._validate_json_data_for_cache(json_data, timings).errors
+        if timings is not None:
+            self._report_stages(timings)
+        return errors
+
+    def _validate_json_data_for_cache(self, json_data: Any, timings: dict[str, float] | None = None) -> _FileResult:
+        """Validate JSON data, also returning the schema version and vocabs that the errors depend on.
+
+        The time of each stage is added to timings, unless it is None.
+        """
+        schema_version = infer_version_from_data(json_data)
+        errors = _run_stage(timings, STAGE_SCHEMA, self._validate_json, json_data)
+        if errors:
+            return _FileResult(errors[: self.max_errors], schema_version, [], timings)
+        errors = _run_stage(timings, STAGE_VOCAB, self._validate_vocabs, json_data)
+        return _FileResult(errors[: self.max_errors], schema_version, _get_context_vocabs(json_data), timings)
+
+    def parse(self, json_file: str) -> "Sensor | Float | Platform":
         """Parses provided metadata into Pydantic models.
 
         Args:
@@ -76,19 +841,99 @@ class ArgoValidator:
             _type_: _description_
         """
         errors = self.validate([json_file])
-        errors = errors[Path(json_file).name]
+        errors = errors[str(Path(json_file))]
         if errors:
             raise Exception("Data not valid, run the validation function for detailed errors.")
 
-        data = self.all_json_data[Path(json_file).name]
-        schema_type = infer_schema_from_data(data)
-        if schema_type == SENSOR_SCHEMA:
-            return Sensor(**data)
-        if schema_type == FLOAT_SCHEMA:
-            return Float(**data)
-        if schema_type == PLATFORM_SCHEMA:
-            return Platform(**data)
-        raise Exception("Data does not match a defined Python model.")
+        timings: dict[str, float] | None = {} if self.hooks else None
+        json_data = self.all_json_data.get(str(Path(json_file)))
+        if json_data is None:
+            # Not kept if the result was cached
+            json_data = _run_stage(timings, STAGE_LOAD, load_input, Path(json_file))
+        model = _run_stage(timings, STAGE_PARSE, self.parse_json_data, json_data)
+        if timings is not None:
+            self._report_stages(timings, str(Path(json_file)))
+        return model
+
+    @staticmethod
+    def parse_json_data(json_data: Any) -> "Sensor | Float | Platform":
+        """Parses already loaded and validated JSON data into Pydantic models.
+
+        Args:
+            json_data (Any): JSON content to parse.
+
+        Returns:
+            Sensor | Float | Platform: Model matching the data's schema type.
+        """
+        # The models are only imported when parsing, as building them is a large part of the import time
+        from argo_metadata_validator.models.metadata import get_metadata_adapter
+
+        try:
+            return get_metadata_adapter().validate_python(json_data)
+        except PydanticValidationError as e:
+            if e.error_count() == 1 and e.errors()[0]["type"] == "union_tag_not_found":
+                raise Exception("Data does not match a defined Python model.") from e
+            raise
+
+    def iter_parse(self, json_files: Iterable[str | Path], trusted: bool = False) -> Iterator[ParseResult]:
+        """Validate and parse files one at a time, yielding each as soon as it is done.
+
+        Each file is loaded once, and the data that was validated is what gets parsed, unlike calling parse on each
+        file. Results from the result cache are used if there is one.
+
+        Args:
+            json_files (Iterable[str | Path]): File paths.
+            trusted (bool, optional): Skip the schema and vocab validation, for files already known to be valid. Each
+                file is then parsed straight from its bytes into a model. Defaults to False.
+
+        Yields:
+            ParseResult: Parsed model, or the validation errors if the file isn't valid, in the order of the input.
+        """
+        from argo_metadata_validator.models.metadata import get_metadata_adapter
+
+        for file in check_files_exist(json_files):
+            timings: dict[str, float] | None = {} if self.hooks else None
+            if trusted:
+                content = _run_stage(timings, STAGE_LOAD, file.read_bytes)
+                model = _run_stage(timings, STAGE_PARSE, get_metadata_adapter().validate_json, content)
+                if timings is not None:
+                    self._report_file(str(file), timings)
+                yield ParseResult(str(file), model, [])
+                continue
+
+            json_data = _run_stage(timings, STAGE_LOAD, load_input, file)
+            errors = self._validate_file(file, json_data, timings)
+            if errors:
+                yield ParseResult(str(file), None, errors)
+                continue
+            parse_timings: dict[str, float] | None = {} if self.hooks else None
+            model = _run_stage(parse_timings, STAGE_PARSE, self.parse_json_data, json_data)
+            if parse_timings is not None:
+                self._report_stages(parse_timings, str(file))
+            yield ParseResult(str(file), model, [])
+
+    def parse_many(
+        self, json_files: Iterable[str | Path], trusted: bool = False
+    ) -> "dict[str, Sensor | Float | Platform]":
+        """Validate and parse several files into Pydantic models.
+
+        Args:
+            json_files (Iterable[str | Path]): File paths.
+            trusted (bool, optional): Skip the schema and vocab validation, for files already known to be valid.
+                Defaults to False.
+
+        Raises:
+            Exception: Raised if any of the files isn't valid.
+
+        Returns:
+            dict[str, Sensor | Float | Platform]: Models keyed by the input file path.
+        """
+        models = {}
+        for result in self.iter_parse(json_files, trusted=trusted):
+            if result.model is None:
+                raise Exception(f"Data not valid in {result.file}, run the validation function for detailed errors.")
+            models[result.file] = result.model
+        return models
 
     def _validate_json(self, json_data: Any) -> list[ValidationError]:
         """Apply JSON schema validation to given JSON data.
@@ -101,13 +946,10 @@ class ArgoValidator:
         """
         schema_type = infer_schema_from_data(json_data)
         schema_version = infer_version_from_data(json_data)
-        json_validator = get_json_validator(schema_type, version=schema_version)
-
-        errors = []
+        json_validator = get_schema_validator(schema_type, version=schema_version, engine=self.schema_engine)
 
-        if not json_validator.is_valid(json_data):
-            errors = [_parse_json_error(err) for err in json_validator.iter_errors(json_data)]
-        return errors
+        # Errors are collected in a single pass, only going as far through the data as needed for max_errors
+        return [_parse_json_error(err) for err in islice(json_validator.iter_errors(json_data), self.max_errors)]
 
     def _validate_vocabs(self, json_data: Any) -> list[ValidationError]:
         """Check validity of used vocab terms in JSON data.
@@ -118,47 +960,15 @@ class ArgoValidator:
         Returns:
             list[str]: List of errors.
         """
-        validation_errors: list[ValidationError] = []
-        if "SENSORS" in json_data:
-            validation_errors += self.validate_vocab_terms(
-                json_data, "SENSORS", ["SENSOR", "SENSOR_MAKER", "SENSOR_MODEL"]
-            )
-        if "PARAMETERS" in json_data:
-            validation_errors += self.validate_vocab_terms(json_data, "PARAMETERS", ["PARAMETER", "PARAMETER_SENSOR"])
-        if "PLATFORM" in json_data:
-            validation_errors += self.validate_vocab_terms(
-                json_data,
-                "PLATFORM",
-                [
-                    "DATA_TYPE",
-                    "POSITIONING_SYSTEM",
-                    "TRANS_SYSTEM",
-                    "PLATFORM_FAMILY",
-                    "PLATFORM_TYPE",
-                    "PLATFORM_MAKER",
-                    "WMO_INST_TYPE",
-                    "CONTROLLER_BOARD_TYPE_PRIMARY",
-                    "CONTROLLER_BOARD_TYPE_SECONDARY",
-                ],
-            )
-        return validation_errors
-
-    def _is_term_found(self, uri: str, term_list: list[str]):
-        if uri in term_list:
-            return True
-        if re.search(r"_\d+\/$", uri):
-            # Check if this was a duplicate term (_N added to end)
-            unduplicate_uri = re.sub(r"_\d+\/$", "/", uri)
-            return unduplicate_uri in term_list
-        else:
-            # No _N at the end so can't be a duplicate term
-            return False
+        # Load every vocab the document's context refers to in one go, rather than one at a time as terms are checked
+        self.argo_vocabs.load(_get_context_vocabs(json_data))
+        return self._check_vocab_terms(json_data, {k: v for k, v in VOCAB_FIELDS.items() if k in json_data})
 
     def _is_active_term(self, uri: str):
-        return self._is_term_found(uri, self.argo_vocab_terms.active)
+        return self.argo_vocabs.status(uri) == TermStatus.ACTIVE
 
     def _is_deprecated_term(self, uri: str):
-        return self._is_term_found(uri, self.argo_vocab_terms.deprecated)
+        return self.argo_vocabs.status(uri) == TermStatus.DEPRECATED
 
     def validate_vocab_terms(self, json_data: Any, field: str, sub_fields: list[str]) -> list[ValidationError]:
         """Check that specific fields in the JSON match ARGO vocab terms.
@@ -171,28 +981,46 @@ class ArgoValidator:
         Returns:
             list[str]: List of errors.
         """
-        context = json_data["@context"]
+        return self._check_vocab_terms(json_data, {field: sub_fields})
 
-        errors = []
+    def _check_vocab_terms(self, json_data: Any, fields: dict[str, list[str]], start: int = 0) -> list[ValidationError]:
+        """Check the vocab terms in the given fields, each distinct term being resolved once per validator.
 
-        items = json_data[field]
-        if type(items) is not list:
-            items = [items]
+        The same few terms are used over and over across a batch of files, so the verdict for each (context, schema
+        version, field, value) is kept and fanned back out to every place it is used, in this file or later ones.
+        This happens in the same way whether validating in serial or within each worker process. Items of the fields
+        are numbered from start in the error paths.
+        """
+        expand = get_context_expander(json_data["@context"])
+        schema_version = infer_version_from_data(json_data)
+        # The expander is shared by documents with the same context, so stands in for it
+        context_key = (expand, schema_version)
+        field_collections = get_vocab_field_collections(schema_version)
 
-        for idx, item in enumerate(items):
-            for x in [field for field in sub_fields if field in item]:
-                # Sometimes dealing with lists here. Making everything a list for simplicity
-                values = item[x]
-                if not isinstance(values, list):
-                    values = [values]
-                for val in values:
-                    # Vocab terms can have optional text enclosed in square brackets
-                    val = re.sub(r"\s+\[\w+\]", "", val)
-                    val = expand_vocab(context, val)
-                    if not self._is_active_term(val):
-                        if self._is_deprecated_term(val):
-                            error = ValidationError(message=f"Deprecated NSV term: {val}", path=f"{field}.{idx}.{x}")
-                        else:
-                            error = ValidationError(message=f"Unknown NSV term: {val}", path=f"{field}.{idx}.{x}")
-                        errors.append(error)
+        occurrences = list(_iter_vocab_occurrences(json_data, fields, start))
+        # Verdicts only hold for the terms they were resolved against, which can be replaced, e.g. in worker processes
+        cache = self._term_verdicts
+        if self._term_verdicts_source is not self.argo_vocabs or len(cache) > TERM_VERDICT_CACHE_SIZE:
+            self._term_verdicts = cache = {}
+            self._term_verdicts_source = self.argo_vocabs
+        # The verdicts of this call are only read back from a local dict, as the shared cache can be replaced by
+        # another thread, e.g. of the validation server, part way through
+        verdicts: dict[tuple, tuple[str, TermStatus]] = {}
+        for _, sub_field, value in occurrences:
+            key = (context_key, sub_field, value)
+            if key in verdicts:
+                continue
+            verdict = cache.get(key)
+            if verdict is None:
+                uri = expand(VOCAB_TERM_SUFFIX_PATTERN.sub("", value))
+                verdict = cache[key] = (uri, self.argo_vocabs.status(uri, field_collections.get(sub_field)))
+            verdicts[key] = verdict
+
+        errors = []
+        for path, sub_field, value in occurrences:
+            uri, status = verdicts[(context_key, sub_field, value)]
+            if status == TermStatus.DEPRECATED:
+                errors.append(ValidationError(message=f"Deprecated NSV term: {uri}", path=path))
+            elif status == TermStatus.UNKNOWN:
+                errors.append(ValidationError(message=f"Unknown NSV term: {uri}", path=path))
         return errors
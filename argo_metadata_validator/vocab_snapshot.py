@@ -0,0 +1,191 @@
+"""Persistent local snapshot of the NVS vocab terms, so they don't have to be re-fetched on every run."""
+
+import os
+import warnings
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+from argo_metadata_validator.constants import BATCHED_FETCH, DEFAULT_SNAPSHOT_TTL
+from argo_metadata_validator.exceptions import VocabSnapshotNotFoundError
+from argo_metadata_validator.vocab_utils import (
+    ALL_ARGO_VOCABS,
+    VocabTerms,
+    get_all_terms_from_argo_vocabs,
+    get_terms_from_vocabs,
+    get_vocab_dates,
+)
+
+# Bump if the structure of the snapshot file changes, older snapshots are then ignored and rebuilt
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_PATH_ENV_VAR = "ARGO_VOCAB_SNAPSHOT"
+
+
+class VocabSnapshot(BaseModel):
+    """Model for the snapshot file of fetched NVS vocab terms."""
+
+    format_version: int = SNAPSHOT_FORMAT_VERSION
+    fetched_at: datetime
+    vocabs: dict[str, VocabTerms]  # Keyed by vocab name, e.g. R03
+    vocab_dates: dict[str, str] = {}  # Last-modified date reported by NVS when each vocab was fetched
+
+    def is_expired(self, ttl: timedelta) -> bool:
+        """Whether the snapshot is older than the given time-to-live."""
+        return datetime.now(UTC) - self.fetched_at > ttl
+
+    def get_terms(self) -> VocabTerms:
+        """Combine the terms of all the vocabs in the snapshot."""
+        terms = VocabTerms(active=[], deprecated=[])
+        for vocab in ALL_ARGO_VOCABS:
+            if vocab in self.vocabs:
+                terms.active += self.vocabs[vocab].active
+                terms.deprecated += self.vocabs[vocab].deprecated
+        return terms
+
+
+def default_snapshot_path() -> Path:
+    """Gets the default snapshot location.
+
+    This is ARGO_VOCAB_SNAPSHOT if set, otherwise a file in the user's cache directory.
+    """
+    if os.environ.get(SNAPSHOT_PATH_ENV_VAR):
+        return Path(os.environ[SNAPSHOT_PATH_ENV_VAR])
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return cache_dir / "argo-metadata-validator" / "nvs_vocabs.json"
+
+
+def read_snapshot(snapshot_path: Path) -> VocabSnapshot | None:
+    """Read a snapshot file.
+
+    Args:
+        snapshot_path (Path): Path to the snapshot file.
+
+    Returns:
+        VocabSnapshot | None: The snapshot, or None if it is missing, unreadable or from another format version.
+    """
+    try:
+        snapshot = VocabSnapshot.model_validate_json(snapshot_path.read_bytes())
+    except (OSError, ValidationError):
+        return None
+    if snapshot.format_version != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return snapshot
+
+
+def write_snapshot(snapshot: VocabSnapshot, snapshot_path: Path):
+    """Write a snapshot file, replacing any existing one atomically.
+
+    Args:
+        snapshot (VocabSnapshot): Snapshot to write.
+        snapshot_path (Path): Path to the snapshot file.
+    """
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(f".{snapshot_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(snapshot.model_dump_json())
+    tmp_path.replace(snapshot_path)
+
+
+def refresh_snapshot(snapshot_path: Path, force: bool = False, fetch_mode: str = BATCHED_FETCH) -> VocabSnapshot:
+    """Create or update the snapshot file from NVS.
+
+    Unless forced, only vocabs whose last-modified date on NVS differs from the one stored in the existing snapshot
+    are re-fetched.
+
+    Args:
+        snapshot_path (Path): Path to the snapshot file.
+        force (bool, optional): Re-fetch every vocab regardless of the existing snapshot. Defaults to False.
+        fetch_mode (str, optional): How to query NVS, one of FETCH_MODES. Defaults to BATCHED_FETCH.
+
+    Returns:
+        VocabSnapshot: The updated snapshot.
+    """
+    existing = None if force else read_snapshot(snapshot_path)
+    vocab_dates = get_vocab_dates(ALL_ARGO_VOCABS)
+
+    unchanged_vocabs = []
+    if existing is not None:
+        unchanged_vocabs = [
+            vocab
+            for vocab in ALL_ARGO_VOCABS
+            if vocab in existing.vocabs
+            and vocab in vocab_dates
+            and existing.vocab_dates.get(vocab) == vocab_dates[vocab]
+        ]
+    fetched = get_terms_from_vocabs([x for x in ALL_ARGO_VOCABS if x not in unchanged_vocabs], fetch_mode=fetch_mode)
+    vocabs = {
+        vocab: existing.vocabs[vocab] if vocab in unchanged_vocabs else fetched[vocab] for vocab in ALL_ARGO_VOCABS
+    }
+
+    snapshot = VocabSnapshot(fetched_at=datetime.now(UTC), vocabs=vocabs, vocab_dates=vocab_dates)
+    write_snapshot(snapshot, snapshot_path)
+    return snapshot
+
+
+def get_snapshot(
+    snapshot_path: Path | None = None,
+    ttl: timedelta = DEFAULT_SNAPSHOT_TTL,
+    offline: bool = False,
+    fetch_mode: str = BATCHED_FETCH,
+) -> VocabSnapshot:
+    """Get the local snapshot, creating or refreshing it from NVS if needed.
+
+    Args:
+        snapshot_path (Path | None, optional): Snapshot file to use. Defaults to default_snapshot_path().
+        ttl (timedelta, optional): How old the snapshot can be before it is refreshed. Defaults to 24 hours.
+        offline (bool, optional): Only use the snapshot, whatever its age. Defaults to False.
+        fetch_mode (str, optional): How to query NVS, one of FETCH_MODES. Defaults to BATCHED_FETCH.
+
+    Raises:
+        VocabSnapshotNotFoundError: Raised if offline and there is no usable snapshot.
+
+    Returns:
+        VocabSnapshot: The snapshot.
+    """
+    snapshot_path = snapshot_path or default_snapshot_path()
+    snapshot = read_snapshot(snapshot_path)
+    if offline:
+        if snapshot is None:
+            raise VocabSnapshotNotFoundError(str(snapshot_path))
+        return snapshot
+
+    if snapshot is not None and not snapshot.is_expired(ttl):
+        return snapshot
+
+    import requests
+
+    try:
+        snapshot = refresh_snapshot(snapshot_path, fetch_mode=fetch_mode)
+    except requests.RequestException as e:
+        if snapshot is None:
+            raise
+        warnings.warn(
+            f"Unable to refresh NVS vocab snapshot, using stale copy from {snapshot.fetched_at}: {e}", stacklevel=2
+        )
+    return snapshot
+
+
+def load_argo_vocab_terms(
+    snapshot_path: Path | None = None,
+    ttl: timedelta = DEFAULT_SNAPSHOT_TTL,
+    offline: bool = False,
+    fetch_mode: str = BATCHED_FETCH,
+) -> VocabTerms:
+    """Get the terms of all the ARGO vocabs, using a local snapshot where possible.
+
+    Args:
+        snapshot_path (Path | None, optional): Snapshot file to use. If None the terms are fetched from NVS every
+            time, unless offline in which case the default snapshot path is used.
+        ttl (timedelta, optional): How old the snapshot can be before it is refreshed. Defaults to 24 hours.
+        offline (bool, optional): Only use the snapshot, whatever its age. Defaults to False.
+        fetch_mode (str, optional): How to query NVS, one of FETCH_MODES. Defaults to BATCHED_FETCH.
+
+    Raises:
+        VocabSnapshotNotFoundError: Raised if offline and there is no usable snapshot.
+
+    Returns:
+        VocabTerms: The active and deprecated vocab terms.
+    """
+    if snapshot_path is None and not offline:
+        return get_all_terms_from_argo_vocabs(fetch_mode=fetch_mode)
+    return get_snapshot(snapshot_path, ttl=ttl, offline=offline, fetch_mode=fetch_mode).get_terms()
@@ -1,9 +1,30 @@
 """Utilities related to NVS/vocabularies."""
 
-import requests
-from pydantic import BaseModel
+import os
+import re
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, PrivateAttr
+
+from argo_metadata_validator.constants import BATCHED_FETCH, CONCURRENT_FETCH, FETCH_MODES
+
+if TYPE_CHECKING:
+    import requests
 
 NVS_HOST = "http://vocab.nerc.ac.uk"
+# Optional text in square brackets that can follow a vocab term, e.g. "SDN:R25::CTD_PRES [1]"
+VOCAB_TERM_SUFFIX_PATTERN = re.compile(r"\s+\[\w+\]")
+# Set to point the SPARQL queries at a different endpoint, e.g. a mirror or a local stand-in for tests
+NVS_SPARQL_URL_ENV_VAR = "ARGO_NVS_SPARQL_URL"
+NVS_TIMEOUT = 120
+# Failed requests (connection errors, 429 and 5xx) are retried, sleeping backoff_factor * 2^n between attempts
+NVS_RETRIES = 3
+NVS_BACKOFF_FACTOR = 0.5
 
 ALL_ARGO_VOCABS = [
     "L22",
@@ -21,45 +42,333 @@ ALL_ARGO_VOCABS = [
 ]
 
 
+# Duplicated terms in a document get _N added to the end, e.g. .../OPTODE_DOXY_2/
+DUPLICATE_SUFFIX_REGEX = re.compile(r"_\d+/$")
+COLLECTION_URI_REGEX = re.compile(rf"^{re.escape(NVS_HOST)}/collection/(\w+)/current/")
+# Maximum number of distinct URIs whose status each vocab keeps, after which they are forgotten and looked up again
+TERM_LOOKUP_CACHE_SIZE = 100_000
+
+
+class TermStatus(StrEnum):
+    """Status of a vocab term URI against the fetched NVS terms."""
+
+    ACTIVE = "active"
+    DEPRECATED = "deprecated"
+    UNKNOWN = "unknown"
+
+
 class VocabTerms(BaseModel):
-    """Model to hold fetched vocab terms from NVS."""
+    """Model to hold fetched vocab terms from NVS.
+
+    The active/deprecated lists are the source of truth, lookups via status() go through a hash index that is
+    built from them on first use (and rebuilt if terms are added to the lists afterwards).
+    """
 
     active: list[str]
     deprecated: list[str]
 
+    _index: dict[str, TermStatus] = PrivateAttr(default_factory=dict)
+    _indexed_count: int = PrivateAttr(default=-1)
+    _lookups: dict[str, TermStatus] = PrivateAttr(default_factory=dict)
+
+    def _get_index(self) -> dict[str, TermStatus]:
+        count = len(self.active) + len(self.deprecated)
+        if count != self._indexed_count:
+            # Active takes precedence if a term somehow appears in both lists
+            self._index = dict.fromkeys(self.deprecated, TermStatus.DEPRECATED)
+            self._index.update(dict.fromkeys(self.active, TermStatus.ACTIVE))
+            self._indexed_count = count
+            self._lookups = {}
+        return self._index
+
+    def status(self, uri: str) -> TermStatus:
+        """Get whether a term URI is active, deprecated or unknown.
+
+        A URI ending in a duplicate suffix (_N) also matches the term without that suffix.
+
+        Args:
+            uri (str): Full URI of the term.
+
+        Returns:
+            TermStatus: Status of the term.
+        """
+        index = self._get_index()
+        lookups = self._lookups
+        cached = lookups.get(uri)
+        if cached is not None:
+            return cached
+
+        status = index.get(uri, TermStatus.UNKNOWN)
+        if status != TermStatus.ACTIVE:
+            unduplicated_uri, n_subs = DUPLICATE_SUFFIX_REGEX.subn("/", uri)
+            if n_subs:
+                unduplicated_status = index.get(unduplicated_uri, TermStatus.UNKNOWN)
+                if status == TermStatus.UNKNOWN or unduplicated_status == TermStatus.ACTIVE:
+                    status = unduplicated_status
+        # Bounded, as a long-running server or a large batch can see any number of distinct, e.g. mistyped, terms
+        if len(lookups) >= TERM_LOOKUP_CACHE_SIZE:
+            self._lookups = lookups = {}
+        lookups[uri] = status
+        return status
+
+
+class LazyVocabTerms:
+    """Vocab terms held per vocab, each vocab only being loaded the first time it is needed."""
+
+    def __init__(
+        self, loader: Callable[[list[str]], dict[str, VocabTerms]], vocabs: dict[str, VocabTerms] | None = None
+    ):
+        """Initialise with nothing, or only the given vocabs, loaded.
+
+        Args:
+            loader (Callable[[list[str]], dict[str, VocabTerms]]): Function to load the terms of a list of vocabs,
+                returning them keyed by vocab name, e.g. get_terms_from_vocabs.
+            vocabs (dict[str, VocabTerms] | None, optional): Already loaded terms, keyed by vocab name.
+        """
+        self._loader = loader
+        self._vocabs: dict[str, VocabTerms] = dict(vocabs or {})
+        self._lock = threading.Lock()
+
+    @property
+    def loaded_vocabs(self) -> list[str]:
+        """Names of the vocabs loaded so far."""
+        return list(self._vocabs)
+
+    def get_loaded(self) -> dict[str, VocabTerms]:
+        """Get the terms of the vocabs loaded so far, keyed by vocab name."""
+        return dict(self._vocabs)
+
+    def load(self, vocabs: Iterable[str]):
+        """Load any of the given ARGO vocabs that aren't loaded yet, in a single call to the loader."""
+        requested = set(vocabs)
+        with self._lock:
+            missing = [x for x in ALL_ARGO_VOCABS if x in requested and x not in self._vocabs]
+            if missing:
+                self._vocabs.update(self._loader(missing))
+
+    def get(self, vocab: str) -> VocabTerms:
+        """Get the terms of a single vocab, loading them if needed."""
+        if vocab not in self._vocabs:
+            self.load([vocab])
+        return self._vocabs[vocab]
+
+    def get_all_terms(self) -> VocabTerms:
+        """Get the combined terms of all the ARGO vocabs, loading any not yet loaded."""
+        self.load(ALL_ARGO_VOCABS)
+        terms = VocabTerms(active=[], deprecated=[])
+        for vocab in ALL_ARGO_VOCABS:
+            terms.active += self._vocabs[vocab].active
+            terms.deprecated += self._vocabs[vocab].deprecated
+        return terms
+
+    def status(self, uri: str, vocabs: list[str] | None = None) -> TermStatus:
+        """Get whether a term URI is active, deprecated or unknown, only looking in the vocab the URI belongs to.
 
-def expand_vocab(context: dict, value: str):
+        Args:
+            uri (str): Full URI of the term.
+            vocabs (list[str] | None, optional): Vocabs the term is allowed to come from, or None for any ARGO vocab.
+
+        Returns:
+            TermStatus: Status of the term.
+        """
+        vocab = get_vocab_from_uri(uri)
+        if vocab is None or (vocabs is not None and vocab not in vocabs):
+            return TermStatus.UNKNOWN
+        return self.get(vocab).status(uri)
+
+
+def get_vocab_from_uri(uri: str) -> str | None:
+    """Gets which ARGO vocab a term or collection URI belongs to.
+
+    Args:
+        uri (str): Full URI, e.g. http://vocab.nerc.ac.uk/collection/R25/current/CTD_PRES/
+
+    Returns:
+        str | None: Name of the vocab, e.g. R25, or None if it isn't in an ARGO vocab.
+    """
+    match = COLLECTION_URI_REGEX.match(uri)
+    if match is None or match.group(1) not in ALL_ARGO_VOCABS:
+        return None
+    return match.group(1)
+
+
+class ContextExpander:
+    """Expands vocab terms to full URIs using the prefixes of a document's @context.
+
+    The prefixes are compiled into a single pattern, matched once at the start of each term. Where one prefix is the
+    start of another the longest one is used, so the result doesn't depend on the order of the context.
+    """
+
+    def __init__(self, context: dict[str, str]):
+        """Compile the expander.
+
+        Args:
+            context (dict[str, str]): URIs keyed by prefix, as in a document's @context.
+        """
+        self.context = context
+        prefixes = sorted(context, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(x) for x in prefixes)) if prefixes else None
+
+    def __call__(self, value: str) -> str:
+        """Expand a vocab term, returning it unchanged if it doesn't start with a known prefix."""
+        match = self._pattern.match(value) if self._pattern else None
+        if match is None:
+            return value
+        val = self.context[match.group()] + value[match.end() :]
+        if val[-1] != "/":
+            val += "/"
+        return val
+
+
+@lru_cache(maxsize=128)
+def _get_context_expander(context: tuple[tuple[str, str], ...]) -> ContextExpander:
+    return ContextExpander(dict(context))
+
+
+def get_context_expander(context: dict) -> ContextExpander:
+    """Gets the expander for a document's @context, compiled once for each distinct context."""
+    return _get_context_expander(tuple((k, v) for k, v in context.items() if isinstance(v, str)))
+
+
+def expand_vocab(context: dict, value: str) -> str:
     """Use context from the JSON to expand vocab terms to full URIs."""
-    val = value
-    for k in context:
-        if k in val:
-            val = val.replace(k, context[k])
-            if val[-1] != "/":
-                val += "/"
-    return val
+    return get_context_expander(context)(value)
+
+
+def get_sparql_url() -> str:
+    """Gets the URL of the NVS SPARQL endpoint, which can be overridden with the ARGO_NVS_SPARQL_URL env var."""
+    return os.environ.get(NVS_SPARQL_URL_ENV_VAR) or f"{NVS_HOST}/sparql/sparql"
+
+
+_session: "requests.Session | None" = None
+_session_lock = threading.Lock()
 
 
-def get_all_terms_from_argo_vocabs() -> VocabTerms:
+def get_session() -> "requests.Session":
+    """Gets the shared HTTP session used for NVS queries.
+
+    Connections are pooled and kept alive between queries, failed requests are retried with backoff and responses
+    are requested gzip-compressed. requests is only imported here, so that it isn't loaded unless NVS is queried.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=NVS_RETRIES,
+                backoff_factor=NVS_BACKOFF_FACTOR,
+                status_forcelist=[429, 500, 502, 503, 504],
+                # SPARQL queries are read-only, so safe to retry despite being POSTs
+                allowed_methods=["POST"],
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_maxsize=len(ALL_ARGO_VOCABS), max_retries=retry)
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers.update(
+                {
+                    "Accept": "application/sparql-results+json",
+                    "Accept-Encoding": "gzip, deflate",
+                    "Content-Type": "application/sparql-query",
+                }
+            )
+        return _session
+
+
+def close_session():
+    """Close the shared HTTP session, a new one is created on next use."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _run_sparql_query(sparql_query: str) -> list[dict]:
+    resp = get_session().post(get_sparql_url(), data=sparql_query, timeout=NVS_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json()["results"]["bindings"]
+
+
+def get_all_terms_from_argo_vocabs(fetch_mode: str = BATCHED_FETCH) -> VocabTerms:
     """Fetches all active terms from all of the ARGO vocabularies.
 
+    Args:
+        fetch_mode (str, optional): How to query NVS, one of FETCH_MODES. Defaults to BATCHED_FETCH.
+
     Returns:
         list[str]: List of terms as URIs.
     """
     terms = VocabTerms(active=[], deprecated=[])
-    for vocab in ALL_ARGO_VOCABS:
-        vocab_terms = get_all_terms_from_vocab(vocab)
+    for vocab_terms in get_terms_from_vocabs(ALL_ARGO_VOCABS, fetch_mode=fetch_mode).values():
         terms.active += vocab_terms.active
         terms.deprecated += vocab_terms.deprecated
     return terms
 
 
+def get_terms_from_vocabs(vocabs: list[str], fetch_mode: str = BATCHED_FETCH) -> dict[str, VocabTerms]:
+    """Fetches all terms from each of the given vocabs.
+
+    Args:
+        vocabs (list[str]): Names of the vocabs, e.g. [R01, R03].
+        fetch_mode (str, optional): How to query NVS, one of FETCH_MODES. Defaults to BATCHED_FETCH.
+
+    Raises:
+        ValueError: Raised if an unknown fetch_mode is passed in.
+
+    Returns:
+        dict[str, VocabTerms]: Terms keyed by vocab name, in the same order as the vocabs passed in.
+    """
+    if not vocabs:
+        return {}
+    if fetch_mode == BATCHED_FETCH:
+        return get_all_terms_from_vocabs_batched(vocabs)
+    if fetch_mode == CONCURRENT_FETCH:
+        with ThreadPoolExecutor(max_workers=len(vocabs)) as executor:
+            return dict(zip(vocabs, executor.map(get_all_terms_from_vocab, vocabs), strict=True))
+    raise ValueError(f"Unrecognised fetch mode {fetch_mode}. Valid options: {', '.join(FETCH_MODES)}")
+
+
+def get_all_terms_from_vocabs_batched(vocabs: list[str]) -> dict[str, VocabTerms]:
+    """Single SPARQL query to fetch all terms from several vocabs at once.
+
+    Args:
+        vocabs (list[str]): Names of the vocabs, e.g. [R01, R03].
+
+    Returns:
+        dict[str, VocabTerms]: Terms keyed by vocab name.
+    """
+    collection_uris = {f"{NVS_HOST}/collection/{vocab}/current/": vocab for vocab in vocabs}
+    sparql_query = f"""
+    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+    PREFIX owl: <http://www.w3.org/2002/07/owl#>
+    SELECT DISTINCT ?collection (?c as ?uri) ?isDeprecated
+    WHERE {{
+        VALUES ?collection {{ {" ".join(f"<{x}>" for x in collection_uris)} }}
+        ?collection skos:member ?c .
+        ?c owl:deprecated ?isDeprecated
+    }}
+    """
+    results = {vocab: VocabTerms(active=[], deprecated=[]) for vocab in vocabs}
+    for x in _run_sparql_query(sparql_query):
+        vocab_terms = results[collection_uris[x["collection"]["value"]]]
+        if x["isDeprecated"]["value"] == "true":
+            vocab_terms.deprecated.append(x["uri"]["value"])
+        else:
+            vocab_terms.active.append(x["uri"]["value"])
+    return results
+
+
 def get_all_terms_from_vocab(vocab: str) -> VocabTerms:
     """SPARQL query to fetch all active terms from a given vocab.
 
     Args:
         vocab (str): Name of the vocab, e.g. R01.
     """
-    query_url = f"{NVS_HOST}/sparql/sparql"
     sparql_query = f"""
     PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
     PREFIX owl: <http://www.w3.org/2002/07/owl#>
@@ -69,15 +378,37 @@ def get_all_terms_from_vocab(vocab: str) -> VocabTerms:
         ?c owl:deprecated ?isDeprecated
     }}
     """
-
-    resp = requests.post(
-        query_url, data=sparql_query, headers={"Content-Type": "application/sparql-query"}, timeout=120
-    )
-    resp.raise_for_status()
     results = VocabTerms(active=[], deprecated=[])
-    for x in resp.json()["results"]["bindings"]:
+    for x in _run_sparql_query(sparql_query):
         if x["isDeprecated"]["value"] == "true":
             results.deprecated.append(x["uri"]["value"])
         else:
             results.active.append(x["uri"]["value"])
     return results
+
+
+def get_vocab_dates(vocabs: list[str]) -> dict[str, str]:
+    """SPARQL query to fetch the last-modified date of each of the given vocabs.
+
+    Used to check whether a local copy of a vocab's terms is still current without fetching all of the terms.
+
+    Args:
+        vocabs (list[str]): Names of the vocabs, e.g. [R01, R03].
+
+    Returns:
+        dict[str, str]: Date string keyed by vocab name. Vocabs without a date are left out.
+    """
+    collection_uris = " ".join(f"<{NVS_HOST}/collection/{vocab}/current/>" for vocab in vocabs)
+    sparql_query = f"""
+    PREFIX dc: <http://purl.org/dc/terms/>
+    SELECT DISTINCT ?collection ?date
+    WHERE {{
+        VALUES ?collection {{ {collection_uris} }}
+        ?collection dc:date ?date
+    }}
+    """
+    dates = {}
+    for x in _run_sparql_query(sparql_query):
+        vocab = x["collection"]["value"].rstrip("/").split("/")[-2]
+        dates[vocab] = x["date"]["value"]
+    return dates
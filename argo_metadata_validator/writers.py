@@ -0,0 +1,171 @@
+"""Writers of validation results, which write each file's results as soon as they are available.
+
+Nothing is held in memory between files, and the output is flushed after each file, so partial results of a long
+run can be followed as it goes, and aren't lost if it is interrupted. Output files ending in .gz are compressed.
+"""
+
+import gzip
+import json
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+
+if TYPE_CHECKING:
+    from argo_metadata_validator.models.results import ValidationError
+
+JSON_FORMAT = "json"
+NDJSON_FORMAT = "ndjson"
+JUNIT_FORMAT = "junit"
+SARIF_FORMAT = "sarif"
+
+TOOL_NAME = "argo-metadata-validator"
+TOOL_URI = "https://github.com/euroargodev/argo-metadata-validator"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_RULE_ID = "argo-metadata"
+
+# Characters that aren't allowed in XML 1.0, even escaped
+_XML_INVALID_REGEX = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _xml_text(text: str) -> str:
+    return escape(_XML_INVALID_REGEX.sub("\ufffd", text))
+
+
+def _xml_attr(text: str) -> str:
+    return quoteattr(_XML_INVALID_REGEX.sub("\ufffd", text))
+
+
+def _to_uri_reference(file: str) -> str:
+    """Gets a relative URI reference to a file path, percent-encoding e.g. spaces and the ! of archive!member."""
+    return quote(Path(file).as_posix())
+
+
+class ResultsWriter(ABC):
+    """Base class for writing validation results to a stream one file at a time, override _format and close."""
+
+    def __init__(self, stream: TextIO):
+        """Start the output on the given stream."""
+        self.stream = stream
+        self.n_written = 0
+
+    def write(self, file: str, file_errors: "list[ValidationError]"):
+        """Add the results of a file to the output."""
+        self.stream.write(self._format(file, file_errors))
+        self.stream.flush()
+        self.n_written += 1
+
+    @abstractmethod
+    def _format(self, file: str, file_errors: "list[ValidationError]") -> str:
+        """Gets the output of a file's results."""
+
+    def close(self):
+        """Finish the output, the stream itself is left open."""
+        self.stream.flush()
+
+
+class JsonResultsWriter(ResultsWriter):
+    """Writes a JSON object of each file's validity and errors, keyed by file path.
+
+    The output is the same as output_to_json_string, but only valid JSON once closed.
+    """
+
+    def _format(self, file: str, file_errors: "list[ValidationError]") -> str:
+        serialised = {"is_valid": len(file_errors) == 0, "errors": [x.model_dump() for x in file_errors]}
+        entry = json.dumps({file: serialised}, indent=2)[2:-2]  # Strip the enclosing braces and newlines
+        return ("{\n" if self.n_written == 0 else ",\n") + entry
+
+    def close(self):
+        """Finish the JSON object."""
+        self.stream.write("\n}" if self.n_written else "{}")
+        super().close()
+
+
+class NdjsonResultsWriter(ResultsWriter):
+    """Writes a line of JSON per file, with its path, validity and errors, each line complete as soon as written."""
+
+    def _format(self, file: str, file_errors: "list[ValidationError]") -> str:
+        result = {"file": file, "is_valid": len(file_errors) == 0, "errors": [x.model_dump() for x in file_errors]}
+        return json.dumps(result) + "\n"
+
+
+class JunitResultsWriter(ResultsWriter):
+    """Writes a JUnit XML test suite with a test case per file, failed if the file has errors.
+
+    As the number of files isn't known until the end, the test suite has no counts, which CI tools work out from the
+    test cases.
+    """
+
+    def __init__(self, stream: TextIO):
+        """Start the test suite on the given stream."""
+        super().__init__(stream)
+        self.stream.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n  <testsuite name="{TOOL_NAME}">\n')
+
+    def _format(self, file: str, file_errors: "list[ValidationError]") -> str:
+        testcase = f'    <testcase classname="{TOOL_NAME}" name={_xml_attr(file)}'
+        if not file_errors:
+            return f"{testcase} />\n"
+        details = "\n".join(f"{x.message} at path {x.path}" for x in file_errors)
+        failure = f'<failure message="{len(file_errors)} errors" type="ValidationError">{_xml_text(details)}</failure>'
+        return f"{testcase}>\n      {failure}\n    </testcase>\n"
+
+    def close(self):
+        """Finish the test suite."""
+        self.stream.write("  </testsuite>\n</testsuites>\n")
+        super().close()
+
+
+class SarifResultsWriter(ResultsWriter):
+    """Writes a SARIF 2.1.0 log with a result per error, located by file and by path within the file."""
+
+    def __init__(self, stream: TextIO):
+        """Start the log on the given stream."""
+        super().__init__(stream)
+        self.n_results = 0
+        driver = {"name": TOOL_NAME, "informationUri": TOOL_URI, "rules": [{"id": SARIF_RULE_ID}]}
+        header = json.dumps({"version": "2.1.0", "$schema": SARIF_SCHEMA, "runs": [{"tool": {"driver": driver}}]})
+        # Leave the results of the run open, to be added to as files are validated
+        self.stream.write(header[: -len("}]}")] + ', "results": [')
+
+    def _format(self, file: str, file_errors: "list[ValidationError]") -> str:
+        results = []
+        for error in file_errors:
+            location: dict = {"physicalLocation": {"artifactLocation": {"uri": _to_uri_reference(file)}}}
+            if error.path:
+                location["logicalLocations"] = [{"fullyQualifiedName": error.path}]
+            result = {
+                "ruleId": SARIF_RULE_ID,
+                "level": "error",
+                "message": {"text": error.message},
+                "locations": [location],
+            }
+            results.append(("\n" if self.n_results == 0 else ",\n") + json.dumps(result))
+            self.n_results += 1
+        return "".join(results)
+
+    def close(self):
+        """Finish the log."""
+        self.stream.write("\n]}]}\n")
+        super().close()
+
+
+# Writer of each output format, by name
+RESULTS_WRITERS: dict[str, type[ResultsWriter]] = {
+    JSON_FORMAT: JsonResultsWriter,
+    NDJSON_FORMAT: NdjsonResultsWriter,
+    JUNIT_FORMAT: JunitResultsWriter,
+    SARIF_FORMAT: SarifResultsWriter,
+}
+
+
+def open_results_file(path: str) -> TextIO:
+    """Open a file to write results to, compressed with gzip if its name ends in .gz.
+
+    Each flush of a compressed file ends a compressed block, so what has been written so far can be decompressed,
+    e.g. with zcat, while the file is still being written.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
@@ -0,0 +1 @@
+"""Benchmarks of validation throughput and memory use, run with `python -m benchmarks`."""
@@ -0,0 +1,94 @@
+"""Generator of synthetic ARGO metadata documents of a controlled size."""
+
+import copy
+import json
+from pathlib import Path
+from typing import Any
+
+from argo_metadata_validator.constants import FLOAT_SCHEMA, PLATFORM_SCHEMA, SENSOR_SCHEMA
+from argo_metadata_validator.utils import load_json
+
+# Valid 0.4.0 documents that the synthetic documents are built from
+TEMPLATES_DIR = Path(__file__).parent.parent / "tests" / "files"
+TEMPLATE_FILES = {
+    FLOAT_SCHEMA: "valid_float.json",
+    PLATFORM_SCHEMA: "valid_platform.json",
+    SENSOR_SCHEMA: "valid_sensor.json",
+}
+BENCHMARK_SCHEMA_TYPES = list(TEMPLATE_FILES)
+
+
+def _repeat_unique(items: list[Any], size: int, make_unique) -> list[Any]:
+    """Repeat a list size times, altering each copy so the items stay unique, as the schemas require."""
+    repeated = []
+    for copy_idx in range(size):
+        for item in items:
+            item = copy.deepcopy(item)
+            repeated.append(make_unique(item, copy_idx) if copy_idx else item)
+    return repeated
+
+
+def _unique_sensor(sensor: dict, copy_idx: int) -> dict:
+    sensor["SENSOR_SERIAL_NO"] = f"{sensor['SENSOR_SERIAL_NO']}-{copy_idx}"
+    return sensor
+
+
+def _unique_parameter(parameter: dict, copy_idx: int) -> dict:
+    parameter["PREDEPLOYMENT_CALIB_COMMENT"] = f"{parameter['PREDEPLOYMENT_CALIB_COMMENT']} ({copy_idx})"
+    return parameter
+
+
+def _unique_sensor_info(sensor_info: dict, copy_idx: int) -> dict:
+    sensor_info["sensor_described"] = f"{sensor_info['sensor_described']}-{copy_idx}"
+    return sensor_info
+
+
+def _unique_file_name(file_name: str, copy_idx: int) -> str:
+    return file_name.replace(".json", f"-{copy_idx}.json")
+
+
+def generate_document(schema_type: str, size: int = 1) -> dict:
+    """Generate a valid document of the given schema type.
+
+    The size scales the number of SENSORS and PARAMETERS, and for floats the merged files, by repeating those of the
+    template. Platform documents don't have any lists to scale so are always the same size.
+
+    Args:
+        schema_type (str): One of BENCHMARK_SCHEMA_TYPES.
+        size (int, optional): Number of copies of the template's lists. Defaults to 1.
+
+    Returns:
+        dict: Generated JSON content.
+    """
+    document = load_json(TEMPLATES_DIR / TEMPLATE_FILES[schema_type])
+    if "SENSORS" in document:
+        document["SENSORS"] = _repeat_unique(document["SENSORS"], size, _unique_sensor)
+    if "PARAMETERS" in document:
+        document["PARAMETERS"] = _repeat_unique(document["PARAMETERS"], size, _unique_parameter)
+    if "sensor_info_list" in document:
+        document["sensor_info_list"] = _repeat_unique(document["sensor_info_list"], size, _unique_sensor_info)
+    if "files_merged" in document:
+        document["files_merged"] = _repeat_unique(document["files_merged"], size, _unique_file_name)
+    return document
+
+
+def write_documents(directory: Path, schema_type: str, size: int, n_files: int) -> list[Path]:
+    """Write generated documents to files.
+
+    Args:
+        directory (Path): Directory to write to, created if needed.
+        schema_type (str): One of BENCHMARK_SCHEMA_TYPES.
+        size (int): Size of each document, see generate_document.
+        n_files (int): Number of files to write.
+
+    Returns:
+        list[Path]: Paths of the written files.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    content = json.dumps(generate_document(schema_type, size), indent=2)
+    files = []
+    for idx in range(n_files):
+        file = directory / f"{schema_type}-{size}-{idx}.json"
+        file.write_text(content)
+        files.append(file)
+    return files
@@ -0,0 +1,190 @@
+"""Measure the throughput and peak memory of each validation stage on generated documents."""
+
+import gc
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+import click
+
+from argo_metadata_validator.constants import DEFAULT_SCHEMA_VERSION
+from argo_metadata_validator.schema_utils import clear_schema_cache
+from argo_metadata_validator.utils import load_json
+from argo_metadata_validator.validation import ArgoValidator
+from benchmarks.generate import BENCHMARK_SCHEMA_TYPES, write_documents
+from benchmarks.vocab_stub import collect_vocab_terms, use_vocab_stub
+
+# Bump if the structure of the results file changes
+RESULTS_FORMAT_VERSION = 1
+
+
+@dataclass
+class StageResult:
+    """Measurements of one stage over a set of files."""
+
+    schema_type: str
+    size: int
+    stage: str
+    n_files: int
+    seconds: float  # Fastest of the repeats
+    files_per_second: float
+    peak_memory_bytes: int
+
+
+def _time_stage(run: Callable[[], Any], repeat: int) -> float:
+    """Gets the fastest time of several runs, with garbage collection paused as with timeit."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(times)
+
+
+def _peak_memory(run: Callable[[], Any]) -> int:
+    """Gets the peak memory allocated during a separate, untimed, run, as tracing slows it down."""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_files(files: list[Path], schema_type: str, size: int, repeat: int = 3) -> list[StageResult]:
+    """Measure each validation stage over a set of files.
+
+    Each stage is measured on its own, with the inputs it needs prepared beforehand. The schema validators are built,
+    and the vocabs loaded, before timing so that the results reflect steady-state throughput.
+
+    Args:
+        files (list[Path]): Valid files of the same schema type and size.
+        schema_type (str): Schema type of the files.
+        size (int): Size the files were generated with.
+        repeat (int, optional): Number of timed runs of each stage, the fastest being kept. Defaults to 3.
+
+    Returns:
+        list[StageResult]: Results of each stage.
+    """
+    all_json_data = [load_json(x) for x in files]
+    validator = ArgoValidator()
+    use_vocab_stub(validator, collect_vocab_terms(all_json_data[:1]))
+    # Warm up the schema and vocab caches
+    validator.validate_json_data(all_json_data[0])
+
+    stages: dict[str, Callable[[], Any]] = {
+        "load": lambda: [load_json(x) for x in files],
+        "schema": lambda: [validator._validate_json(x) for x in all_json_data],
+        "vocab": lambda: [validator._validate_vocabs(x) for x in all_json_data],
+        "parse": lambda: [validator.parse_json_data(x) for x in all_json_data],
+    }
+    results = []
+    for stage, run in stages.items():
+        seconds = _time_stage(run, repeat)
+        results.append(
+            StageResult(
+                schema_type=schema_type,
+                size=size,
+                stage=stage,
+                n_files=len(files),
+                seconds=seconds,
+                files_per_second=len(files) / seconds if seconds else float("inf"),
+                peak_memory_bytes=_peak_memory(run),
+            )
+        )
+    return results
+
+
+def run_benchmarks(
+    work_dir: Path, schema_types: list[str], sizes: list[int], n_files: int, repeat: int = 3
+) -> list[StageResult]:
+    """Generate documents and benchmark each combination of schema type and size.
+
+    Args:
+        work_dir (Path): Directory to write the generated documents to.
+        schema_types (list[str]): Schema types to benchmark.
+        sizes (list[int]): Document sizes to benchmark, see generate_document.
+        n_files (int): Number of files of each schema type and size.
+        repeat (int, optional): Number of timed runs of each stage. Defaults to 3.
+
+    Returns:
+        list[StageResult]: Results of each stage for each schema type and size.
+    """
+    clear_schema_cache()
+    results = []
+    for schema_type in schema_types:
+        for size in sizes:
+            files = write_documents(work_dir / f"{schema_type}-{size}", schema_type, size, n_files)
+            results += benchmark_files(files, schema_type, size, repeat)
+    return results
+
+
+def _get_package_version() -> str:
+    try:
+        return version("argo-metadata-validator")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def results_to_json(results: list[StageResult], parameters: dict) -> dict:
+    """Convert results to the machine-readable output, along with details of the environment they were run in."""
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "created": datetime.now(UTC).isoformat(),
+        "package_version": _get_package_version(),
+        "schema_version": DEFAULT_SCHEMA_VERSION,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": [asdict(x) for x in results],
+    }
+
+
+@click.command()
+@click.option(
+    "--schema-type",
+    "schema_types",
+    type=click.Choice(BENCHMARK_SCHEMA_TYPES),
+    multiple=True,
+    default=BENCHMARK_SCHEMA_TYPES,
+    show_default=True,
+    help="Schema types to benchmark, can be repeated",
+)
+@click.option(
+    "--size",
+    "sizes",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=[1, 4, 16],
+    show_default=True,
+    help="Document sizes, as copies of the template's sensors and parameters, can be repeated",
+)
+@click.option("--files", "n_files", type=click.IntRange(min=1), default=10, show_default=True, help="Files per run")
+@click.option("--repeat", type=click.IntRange(min=1), default=3, show_default=True, help="Timed runs of each stage")
+@click.option("--output-file", "-f", type=click.Path(dir_okay=False, path_type=Path), help="Path to output JSON")
+def main(schema_types: tuple[str, ...], sizes: tuple[int, ...], n_files: int, repeat: int, output_file: Path | None):
+    """Benchmark each validation stage on generated documents, with a local stub in place of NVS."""
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmarks(Path(work_dir), list(schema_types), list(sizes), n_files, repeat)
+
+    for x in results:
+        click.echo(
+            f"{x.schema_type:>8} size {x.size:>4} {x.stage:>6}: {x.files_per_second:10.1f} files/s, "
+            f"peak {x.peak_memory_bytes / 1024:10.1f} KiB"
+        )
+    if output_file:
+        parameters = {"schema_types": schema_types, "sizes": sizes, "n_files": n_files, "repeat": repeat}
+        output_file.write_text(json.dumps(results_to_json(results, parameters), indent=2))
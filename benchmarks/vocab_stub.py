@@ -0,0 +1,49 @@
+"""Local stand-in for NVS, so benchmarks measure the validator rather than the network."""
+
+from collections.abc import Iterable
+
+from argo_metadata_validator.validation import VOCAB_FIELDS, ArgoValidator
+from argo_metadata_validator.vocab_utils import (
+    VOCAB_TERM_SUFFIX_PATTERN,
+    LazyVocabTerms,
+    VocabTerms,
+    expand_vocab,
+    get_vocab_from_uri,
+)
+
+
+def collect_vocab_terms(documents: Iterable[dict]) -> dict[str, VocabTerms]:
+    """Build vocabs in which every term used by the documents is active.
+
+    Args:
+        documents (Iterable[dict]): JSON content of the documents.
+
+    Returns:
+        dict[str, VocabTerms]: Terms keyed by vocab name.
+    """
+    vocabs: dict[str, set[str]] = {}
+    for document in documents:
+        for field, sub_fields in VOCAB_FIELDS.items():
+            items = document.get(field, [])
+            for item in items if isinstance(items, list) else [items]:
+                for sub_field in sub_fields:
+                    values = item.get(sub_field, [])
+                    for value in values if isinstance(values, list) else [values]:
+                        uri = expand_vocab(document["@context"], VOCAB_TERM_SUFFIX_PATTERN.sub("", value))
+                        if vocab := get_vocab_from_uri(uri):
+                            vocabs.setdefault(vocab, set()).add(uri)
+    return {vocab: VocabTerms(active=sorted(terms), deprecated=[]) for vocab, terms in vocabs.items()}
+
+
+def use_vocab_stub(validator: ArgoValidator, terms: dict[str, VocabTerms]):
+    """Make a validator take its vocab terms from the stub instead of NVS.
+
+    Args:
+        validator (ArgoValidator): Validator to change.
+        terms (dict[str, VocabTerms]): Stub terms, from collect_vocab_terms.
+    """
+
+    def load_vocabs(vocabs: list[str]) -> dict[str, VocabTerms]:
+        return {x: terms.get(x, VocabTerms(active=[], deprecated=[])) for x in vocabs}
+
+    validator.argo_vocabs = LazyVocabTerms(load_vocabs)
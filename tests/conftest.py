@@ -0,0 +1,112 @@
+"""Shared test fixtures."""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from argo_metadata_validator.schema_utils import SCHEMA_BUNDLE_DIR_ENV_VAR
+from argo_metadata_validator.vocab_utils import NVS_HOST, NVS_SPARQL_URL_ENV_VAR, VocabTerms
+
+
+@pytest.fixture(autouse=True, scope="session")
+def schema_bundle_dir(tmp_path_factory):
+    """Keep the schema bundles built by the tests out of the user's cache directory."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        bundle_dir = tmp_path_factory.mktemp("schema_bundles")
+        monkeypatch.setenv(SCHEMA_BUNDLE_DIR_ENV_VAR, str(bundle_dir))
+        yield bundle_dir
+
+
+@pytest.fixture
+def files_dir() -> Path:
+    """Directory of the example metadata files."""
+    return Path(__file__).parent / "files"
+
+
+@pytest.fixture
+def no_nvs_terms(mocker):
+    """Answer vocab term lookups without NVS, with every vocab empty so that every term is unknown.
+
+    Returns:
+        The mock of the validator's lookup.
+    """
+
+    def get_terms_from_vocabs(vocabs, fetch_mode):
+        return {x: VocabTerms(active=[], deprecated=[]) for x in vocabs}
+
+    mocker.patch("argo_metadata_validator.vocab_snapshot.get_terms_from_vocabs", side_effect=get_terms_from_vocabs)
+    return mocker.patch("argo_metadata_validator.validation.get_terms_from_vocabs", side_effect=get_terms_from_vocabs)
+
+
+class LocalNVS:
+    """Minimal stand-in for the NVS SPARQL endpoint, answering the queries made by vocab_utils."""
+
+    def __init__(self):
+        """Start with no vocabs."""
+        self.vocabs: dict[str, dict[str, bool]] = {}  # Keyed by vocab name, then term name -> is deprecated
+        self.vocab_dates: dict[str, str] = {}
+        self.queries: list[str] = []
+        self.url = ""
+
+    def add_term(self, vocab: str, term: str, deprecated: bool = False):
+        """Add a term to one of the vocabs."""
+        self.vocabs.setdefault(vocab, {})[term] = deprecated
+        self.vocab_dates.setdefault(vocab, "2025-01-01 00:00:00.0")
+
+    def answer(self, query: str) -> dict:
+        """Build the SPARQL JSON results for a query."""
+        self.queries.append(query)
+        vocabs = re.findall(r"/collection/(\w+)/current/>", query)
+        bindings = []
+        if "skos:member" in query:
+            for vocab in vocabs:
+                for term, deprecated in self.vocabs.get(vocab, {}).items():
+                    bindings.append(
+                        {
+                            "collection": {"value": f"{NVS_HOST}/collection/{vocab}/current/"},
+                            "uri": {"value": f"{NVS_HOST}/collection/{vocab}/current/{term}/"},
+                            "isDeprecated": {"value": "true" if deprecated else "false"},
+                        }
+                    )
+        else:
+            for vocab in vocabs:
+                if vocab in self.vocab_dates:
+                    bindings.append(
+                        {
+                            "collection": {"value": f"{NVS_HOST}/collection/{vocab}/current/"},
+                            "date": {"value": self.vocab_dates[vocab]},
+                        }
+                    )
+        return {"results": {"bindings": bindings}}
+
+
+@pytest.fixture
+def local_nvs(monkeypatch):
+    """Run a local SPARQL endpoint and point the vocab fetching at it."""
+    nvs = LocalNVS()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            query = self.rfile.read(int(self.headers["Content-Length"])).decode()
+            body = json.dumps(nvs.answer(query)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/sparql-results+json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    nvs.url = f"http://127.0.0.1:{server.server_port}/sparql/sparql"
+    monkeypatch.setenv(NVS_SPARQL_URL_ENV_VAR, nvs.url)
+    yield nvs
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,39 @@
+"""Helpers shared between test modules."""
+
+import copy
+import random
+from typing import Any
+
+# Values swapped into documents to make them invalid
+MUTATION_VALUES = [None, True, False, 0, 1, -5, 1.5, 2.0, "", "x", "SDN:R25::CTD_TEMP", [], [1, 1], {}, {"a": 1}]
+
+
+def _paths(node: Any, path: tuple = ()) -> list[tuple]:
+    paths = [path]
+    if isinstance(node, dict):
+        for key, value in node.items():
+            paths += _paths(value, (*path, key))
+    elif isinstance(node, list):
+        for index, value in enumerate(node):
+            paths += _paths(value, (*path, index))
+    return paths
+
+
+def mutate_document(document: Any, rng: random.Random) -> Any:
+    """Copy of a document with a few values removed, replaced, added or duplicated."""
+    document = copy.deepcopy(document)
+    for _ in range(rng.randint(1, 4)):
+        path = rng.choice(_paths(document)[1:])
+        parent = document
+        for key in path[:-1]:
+            parent = parent[key]
+        choice = rng.random()
+        if choice < 0.3 and isinstance(parent, dict):
+            del parent[path[-1]]
+        elif choice < 0.4 and isinstance(parent, dict):
+            parent[f"extra_{rng.randint(0, 3)}"] = rng.choice(MUTATION_VALUES)
+        elif choice < 0.5 and isinstance(parent, list):
+            parent.append(copy.deepcopy(parent[path[-1]]))
+        else:
+            parent[path[-1]] = copy.deepcopy(rng.choice(MUTATION_VALUES))
+    return document
@@ -1,7 +1,5 @@
 """Integration tests for the file parsing function."""
 
-from pathlib import Path
-
 import pytest
 
 from argo_metadata_validator.models.float import Float
@@ -18,10 +16,22 @@ from argo_metadata_validator.validation import ArgoValidator
         ["valid_float.json", Float],
     ],
 )
-def test_validating_files(file_path, output_class):
+def test_validating_files(file_path, output_class, files_dir):
     """Test the overall validation with various files."""
-    resolved_file_path = Path(__file__).parent.parent / "files" / file_path
+    resolved_file_path = files_dir / file_path
 
     output = ArgoValidator().parse(str(resolved_file_path))
 
     assert isinstance(output, output_class)
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_parse_many(trusted, files_dir):
+    """Test parsing several files at once, giving the same models as parsing each one."""
+    files = [str(files_dir / x) for x in ["valid_sensor.json", "valid_platform.json"]]
+
+    output = ArgoValidator().parse_many(files, trusted=trusted)
+
+    assert list(output) == files
+    assert output[files[0]] == ArgoValidator().parse(files[0])
+    assert isinstance(output[files[1]], Platform)
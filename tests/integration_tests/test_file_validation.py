@@ -1,7 +1,5 @@
 """Test complete validation process for input files."""
 
-from pathlib import Path
-
 import pytest
 
 from argo_metadata_validator.models.results import ValidationError
@@ -56,13 +54,13 @@ from argo_metadata_validator.validation import ArgoValidator
         ],
     ],
 )
-def test_validating_files(file_path, expected_output):
+def test_validating_files(file_path, expected_output, files_dir):
     """Test the overall validation with various files."""
-    resolved_file_path = Path(__file__).parent.parent / "files" / file_path
+    resolved_file_path = files_dir / file_path
 
     errors = ArgoValidator().validate([str(resolved_file_path)])
 
-    assert errors == expected_output
+    assert errors == {str(resolved_file_path): expected_output[file_path]}
 
 
 def test_validating_non_existant_file():
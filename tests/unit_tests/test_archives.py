@@ -0,0 +1,124 @@
+"""Tests for validating the members of tar and zip archives without extracting them."""
+
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from argo_metadata_validator.archives import ArchiveMember, is_archive, iter_archive_members
+from argo_metadata_validator.cli import main
+from argo_metadata_validator.result_cache import ResultCache, hash_content, hash_file
+from argo_metadata_validator.validation import ArgoValidator
+
+
+@pytest.fixture
+def unknown_terms(mocker, no_nvs_terms):
+    """Every vocab term is unknown, so that the vocab errors are compared too."""
+    mocker.patch(
+        "argo_metadata_validator.validation.get_vocab_dates",
+        side_effect=lambda vocabs: dict.fromkeys(vocabs, "2025-01-01"),
+    )
+
+
+@pytest.fixture
+def files(files_dir) -> list[Path]:
+    """The example metadata files."""
+    return sorted(files_dir.glob("*.json"))
+
+
+def _make_tar(path: Path, files: list[Path]) -> Path:
+    with tarfile.open(path, "w:gz") as archive:
+        for file in files:
+            archive.add(file, arcname=f"meta/{file.name}")
+        archive.add(files[0].with_name("valid_float.json"), arcname="README.txt")
+    return path
+
+
+def _make_zip(path: Path, files: list[Path]) -> Path:
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.mkdir("meta")
+        for file in files:
+            archive.write(file, arcname=f"meta/{file.name}")
+        archive.write(files[0].with_name("valid_float.json"), arcname="README.txt")
+    return path
+
+
+@pytest.fixture(params=["tar", "zip"])
+def archive(request, tmp_path, files) -> Path:
+    """A compressed archive of the test files, along with a member that isn't JSON."""
+    if request.param == "tar":
+        return _make_tar(tmp_path / "files.tar.gz", files)
+    return _make_zip(tmp_path / "files.zip", files)
+
+
+def test_iter_archive_members(archive, files):
+    """Test that the JSON members are read in the order they are stored, keyed by archive!member."""
+    members = list(iter_archive_members(archive))
+
+    assert [str(x) for x in members] == [f"{archive}!meta/{x.name}" for x in files]
+    assert [x.read_bytes() for x in members] == [x.read_bytes() for x in files]
+    assert hash_content(members[0].content) == hash_file(files[0])
+
+
+@pytest.mark.parametrize(
+    "name,expected", [("a.tar", True), ("a.TGZ", True), ("a.tar.xz", True), ("a.zip", True), ("a.json", False)]
+)
+def test_is_archive(name, expected):
+    """Test that archives are recognised by their name."""
+    assert is_archive(Path(name)) == expected
+
+
+def test_iter_archive_members_unknown_type():
+    """Test that files that aren't a known type of archive are rejected."""
+    with pytest.raises(ValueError, match="Unknown type of archive"):
+        list(iter_archive_members(Path("a.rar")))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_iter_validate_archive(unknown_terms, archive, jobs, files):
+    """Test that the members of an archive have the same results as the files they were made from."""
+    results = list(ArgoValidator().iter_validate([archive, files[0]], jobs=jobs))
+
+    expected = list(ArgoValidator().iter_validate(files))
+    assert [x for x, _ in results] == [f"{archive}!meta/{x.name}" for x in files] + [str(files[0])]
+    assert [x for _, x in results] == [x for _, x in expected] + [expected[0][1]]
+
+
+def test_validate_archive_uses_result_cache(unknown_terms, tmp_path, files):
+    """Test that the members of an archive share the cached results of files with the same content."""
+    archive = _make_tar(tmp_path / "files.tar", files)
+
+    with ResultCache(tmp_path / "results.sqlite") as cache:
+        validator = ArgoValidator(result_cache=cache)
+        expected = validator.validate([str(x) for x in files])
+        results = validator.validate([str(archive)])
+
+        assert (cache.hits, cache.misses) == (len(files), len(files))
+    assert list(results.values()) == list(expected.values())
+
+
+def test_load_json_data_archive(archive, files):
+    """Test that the members of an archive are loaded, keyed by archive!member."""
+    validator = ArgoValidator()
+    validator.load_json_data([str(archive)])
+
+    assert validator.all_json_data == {f"{archive}!meta/{x.name}": json.loads(x.read_text()) for x in files}
+
+
+def test_main_archive(mocker, tmp_path, no_nvs_terms, files):
+    """Test that the CLI validates archives, with results keyed by archive!member."""
+    mocker.patch("argo_metadata_validator.vocab_snapshot.get_vocab_dates", return_value={})
+    archive = _make_zip(tmp_path / "files.zip", files)
+    output_file = tmp_path / "results.json"
+
+    result = CliRunner().invoke(
+        main, [str(archive), "-q", "-f", str(output_file), "--vocab-snapshot", str(tmp_path / "snapshot.json")]
+    )
+
+    assert result.exit_code == 0
+    assert list(json.loads(output_file.read_text())) == [
+        str(ArchiveMember(archive, f"meta/{x.name}", b"")) for x in files
+    ]
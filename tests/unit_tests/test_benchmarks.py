@@ -0,0 +1,38 @@
+"""Tests for the benchmark harness."""
+
+import pytest
+
+from argo_metadata_validator.validation import ArgoValidator
+from benchmarks.generate import BENCHMARK_SCHEMA_TYPES, generate_document
+from benchmarks.run import results_to_json, run_benchmarks
+from benchmarks.vocab_stub import collect_vocab_terms, use_vocab_stub
+
+
+@pytest.mark.parametrize("schema_type", BENCHMARK_SCHEMA_TYPES)
+def test_generated_documents_are_valid(schema_type):
+    """Test that generated documents are valid against the schemas and the vocab stub, whatever their size."""
+    document = generate_document(schema_type, size=3)
+    validator = ArgoValidator()
+    use_vocab_stub(validator, collect_vocab_terms([document]))
+
+    assert validator.validate_json_data(document) == []
+    validator.parse_json_data(document)
+
+
+def test_generated_documents_scale():
+    """Test that the size scales the sensors and parameters."""
+    small = generate_document("sensor", size=1)
+    large = generate_document("sensor", size=4)
+
+    assert len(large["SENSORS"]) == 4 * len(small["SENSORS"])
+    assert len(large["PARAMETERS"]) == 4 * len(small["PARAMETERS"])
+
+
+def test_run_benchmarks(tmp_path):
+    """Test that every stage is measured, and the results are machine-readable."""
+    results = run_benchmarks(tmp_path, ["sensor"], [1], n_files=2, repeat=1)
+
+    assert [x.stage for x in results] == ["load", "schema", "vocab", "parse"]
+    assert all(x.n_files == 2 and x.files_per_second > 0 and x.peak_memory_bytes > 0 for x in results)
+    output = results_to_json(results, {})
+    assert output["results"][0]["stage"] == "load"
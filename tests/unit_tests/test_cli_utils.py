@@ -2,12 +2,14 @@
 
 import json
 import re
+from pathlib import Path
 from unittest.mock import call
 
 import click
 import pytest
+from click.testing import CliRunner
 
-from argo_metadata_validator.cli import output_to_json_string, output_to_terminal
+from argo_metadata_validator.cli import main, output_to_json_string, output_to_terminal
 from argo_metadata_validator.models.results import ValidationError
 
 
@@ -61,3 +63,110 @@ def test_output_json_string(sample_errors):
     # Remove whitespace to compare just JSON string content
     whitespace_regex = re.compile(r"\s+")
     assert whitespace_regex.sub("", result) == whitespace_regex.sub("", expected)
+
+
+def test_main_defaults_to_validate(mocker):
+    """Test that the CLI runs validation when no sub-command is given."""
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.return_value = iter([])
+
+    result = CliRunner().invoke(main, ["a.json,b.json", "--offline", "--vocab-snapshot", "vocabs.json"])
+
+    assert result.exit_code == 0
+    mock_validator.assert_called_once()
+    assert mock_validator.call_args.kwargs["offline"] is True
+    assert list(mock_validator.return_value.iter_validate.call_args.args[0]) == [Path("a.json"), Path("b.json")]
+    assert mock_validator.return_value.iter_validate.call_args.kwargs == {
+        "jobs": 1,
+        "fail_fast": False,
+        "consistency": None,
+    }
+
+
+def test_main_with_manifest(mocker, tmp_path):
+    """Test that files are read from a manifest on stdin as well as from the arguments."""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.json").write_text("{}")
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.return_value = iter([])
+
+    result = CliRunner().invoke(main, ["a.json", "--manifest", "-"], input=f"# comment\n\n{tmp_path}\n")
+
+    assert result.exit_code == 0
+    files = list(mock_validator.return_value.iter_validate.call_args.args[0])
+    assert files == [Path("a.json"), tmp_path / "sub" / "b.json"]
+
+
+def test_main_no_files():
+    """Test that the CLI errors if given nothing to validate."""
+    result = CliRunner().invoke(main, ["--offline"])
+
+    assert result.exit_code == 2
+    assert "Provide FILES to validate and/or a --manifest" in result.output
+
+
+def test_main_writes_results_incrementally(mocker, sample_errors, tmp_path):
+    """Test that each file's results are in the output file as soon as that file has been validated."""
+    output_file = tmp_path / "results.json"
+    written_so_far = []
+
+    def iter_validate(files, jobs, fail_fast, consistency):
+        for file, errors in sample_errors.items():
+            yield file, errors
+            written_so_far.append(output_file.read_text())
+
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.side_effect = iter_validate
+
+    result = CliRunner().invoke(main, ["a.json,b.json", "-q", "-f", str(output_file)])
+
+    assert result.exit_code == 0
+    assert '"file_1"' in written_so_far[0]
+    assert '"file_2"' not in written_so_far[0]
+    assert json.loads(output_file.read_text()) == json.loads(output_to_json_string(sample_errors))
+
+
+def test_main_update_vocabs(mocker, tmp_path):
+    """Test the update-vocabs sub-command."""
+    mock_refresh = mocker.patch("argo_metadata_validator.vocab_snapshot.refresh_snapshot")
+    mock_refresh.return_value.vocabs = {}
+
+    result = CliRunner().invoke(main, ["update-vocabs", "--vocab-snapshot", str(tmp_path / "vocabs.json")])
+
+    assert result.exit_code == 0
+    mock_refresh.assert_called_once_with(tmp_path / "vocabs.json", force=False, fetch_mode="batched")
+
+
+def test_main_fail_fast(mocker, sample_errors):
+    """Test that --fail-fast limits each file to one error and exits with an error status if any are invalid."""
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.return_value = iter(sample_errors.items())
+
+    result = CliRunner().invoke(main, ["a.json", "--fail-fast", "-q"])
+
+    assert result.exit_code == 1
+    assert mock_validator.call_args.kwargs["max_errors"] == 1
+    assert mock_validator.return_value.iter_validate.call_args.kwargs["fail_fast"] is True
+
+
+def test_main_reports_result_cache(mocker, tmp_path):
+    """Test that the result cache is passed to the validator and its hit and miss counts are output."""
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.return_value = iter([])
+
+    result = CliRunner().invoke(main, ["a.json", "--result-cache", str(tmp_path / "results.sqlite")])
+
+    assert result.exit_code == 0
+    assert mock_validator.call_args.kwargs["result_cache"].path == tmp_path / "results.sqlite"
+    assert "Result cache: 0 hits, 0 misses" in result.output
+
+
+def test_main_schema_engine(mocker):
+    """Test that the schema engine is passed to the validator."""
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.return_value = iter([])
+
+    result = CliRunner().invoke(main, ["a.json", "--schema-engine", "compiled"])
+
+    assert result.exit_code == 0
+    assert mock_validator.call_args.kwargs["schema_engine"] == "compiled"
@@ -0,0 +1,145 @@
+"""Tests for the consistency checks across files."""
+
+import copy
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from argo_metadata_validator.cli import main
+from argo_metadata_validator.consistency import ConsistencyIndex, extract_consistency_record
+from argo_metadata_validator.models.results import ValidationError
+from argo_metadata_validator.utils import load_json
+from argo_metadata_validator.validation import ArgoValidator
+
+PLATFORM_FILE = "platform-NKE-PROVOR_V_JUMBO-P53846-21FR009.json"
+SENSOR_FILE = "sensor-AANDERAA-AANDERAA_OPTODE_4330-3901.json"
+SENSOR_NAME = "SDN:R26::AANDERAA SDN:R27::AANDERAA_OPTODE_4330 3901"
+
+
+@pytest.fixture
+def float_data(files_dir):
+    """Float merged from just a platform file and a sensor file."""
+    data = load_json(files_dir / "valid_float.json")
+    data["files_merged"] = [PLATFORM_FILE, SENSOR_FILE]
+    return data
+
+
+@pytest.fixture
+def platform_data(float_data, files_dir):
+    """Platform file that agrees with the float."""
+    data = load_json(files_dir / "valid_platform.json")
+    data["PLATFORM"] = copy.deepcopy(float_data["PLATFORM"])
+    return data
+
+
+@pytest.fixture
+def sensor_data(files_dir):
+    """Sensor file that agrees with the float."""
+    return load_json(files_dir / "valid_sensor.json")
+
+
+def test_consistent_batch(float_data, platform_data, sensor_data):
+    """Test that a float along with the files it was merged from has no conflicts."""
+    index = ConsistencyIndex()
+    index.add("a/float.json", float_data)
+    index.add(f"b/{PLATFORM_FILE}", platform_data)
+    index.add(f"b/{SENSOR_FILE}", sensor_data)
+
+    assert index.conflicts() == {}
+
+
+def test_files_merged_conflicts(float_data, sensor_data, files_dir):
+    """Test that merged files that are missing or that disagree with the float are reported on the float."""
+    float_data["files_merged"].append("sensor-missing.json")
+    sensor_data["SENSORS"][0]["SENSOR_MODEL_FIRMWARE"] = "2.0"
+    index = ConsistencyIndex()
+    index.add("float.json", float_data)
+    index.add(PLATFORM_FILE, load_json(files_dir / "valid_platform.json"))
+    index.add(SENSOR_FILE, sensor_data)
+
+    assert index.conflicts() == {
+        "float.json": [
+            ValidationError(message=f"PLATFORM differs from that of {PLATFORM_FILE}", path="files_merged.0"),
+            ValidationError(message=f"Sensor {SENSOR_NAME} differs from that of {SENSOR_FILE}", path="files_merged.1"),
+            ValidationError(message="sensor-missing.json is not in the batch", path="files_merged.2"),
+        ]
+    }
+
+
+def test_duplicate_serial_nos(float_data, platform_data):
+    """Test that platforms, and floats, sharing a serial number are reported on each of them."""
+    index = ConsistencyIndex()
+    for file, data in [("f1.json", float_data), ("p1.json", platform_data), ("p2.json", platform_data)]:
+        index.add(file, data)
+    other_float = copy.deepcopy(float_data)
+    other_float["PLATFORM"]["FLOAT_SERIAL_NO"] = "OTHER"
+    index.add("f2.json", other_float)
+
+    conflicts = index.conflicts()
+
+    assert list(conflicts) == ["f1.json", "p1.json", "p2.json", "f2.json"]
+    assert conflicts["p1.json"] == [
+        ValidationError(
+            message="FLOAT_SERIAL_NO P53846-21FR009 is also used by platform p2.json", path="PLATFORM.FLOAT_SERIAL_NO"
+        )
+    ]
+    # The second float has its own serial number, but the same sensors as the first
+    assert conflicts["f2.json"][0] == ValidationError(
+        message=f"Sensor {SENSOR_NAME} is also in float f1.json", path="SENSORS.0.SENSOR_SERIAL_NO"
+    )
+    assert all("FLOAT_SERIAL_NO" not in x.message for x in conflicts["f1.json"])
+
+
+def test_extract_record_from_invalid_data():
+    """Test that the keys are taken from documents however invalid, ignoring what is missing or mistyped."""
+    assert extract_consistency_record({"hi": 1}).schema_type is None
+    record = extract_consistency_record({"float_info": {}, "PLATFORM": [], "SENSORS": [{"SENSOR_SERIAL_NO": 1}]})
+
+    assert record.schema_type == "float"
+    assert (record.float_serial_no, record.platform_digest, record.sensors, record.files_merged) == (None, None, (), ())
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_iter_validate_indexes_files(mocker, tmp_path, float_data, platform_data, jobs, no_nvs_terms):
+    """Test that files are indexed as they are validated, serially or by workers, including cached results."""
+    mocker.patch(
+        "argo_metadata_validator.validation.get_vocab_dates",
+        side_effect=lambda vocabs: dict.fromkeys(vocabs, "2025-01-01"),
+    )
+    files = [tmp_path / "float.json", tmp_path / PLATFORM_FILE, tmp_path / "other.json"]
+    for file, data in zip(files, [float_data, platform_data, platform_data], strict=True):
+        file.write_text(json.dumps(data))
+    validator = ArgoValidator(result_cache=tmp_path / "results.sqlite")
+    list(validator.iter_validate(files[:1]))
+
+    index = ConsistencyIndex()
+    results = list(validator.iter_validate(files, jobs=jobs, consistency=index))
+
+    assert [x[0] for x in results] == [str(x) for x in files]
+    conflicts = index.conflicts()
+    assert list(conflicts) == [str(x) for x in files]
+    assert conflicts[str(files[0])] == [
+        ValidationError(message=f"{SENSOR_FILE} is not in the batch", path="files_merged.1")
+    ]
+
+
+def test_main_cross_file(mocker, tmp_path, float_data):
+    """Test that the CLI writes the conflicts to the --cross-file output."""
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+
+    def iter_validate(files, jobs, fail_fast, consistency):
+        for file in files:
+            consistency.add(str(file), float_data)
+            yield str(file), []
+
+    mock_validator.return_value.iter_validate.side_effect = iter_validate
+    output_file = tmp_path / "conflicts.json"
+
+    result = CliRunner().invoke(main, ["a.json,b.json", "--cross-file", str(output_file)])
+
+    assert result.exit_code == 0
+    assert "Cross-file consistency: 2 of 2 files have conflicts" in result.output
+    conflicts = json.loads(output_file.read_text())
+    assert list(conflicts) == ["a.json", "b.json"]
+    assert conflicts["a.json"]["errors"][0]["message"] == "FLOAT_SERIAL_NO P53846-21FR009 is also used by float b.json"
@@ -0,0 +1,65 @@
+"""Tests for finding the files to validate."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from argo_metadata_validator.file_discovery import iter_input_files, iter_manifest
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Directory tree of metadata files, with same-named files in different directories."""
+    for path in ["a/float.json", "a/sensor.json", "b/float.json", "b/c/platform.json", "b/notes.txt"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("{}")
+    return tmp_path
+
+
+def test_iter_input_files_directory(archive):
+    """Test that directories are searched recursively, in sorted order, for JSON files."""
+    result = list(iter_input_files([str(archive)]))
+
+    assert result == [
+        archive / "a" / "float.json",
+        archive / "a" / "sensor.json",
+        archive / "b" / "c" / "platform.json",
+        archive / "b" / "float.json",
+    ]
+
+
+def test_iter_input_files_glob(archive):
+    """Test that globs are expanded, including ** for any depth."""
+    result = sorted(iter_input_files([f"{archive}/**/float.json"]))
+
+    assert result == [archive / "a" / "float.json", archive / "b" / "float.json"]
+
+
+def test_iter_input_files_plain_paths():
+    """Test that file paths are passed through as-is, even if missing, and blank inputs are skipped."""
+    result = list(iter_input_files(["x.json", " ", "y/z.json"]))
+
+    assert result == [Path("x.json"), Path("y/z.json")]
+
+
+def test_iter_input_files_lazy(archive):
+    """Test that inputs are only consumed as files are requested."""
+    consumed = []
+
+    def inputs():
+        for x in [str(archive / "a"), str(archive / "b")]:
+            consumed.append(x)
+            yield x
+
+    result = iter_input_files(inputs())
+    next(result)
+
+    assert consumed == [str(archive / "a")]
+
+
+def test_iter_manifest():
+    """Test reading a manifest, skipping blank and comment lines."""
+    manifest = io.StringIO("a.json\n\n# comment\n  dir/ \n")
+
+    assert list(iter_manifest(manifest)) == ["a.json", "dir/"]
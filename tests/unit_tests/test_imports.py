@@ -0,0 +1,48 @@
+"""Tests that heavy dependencies are only imported on the code paths that need them."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+
+# Dependencies that take a large part of the start-up time, only needed once files are validated
+HEAVY_MODULES = ["requests", "jsonschema", "referencing", "pydantic", "ijson", "orjson", "msgspec"]
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+
+
+def _imported_modules(module: str, candidates: list[str]) -> list[str]:
+    """Gets which of the candidate modules are imported along with a module, in a fresh interpreter."""
+    code = f"import json, sys, {module}; print(json.dumps([x for x in {candidates!r} if x in sys.modules]))"
+    return json.loads(_run_python("-c", code).stdout)
+
+
+@pytest.mark.parametrize(
+    "module,excluded",
+    [
+        [
+            "argo_metadata_validator.cli",
+            ["argo_metadata_validator.validation", "jsonschema", "referencing", "pydantic", "requests"],
+        ],
+        ["argo_metadata_validator.validation", ["requests", "argo_metadata_validator.models.float"]],
+        [
+            "argo_metadata_validator.server",
+            ["requests", "argo_metadata_validator.cli", "argo_metadata_validator.models.float"],
+        ],
+    ],
+)
+def test_heavy_dependencies_not_imported(module, excluded):
+    """Test that importing a module doesn't import dependencies it only needs on some code paths."""
+    assert _imported_modules(module, excluded) == []
+
+
+@pytest.mark.parametrize("module", ["argo_metadata_validator", "argo_metadata_validator.cli"])
+def test_package_imports_no_heavy_modules(module):
+    """Test that importing the package, or its CLI for --help, doesn't import any of the heavy dependencies."""
+    assert _imported_modules(module, HEAVY_MODULES) == []
@@ -0,0 +1,133 @@
+"""Tests for the per-stage timing hooks and the profiler."""
+
+import json
+from datetime import UTC, datetime
+
+import pytest
+from click.testing import CliRunner
+
+from argo_metadata_validator.cli import main
+from argo_metadata_validator.profiling import (
+    STAGE_LOAD,
+    STAGE_SCHEMA,
+    STAGE_VOCAB,
+    STAGE_VOCAB_FETCH,
+    ValidationHooks,
+    ValidationProfiler,
+)
+from argo_metadata_validator.validation import ArgoValidator
+from argo_metadata_validator.vocab_snapshot import VocabSnapshot, write_snapshot
+from argo_metadata_validator.vocab_utils import NVS_HOST, VocabTerms
+
+
+class RecordingHooks(ValidationHooks):
+    """Hooks that record every call."""
+
+    def __init__(self):
+        """Start with no calls."""
+        self.stages: list[tuple[str, str | None]] = []
+        self.files: dict[str, dict[str, float]] = {}
+
+    def on_stage(self, stage, seconds, file=None):
+        """Record a stage."""
+        self.stages.append((stage, file))
+
+    def on_file(self, file, seconds, stages):
+        """Record a file."""
+        assert seconds == pytest.approx(sum(stages.values()))
+        self.files[file] = stages
+
+
+@pytest.fixture
+def mock_vocabs(mocker):
+    """Mock the vocab terms, so no NVS requests are made."""
+    return mocker.patch(
+        "argo_metadata_validator.validation.get_terms_from_vocabs",
+        side_effect=lambda vocabs, fetch_mode: {
+            x: VocabTerms(active=[f"{NVS_HOST}/collection/{x}/current/CTD_PRES/"], deprecated=[]) for x in vocabs
+        },
+    )
+
+
+def test_no_timing_without_hooks(mocker, mock_vocabs, files_dir):
+    """Test that nothing is timed when there are no hooks."""
+    mock_perf_counter = mocker.patch("argo_metadata_validator.validation.perf_counter")
+
+    ArgoValidator().validate([str(files_dir / "valid_sensor.json"), str(files_dir / "invalid_sensor.json")])
+
+    mock_perf_counter.assert_not_called()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_hooks_receive_stage_timings(mock_vocabs, jobs, files_dir):
+    """Test that hooks get the time of each stage of each file, including those validated by worker processes."""
+    hooks = RecordingHooks()
+    valid_file = str(files_dir / "valid_sensor.json")
+    invalid_file = str(files_dir / "invalid_sensor.json")
+
+    ArgoValidator(hooks=[hooks]).validate([valid_file, invalid_file], jobs=jobs)
+
+    assert set(hooks.files[valid_file]) == {STAGE_LOAD, STAGE_SCHEMA, STAGE_VOCAB}
+    # Vocabs aren't checked if there are schema errors
+    assert set(hooks.files[invalid_file]) == {STAGE_LOAD, STAGE_SCHEMA}
+    assert (STAGE_SCHEMA, valid_file) in hooks.stages
+    assert (STAGE_VOCAB_FETCH, None) in hooks.stages
+
+
+def test_profiler_stats():
+    """Test that the profiler totals each stage and lists the slowest files."""
+    profiler = ValidationProfiler(top_n=2)
+    with profiler:
+        for file, seconds in [("a.json", 0.1), ("b.json", 0.3), ("c.json", 0.2)]:
+            profiler.on_stage(STAGE_SCHEMA, seconds, file)
+            profiler.on_file(file, seconds, {STAGE_SCHEMA: seconds})
+
+    stats = profiler.to_dict()
+
+    assert stats["n_files"] == 3
+    assert stats["wall_seconds"] > 0
+    assert stats["stages"][STAGE_SCHEMA]["count"] == 3
+    assert stats["stages"][STAGE_SCHEMA]["max_seconds"] == 0.3
+    assert stats["stages"][STAGE_SCHEMA]["mean_seconds"] == pytest.approx(0.2)
+    assert [x["file"] for x in stats["slowest_files"]] == ["b.json", "c.json"]
+    assert "cprofile" not in stats
+    assert "memory" not in stats
+
+
+def test_profiler_captures(mock_vocabs, files_dir):
+    """Test the optional cProfile and memory captures."""
+    profiler = ValidationProfiler(cprofile=True, trace_memory=True)
+    with profiler:
+        ArgoValidator(hooks=[profiler]).validate([str(files_dir / "valid_sensor.json")])
+
+    stats = profiler.to_dict()
+
+    assert any("_validate_json" in x["function"] for x in stats["cprofile"])
+    assert stats["memory"]["peak_bytes"] > 0
+    assert stats["memory"]["top_allocations"]
+
+
+def test_main_profile(tmp_path, files_dir):
+    """Test that the CLI writes the profile stats."""
+    profile_file = tmp_path / "profile.json"
+    snapshot_file = tmp_path / "nvs_vocabs.json"
+    write_snapshot(VocabSnapshot(fetched_at=datetime.now(UTC), vocabs={}), snapshot_file)
+
+    result = CliRunner().invoke(
+        main,
+        [str(files_dir / "valid_sensor.json"), "-q", "--offline", "--vocab-snapshot", str(snapshot_file)]
+        + ["--profile", str(profile_file)],
+    )
+
+    assert result.exit_code == 0
+    stats = json.loads(profile_file.read_text())
+    assert stats["n_files"] == 1
+    assert set(stats["stages"]) >= {STAGE_LOAD, STAGE_SCHEMA, STAGE_VOCAB}
+
+
+def test_main_profile_options_need_profile():
+    """Test that the capture options can't be used without --profile."""
+    result = CliRunner().invoke(main, ["a.json", "--profile-memory"])
+
+    assert result.exit_code == 2
+    assert "require --profile" in result.output
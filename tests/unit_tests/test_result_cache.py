@@ -0,0 +1,158 @@
+"""Tests for the persistent validation result cache."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from argo_metadata_validator.models.results import ValidationError
+from argo_metadata_validator.result_cache import ResultCache, hash_file
+from argo_metadata_validator.utils import load_json
+from argo_metadata_validator.validation import ArgoValidator
+from argo_metadata_validator.vocab_utils import ALL_ARGO_VOCABS, NVS_HOST, VocabTerms
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty result cache."""
+    cache = ResultCache(tmp_path / "results.sqlite")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def vocab_dates():
+    """Current vocab dates, which tests can change."""
+    return {"R25": "2025-01-01", "R26": "2025-01-01"}
+
+
+def test_result_cache_round_trip(cache, vocab_dates):
+    """Test that stored errors are returned, counting hits and misses."""
+    errors = [ValidationError(message="error 1", path="SENSORS.0")]
+
+    assert cache.get("abc", None, lambda: vocab_dates) is None
+    cache.put("abc", None, "0.4.0", ["R25"], errors, lambda: vocab_dates)
+
+    assert cache.get("abc", None, lambda: vocab_dates) == errors
+    assert cache.get("abc", 1, lambda: vocab_dates) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_result_cache_persists(tmp_path, vocab_dates):
+    """Test that results are kept between runs."""
+    cache = ResultCache(tmp_path / "results.sqlite")
+    cache.put("abc", None, "0.4.0", [], [], lambda: vocab_dates)
+    cache.close()
+
+    cache = ResultCache(tmp_path / "results.sqlite")
+    assert cache.get("abc", None, lambda: vocab_dates) == []
+    cache.close()
+
+
+def test_result_cache_vocab_change_invalidates_users_of_vocab(cache, vocab_dates):
+    """Test that a vocab changing only invalidates results that used it."""
+    cache.put("uses_r25", None, "0.4.0", ["R25"], [], lambda: vocab_dates)
+    cache.put("uses_r26", None, "0.4.0", ["R26"], [], lambda: vocab_dates)
+
+    vocab_dates["R25"] = "2025-02-01"
+
+    assert cache.get("uses_r25", None, lambda: vocab_dates) is None
+    assert cache.get("uses_r26", None, lambda: vocab_dates) == []
+
+
+def test_result_cache_schema_change_invalidates(mocker, cache, vocab_dates):
+    """Test that editing the schema invalidates results validated against it."""
+    cache.put("abc", None, "0.4.0", [], [], lambda: vocab_dates)
+
+    mocker.patch("argo_metadata_validator.result_cache.get_schema_fingerprint", return_value="changed")
+
+    assert cache.get("abc", None, lambda: vocab_dates) is None
+
+
+def test_result_cache_skips_undated_vocabs(cache, vocab_dates):
+    """Test that results aren't stored if a vocab they used has no date to invalidate them by."""
+    cache.put("abc", None, "0.4.0", ["R27"], [], lambda: vocab_dates)
+
+    assert cache.get("abc", None, lambda: vocab_dates) is None
+
+
+def test_result_cache_no_vocab_dates_for_schema_errors(cache):
+    """Test that vocab dates aren't needed for results that didn't use any vocabs."""
+
+    def get_vocab_dates():
+        raise AssertionError("Vocab dates shouldn't be needed")
+
+    cache.put("abc", None, "0.4.0", [], [ValidationError(message="error 1")], get_vocab_dates)
+
+    assert cache.get("abc", None, get_vocab_dates) == [ValidationError(message="error 1")]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_validate_uses_result_cache(mocker, tmp_path, jobs, files_dir):
+    """Test that unchanged files aren't validated again, and that changed files are."""
+    for file in sorted(files_dir.glob("*.json")):
+        shutil.copy(file, tmp_path)
+    files = [str(x) for x in sorted(tmp_path.glob("*.json"))]
+    mocker.patch(
+        "argo_metadata_validator.validation.get_terms_from_vocabs",
+        side_effect=lambda vocabs, fetch_mode: {
+            x: VocabTerms(active=[f"{NVS_HOST}/collection/{x}/current/CTD_PRES/"], deprecated=[]) for x in vocabs
+        },
+    )
+    mocker.patch(
+        "argo_metadata_validator.validation.get_vocab_dates",
+        side_effect=lambda vocabs: dict.fromkeys(vocabs, "2025-01-01"),
+    )
+    cache_path = tmp_path / "cache" / "results.sqlite"
+
+    with ResultCache(cache_path) as cache:
+        expected = ArgoValidator(result_cache=cache).validate(files, jobs=jobs)
+        assert (cache.hits, cache.misses) == (0, len(files))
+
+    # Re-formatting changes the content hash but not the errors
+    changed_file = tmp_path / "valid_sensor.json"
+    changed_file.write_text(json.dumps(json.loads(changed_file.read_text()), indent=4))
+    with ResultCache(cache_path) as cache:
+        results = dict(ArgoValidator(result_cache=cache).iter_validate(files, jobs=jobs))
+        assert (cache.hits, cache.misses) == (len(files) - 1, 1)
+
+    assert list(results.items()) == list(expected.items())
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_validate_commits_result_cache(mocker, tmp_path, jobs, files_dir, no_nvs_terms):
+    """Test that validate commits its results, so they can be read back before the cache is closed."""
+    files = sorted(files_dir.glob("*.json"))
+    vocab_dates = mocker.patch(
+        "argo_metadata_validator.validation.get_vocab_dates",
+        side_effect=lambda vocabs: dict.fromkeys(vocabs, "2025-01-01"),
+    )
+    cache = ResultCache(tmp_path / "results.sqlite")
+
+    expected = ArgoValidator(result_cache=cache).validate([str(x) for x in files], jobs=jobs)
+
+    with ResultCache(tmp_path / "results.sqlite") as other:
+        cached = [other.get(hash_file(x), None, lambda: vocab_dates(ALL_ARGO_VOCABS)) for x in files]
+    assert cached == list(expected.values())
+    cache.close()
+
+
+def test_validate_cache_hits_not_parsed(mocker, tmp_path, files_dir, no_nvs_terms):
+    """Test that files with a cached result are only hashed, not parsed, and can still be parsed into models."""
+    files = [str(x) for x in sorted(files_dir.glob("valid_*.json"))]
+    mocker.patch(
+        "argo_metadata_validator.validation.get_vocab_dates",
+        side_effect=lambda vocabs: dict.fromkeys(vocabs, "2025-01-01"),
+    )
+    mocker.patch.object(ArgoValidator, "_validate_vocabs", return_value=[])
+    mock_load_json = mocker.patch("argo_metadata_validator.validation.load_json", side_effect=load_json)
+
+    with ResultCache(tmp_path / "results.sqlite") as cache:
+        validator = ArgoValidator(result_cache=cache)
+        expected = validator.validate(files)
+        assert mock_load_json.call_count == len(files)
+
+        assert validator.validate(files) == expected
+        assert (cache.hits, mock_load_json.call_count) == (len(files), len(files))
+        assert validator.parse(files[0]) == ArgoValidator.parse_json_data(load_json(Path(files[0])))
@@ -0,0 +1,115 @@
+"""Tests for the compact result store."""
+
+import json
+import shutil
+
+import pytest
+from click.testing import CliRunner
+
+from argo_metadata_validator.cli import main, output_to_json_string
+from argo_metadata_validator.models.results import ValidationError
+from argo_metadata_validator.result_store import ErrorSummary, ResultStore, get_error_signature
+
+UNKNOWN_TERM = "Unknown NSV term: http://vocab.nerc.ac.uk/collection/R27/current/X/"
+
+
+@pytest.fixture
+def results() -> dict[str, list[ValidationError]]:
+    """Results of a few files sharing some errors."""
+    return {
+        "a.json": [
+            ValidationError(message=UNKNOWN_TERM, path="SENSORS.0.SENSOR_MODEL"),
+            ValidationError(message=UNKNOWN_TERM, path="SENSORS.12.SENSOR_MODEL"),
+            ValidationError(message="'x' is a required property", path=None),
+        ],
+        "b.json": [],
+        "c.json": [ValidationError(message=UNKNOWN_TERM, path="SENSORS.3.SENSOR_MODEL")],
+    }
+
+
+def test_result_store_view(results):
+    """Test that the store is a view of each file's errors, the same as the results it was given."""
+    store = ResultStore()
+    for file, errors in results.items():
+        store.add(file, errors)
+
+    assert store == results
+    assert list(store) == list(results)
+    assert output_to_json_string(store) == output_to_json_string(results)
+    assert (len(store), store.invalid_count, store.error_count) == (3, 2, 4)
+
+
+def test_result_store_repeated_file(results):
+    """Test that a file added again is only counted once."""
+    store = ResultStore()
+    list(store.tee([*results.items(), ("a.json", results["a.json"])]))
+
+    assert store == results
+    assert (len(store), store.invalid_count, store.error_count) == (3, 2, 4)
+    assert store.summarise()[0].count == 3
+
+
+def test_result_store_shares_records(results):
+    """Test that each distinct error is kept once, however many files have it."""
+    store = ResultStore()
+    for file in ["a.json", "c.json", "d.json"]:
+        store.add(file, results["a.json"])
+
+    assert len(store._records) == 3
+    assert store.error_count == 9
+
+
+def test_result_store_summarise(results):
+    """Test that the errors are aggregated by message and path without array indices, most frequent first."""
+    store = ResultStore(max_example_files=1)
+    list(store.tee(results.items()))
+
+    assert store.summarise() == [
+        ErrorSummary(UNKNOWN_TERM, "SENSORS.*.SENSOR_MODEL", count=3, file_count=2, example_files=("a.json",)),
+        ErrorSummary("'x' is a required property", None, count=1, file_count=1, example_files=("a.json",)),
+    ]
+    assert len(store.summarise(top=1)) == 1
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [("SENSORS.3.SENSOR_MODEL", "SENSORS.*.SENSOR_MODEL"), ("files_merged.10", "files_merged.*"), ("A1.2b", "A1.2b")],
+)
+def test_get_error_signature(path, expected):
+    """Test that only whole array indices are replaced in the path."""
+    assert get_error_signature("m", path) == ("m", expected)
+
+
+def test_main_summary_repeated_inputs(mocker, tmp_path, files_dir, no_nvs_terms):
+    """Test that a file given twice, by itself and within its directory, doesn't stop a run with --summary."""
+    mocker.patch("argo_metadata_validator.vocab_snapshot.get_vocab_dates", return_value={})
+    (tmp_path / "files").mkdir()
+    file = tmp_path / "files" / "valid_sensor.json"
+    shutil.copy(files_dir / "valid_sensor.json", file)
+    summary_file = tmp_path / "summary.json"
+
+    result = CliRunner().invoke(
+        main,
+        [str(file), str(file), str(tmp_path / "files"), "-q", "--summary", str(summary_file)]
+        + ["--vocab-snapshot", str(tmp_path / "snapshot.json")],
+    )
+
+    assert result.exit_code == 0
+    summary = json.loads(summary_file.read_text())
+    assert (summary["files"], summary["invalid_files"]) == (1, 1)
+
+
+def test_main_summary(mocker, tmp_path, results):
+    """Test that --summary writes the aggregated errors and lists the most frequent."""
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.return_value = iter(results.items())
+    summary_file = tmp_path / "summary.json"
+
+    result = CliRunner().invoke(main, ["a.json", "--summary", str(summary_file)])
+
+    assert result.exit_code == 0
+    assert "Summary: 2 of 3 files have errors, 4 errors with 2 distinct signatures" in result.output
+    assert f"3 x {UNKNOWN_TERM} at path SENSORS.*.SENSOR_MODEL in 2 files" in result.output
+    summary = json.loads(summary_file.read_text())
+    assert (summary["files"], summary["invalid_files"], summary["errors"]) == (3, 2, 4)
+    assert summary["signatures"][0]["example_files"] == ["a.json", "c.json"]
@@ -0,0 +1,156 @@
+"""Tests for the compiled schema validation engine, checking it conforms to jsonschema."""
+
+import random
+from typing import Any
+
+import jsonschema
+import pytest
+
+from argo_metadata_validator.constants import COMPILED_ENGINE
+from argo_metadata_validator.schema_compiler import CompiledValidator, UnsupportedSchemaError
+from argo_metadata_validator.schema_utils import get_compiled_validator, get_json_validator, get_schema_validator
+from argo_metadata_validator.utils import load_json
+from argo_metadata_validator.validation import ArgoValidator
+from benchmarks.generate import BENCHMARK_SCHEMA_TYPES, generate_document
+from tests.helpers import mutate_document
+
+MUTATIONS_PER_SCHEMA_TYPE = 150
+
+KEYWORD_CASES: list[tuple[dict[str, Any], list[Any]]] = [
+    ({"type": "integer"}, [1, 1.0, 1.5, True, "1", None]),
+    ({"type": ["string", "null"]}, ["a", None, 1, [], {}]),
+    ({"type": "number", "minimum": 0, "maximum": 10}, [-1, 0, 10, 10.5, True, "a"]),
+    ({"exclusiveMinimum": 0, "exclusiveMaximum": 10, "multipleOf": 0.5}, [0, 0.5, 0.7, 10, 3]),
+    ({"const": "a"}, ["a", "b", 1]),
+    ({"const": 1}, [1, 1.0, True, "1"]),
+    ({"const": False}, [False, 0, None]),
+    ({"const": {"a": [1, True]}}, [{"a": [1, True]}, {"a": [1, 1]}, {"a": [1.0, True]}]),
+    ({"enum": ["a", "b"]}, ["a", "c", 1, None]),
+    ({"enum": [1, "a", None, [1]]}, [1, 1.0, True, None, [1], [True]]),
+    ({"required": ["a", "b"]}, [{"a": 1}, {"a": 1, "b": 2}, {}, [], "a"]),
+    (
+        {"properties": {"a": {"type": "string"}, "b": {"minLength": 2}}, "additionalProperties": False},
+        [{"a": "x", "b": "xy"}, {"a": 1, "b": "x"}, {"c": 1, "d": 2, "a": "x"}, {"c": 1}, []],
+    ),
+    (
+        {"patternProperties": {"^x_": {"type": "integer"}}, "additionalProperties": False},
+        [{"x_a": 1}, {"x_a": "a", "b": 1}, {"b": 1, "c": 2}],
+    ),
+    ({"additionalProperties": {"type": "integer"}, "propertyNames": {"maxLength": 2}}, [{"a": 1}, {"abc": "x"}]),
+    ({"minProperties": 1, "maxProperties": 2}, [{}, {"a": 1}, {"a": 1, "b": 2, "c": 3}]),
+    (
+        {"items": {"type": "integer"}, "minItems": 2, "maxItems": 3, "uniqueItems": True},
+        [[1], [1, 2], [1, 1], [1, True], [1, 1.0], [1, "a", 2, 3], "a"],
+    ),
+    (
+        {"items": [{"type": "string"}, {"type": "integer"}], "additionalItems": False},
+        [["a", 1], [1, "a"], ["a", 1, 2], ["a", 1, 2, [3]]],
+    ),
+    ({"items": [{"type": "string"}], "additionalItems": {"type": "integer"}}, [["a", 1], ["a", 1, "b"]]),
+    ({"uniqueItems": True}, [[{"a": 1}, {"a": 1.0}], [[1], [True]], [{"a": [1]}, {"a": [2]}], [0, False]]),
+    (
+        {"uniqueItems": True},
+        [[1, "a", 1.0], [True, 1, False, 0], [True, "a", True], [{"a": 1}, {"a": True}], [None, [1, [2]], [1, [2.0]]]],
+    ),
+    ({"contains": {"type": "string"}}, [[1, "a"], [1, 2], []]),
+    ({"pattern": "^[A-Z]+$", "minLength": 1, "maxLength": 3}, ["AB", "ab", "", "ABCD", 1]),
+    ({"allOf": [{"type": "string"}, {"maxLength": 1}]}, ["a", "ab", 1]),
+    ({"anyOf": [{"type": "string"}, {"type": "integer"}]}, ["a", 1, 1.5]),
+    ({"oneOf": [{"type": "number"}, {"type": "integer"}, {"minimum": 0}]}, [1.5, -1.5, 1, "a"]),
+    ({"not": {"type": "string"}}, [1, "a"]),
+    (
+        {"if": {"properties": {"a": {"const": 1}}}, "then": {"required": ["b"]}, "else": {"required": ["c"]}},
+        [{"a": 1}, {"a": 1, "b": 1}, {"a": 2}, {"a": 2, "c": 1}],
+    ),
+    ({"if": {"type": "string"}, "then": {"minLength": 2}}, ["a", "ab", 1]),
+    ({"properties": {"a": False, "b": True}, "description": "ignored"}, [{"a": 1}, {"b": 1}]),
+    ({"properties": {"a": {"properties": {"b": False}}}, "items": False}, [{"a": {"b": 1}}, [1, 2]]),
+    ({"$ref": "#/definitions/a", "type": "integer", "definitions": {"a": {"type": "string"}}}, ["a", 1]),
+]
+
+
+def _errors(validator: Any, instance: Any) -> list[tuple[str, tuple]]:
+    """Message and path of each error, from either engine."""
+    return [(x.message, tuple(x.path)) for x in validator.iter_errors(instance)]
+
+
+def _resolve_local_ref(schema: dict[str, Any], ref: str) -> Any:
+    node = schema
+    for part in ref.removeprefix("#/").split("/"):
+        node = node[part]
+    return node
+
+
+@pytest.mark.parametrize("schema,instances", KEYWORD_CASES)
+def test_compiled_keywords_match_jsonschema(schema, instances):
+    """Test that each keyword finds the same errors as jsonschema, with the same messages and paths."""
+    schema = {"$schema": "http://json-schema.org/draft-07/schema#", **schema}
+    expected = jsonschema.Draft7Validator(schema)
+    compiled = CompiledValidator(schema, lambda ref: _resolve_local_ref(schema, ref))
+
+    for instance in instances:
+        assert _errors(compiled, instance) == _errors(expected, instance)
+        assert compiled.is_valid(instance) == expected.is_valid(instance)
+
+
+def test_compiled_recursive_schema():
+    """Test that a schema referring to itself is compiled."""
+    schema = {"properties": {"child": {"$ref": "#"}, "name": {"type": "string"}}}
+    compiled = CompiledValidator(schema, lambda ref: schema)
+
+    errors = list(compiled.iter_errors({"child": {"child": {"name": 1}}}))
+
+    assert [(x.message, x.path) for x in errors] == [("1 is not of type 'string'", ("child", "child", "name"))]
+
+
+def test_compiled_unsupported_schemas():
+    """Test that schemas the compiler doesn't support are rejected, rather than validated differently."""
+    with pytest.raises(UnsupportedSchemaError):
+        CompiledValidator({"dependencies": {"a": ["b"]}})
+    with pytest.raises(UnsupportedSchemaError):
+        CompiledValidator({"$schema": "https://json-schema.org/draft/2020-12/schema"})
+    with pytest.raises(UnsupportedSchemaError):
+        CompiledValidator({"$ref": "#/definitions/a"})
+
+
+def test_get_compiled_validator_falls_back(mocker):
+    """Test that the jsonschema validator is used for schemas the compiler doesn't support."""
+    mocker.patch("argo_metadata_validator.schema_utils.CompiledValidator", side_effect=UnsupportedSchemaError("no"))
+    get_compiled_validator.cache_clear()
+
+    try:
+        assert isinstance(get_compiled_validator("sensor"), jsonschema.Draft7Validator)
+    finally:
+        get_compiled_validator.cache_clear()
+
+
+def test_get_schema_validator_unknown_engine():
+    """Test that an unknown engine is rejected."""
+    with pytest.raises(ValueError, match="Unknown schema engine other"):
+        get_schema_validator("sensor", engine="other")
+
+
+@pytest.mark.parametrize("schema_type", BENCHMARK_SCHEMA_TYPES)
+def test_compiled_schemas_match_jsonschema(schema_type, files_dir):
+    """Test that the compiled Argo schemas find the same errors as jsonschema in fixtures and generated documents."""
+    expected = get_json_validator(schema_type)
+    compiled = get_compiled_validator(schema_type)
+    assert isinstance(compiled, CompiledValidator)
+    documents = [load_json(x) for x in sorted(files_dir.glob("*.json"))]
+    documents += [generate_document(x, size=2) for x in BENCHMARK_SCHEMA_TYPES]
+    rng = random.Random(schema_type)
+    documents += [mutate_document(rng.choice(documents), rng) for _ in range(MUTATIONS_PER_SCHEMA_TYPE)]
+
+    for document in documents:
+        assert _errors(compiled, document) == _errors(expected, document)
+
+
+def test_validator_compiled_engine(files_dir, no_nvs_terms):
+    """Test that the validator gives the same results with the compiled engine."""
+    files = [str(x) for x in sorted(files_dir.glob("*.json"))]
+
+    results = ArgoValidator(schema_engine=COMPILED_ENGINE).validate(files)
+
+    assert results == ArgoValidator().validate(files)
+    with pytest.raises(ValueError, match="Unknown schema engine"):
+        ArgoValidator(schema_engine="other")
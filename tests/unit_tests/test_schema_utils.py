@@ -1,18 +1,26 @@
 """Tests for the schema utils."""
 
+import json
+import shutil
 from pathlib import Path
 
 import pytest
 
+from argo_metadata_validator import schema_utils
 from argo_metadata_validator.schema_utils import (
     DEFAULT_SCHEMA_VERSION,
-    _get_registry,
     _get_schema_dir,
     _get_schema_file,
-    _retrieve_from_filesystem,
+    build_schema_bundle,
+    clear_schema_cache,
+    get_json_validator,
+    get_schema_bundle,
+    get_schema_fingerprint,
+    get_vocab_field_collections,
     infer_schema_from_data,
     infer_version_from_data,
 )
+from argo_metadata_validator.utils import load_json
 
 
 def test_get_schema_dir_default_version(mocker):
@@ -50,27 +58,127 @@ def test_get_schema_file_bad_type():
     assert str(exc_info.value).startswith("Unrecognised schema type not-sensor.")
 
 
-def test_retrieve_from_filesystem(mocker):
-    """Test that _retrieve_from_filesystem calls the right methods and returns correct content."""
-    mocker.patch("argo_metadata_validator.schema_utils._get_schema_dir", return_value=Path("schema_dir"))
-    mock_load = mocker.patch("argo_metadata_validator.schema_utils.load_json", return_value={})
-    mock_resource_from_contents = mocker.patch("argo_metadata_validator.schema_utils.Resource.from_contents")
-
-    result = _retrieve_from_filesystem("./argo.sensor.schema.json")
-
-    mock_load.assert_called_once_with(Path("schema_dir/argo.sensor.schema.json"))
-    mock_resource_from_contents.assert_called_once_with({})
-    assert result == mock_resource_from_contents.return_value
-
-
-def test_get_registry(mocker):
-    """Simple test that _get_registry calls the right method."""
-    mock_registry = mocker.patch("argo_metadata_validator.schema_utils.Registry")
-
-    result = _get_registry()
+@pytest.fixture
+def schema_versions(mocker, tmp_path):
+    """Copy of the default schema version as 0.5.0, in which sensor serial numbers have to be numeric."""
+    new_dir = tmp_path / "0.5.0"
+    shutil.copytree(_get_schema_dir(), new_dir)
+    sensor_file = new_dir / "argo.sensor.schema.json"
+    sensor_schema = json.loads(sensor_file.read_text())
+    sensor_schema["properties"]["SENSORS"]["items"]["properties"]["SENSOR_SERIAL_NO"]["pattern"] = "^[0-9]+$"
+    sensor_file.write_text(json.dumps(sensor_schema))
+    default_dir = _get_schema_dir()
+    mocker.patch.object(
+        schema_utils,
+        "_get_schema_dir",
+        side_effect=lambda v=DEFAULT_SCHEMA_VERSION: {"0.5.0": new_dir}.get(v, default_dir),
+    )
+    clear_schema_cache()
+    yield new_dir
+    clear_schema_cache()
+
+
+def test_get_json_validator_cached():
+    """Test that validators are reused per (schema_type, version) until the cache is cleared."""
+    clear_schema_cache()
+
+    validator = get_json_validator("sensor")
+
+    assert get_json_validator("sensor") is validator
+    assert get_json_validator("platform") is not validator
+    clear_schema_cache()
+    assert get_json_validator("sensor") is not validator
+
+
+def test_get_json_validator_single_read(mocker, files_dir):
+    """Test that once a version's bundle is built, validators are created from it in a single read."""
+    clear_schema_cache()
+    get_schema_bundle()
+    clear_schema_cache()
+    mock_load = mocker.spy(schema_utils, "load_json")
+    data = load_json(files_dir / "valid_float.json")
+
+    assert get_json_validator("float").is_valid(data)
+    assert get_json_validator("sensor").is_valid(load_json(files_dir / "valid_sensor.json"))
+    assert mock_load.call_count == 1
+    assert mock_load.call_args.args[0].name == f"{DEFAULT_SCHEMA_VERSION}.json"
+
+
+def test_build_schema_bundle():
+    """Test that references between schemas are inlined, and the fingerprint covers every schema file."""
+    bundle = build_schema_bundle()
+
+    float_schema = bundle["schemas"]["argo.float.schema.json"]
+    assert "$ref" not in json.dumps(float_schema)
+    sensor_schema = bundle["schemas"]["argo.sensor.schema.json"]
+    assert float_schema["properties"]["SENSORS"] == sensor_schema["properties"]["SENSORS"]
+    assert len(bundle["fingerprint"]) == 64
+    assert set(bundle["sources"]) == {x.name for x in _get_schema_dir().glob("*.json")}
+
+
+def test_build_schema_bundle_circular_reference(mocker, tmp_path):
+    """Test that circular references are left pointing at the bundle's copy of the schema, and still resolve."""
+    schema = {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "$id": "./argo.sensor.schema.json",
+        "definitions": {"node": {"type": "object", "properties": {"child": {"$ref": "#/definitions/node"}}}},
+        "$ref": "#/definitions/node",
+    }
+    (tmp_path / "argo.sensor.schema.json").write_text(json.dumps(schema))
+    mocker.patch.object(schema_utils, "_get_schema_dir", return_value=tmp_path)
+    clear_schema_cache()
+
+    bundle = build_schema_bundle("9.9.9")
+    validator = get_json_validator("sensor", "9.9.9")
+    clear_schema_cache()
+
+    node = bundle["schemas"]["argo.sensor.schema.json"]["definitions"]["node"]
+    assert node["properties"]["child"]["properties"]["child"] == {
+        "$ref": "urn:argo-schema:argo.sensor.schema.json#/definitions/node"
+    }
+    assert validator.is_valid({"child": {"child": {"child": {}}}})
+    assert not validator.is_valid({"child": {"child": {"child": 1}}})
+
+
+def test_mixed_schema_versions(schema_versions, files_dir):
+    """Test that each version's schemas refer to that version's sibling schemas, not the default version's."""
+    data = load_json(files_dir / "valid_float.json")
+    data["SENSORS"][0]["SENSOR_SERIAL_NO"] = "ABC"
+
+    assert get_json_validator("float").is_valid(data)
+    assert not get_json_validator("float", "0.5.0").is_valid(data)
+    assert get_schema_fingerprint("0.5.0") != get_schema_fingerprint()
+
+
+def test_schema_bundle_rebuilt_when_stale(schema_versions, schema_bundle_dir):
+    """Test that a saved bundle is reused until one of its schema files changes."""
+    bundle = get_schema_bundle("0.5.0")
+    assert (schema_bundle_dir / "0.5.0.json").exists()
+    clear_schema_cache()
+    assert get_schema_bundle("0.5.0") == bundle
+
+    sensor_file = schema_versions / "argo.sensor.schema.json"
+    sensor_file.write_text(sensor_file.read_text() + "\n")
+    clear_schema_cache()
+
+    assert get_schema_bundle("0.5.0")["fingerprint"] != bundle["fingerprint"]
+
+
+def test_get_schema_bundle_unknown_version():
+    """Test that a version with no schemas is an error."""
+    with pytest.raises(FileNotFoundError, match="No schemas found for version 9.9.9"):
+        get_schema_bundle("9.9.9")
+
+
+def test_get_vocab_field_collections():
+    """Test that vocab fields and their collections are picked up from the schema patterns."""
+    result = get_vocab_field_collections()
 
-    mock_registry.assert_called_once()
-    assert result == mock_registry.return_value
+    assert result["SENSOR"] == ["R25"]
+    assert result["SENSOR_MODEL"] == ["L22", "R27"]
+    assert result["POSITIONING_SYSTEM"] == ["R09"]
+    assert result["CONTROLLER_BOARD_TYPE_PRIMARY"] == ["R28"]
+    assert "SENSOR_SERIAL_NO" not in result
 
 
 @pytest.mark.parametrize(
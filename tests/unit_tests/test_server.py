@@ -0,0 +1,168 @@
+"""Tests for the validation server and its client."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import requests
+from click.testing import CliRunner
+
+from argo_metadata_validator.cli import main, output_to_json_string
+from argo_metadata_validator.server import NOT_AN_OBJECT_MESSAGE, ValidationServer, validate_with_server
+from argo_metadata_validator.utils import load_json
+from argo_metadata_validator.validation import ArgoValidator
+
+
+@pytest.fixture
+def validator(no_nvs_terms):
+    """Validator with every vocab empty, so that vocab terms are reported as unknown."""
+    return ArgoValidator()
+
+
+@pytest.fixture
+def server(validator):
+    """Validation server running in a background thread on a free port."""
+    with ValidationServer(validator, port=0, quiet=True) as server:
+        server.serve_in_thread()
+        yield server
+        server.shutdown()
+
+
+def test_server_validates_single_document(server, validator, files_dir):
+    """Test that a single document gets the same results as output_to_json_string."""
+    json_data = load_json(files_dir / "valid_sensor.json")
+
+    response = requests.post(f"{server.url}/validate", params={"name": "sensor.json"}, json=json_data, timeout=10)
+
+    assert response.status_code == 200
+    assert response.text == output_to_json_string({"sensor.json": validator.validate_json_data(json_data)})
+
+
+def test_server_validates_batch_concurrently(server, validator, files_dir):
+    """Test that concurrent batch requests each get their own results."""
+    files = sorted(files_dir.glob("*.json"))
+    documents = {x.name: load_json(x) for x in files}
+    expected = json.loads(output_to_json_string({k: validator.validate_json_data(v) for k, v in documents.items()}))
+
+    def post(n: int) -> dict:
+        batch = dict(list(documents.items())[n % len(documents) :])
+        return requests.post(f"{server.url}/validate", json={"documents": batch}, timeout=10).json()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(post, range(16)))
+
+    for n, response in enumerate(responses):
+        assert response == dict(list(expected.items())[n % len(documents) :])
+
+
+def test_server_rejects_invalid_requests(server):
+    """Test that invalid JSON, documents of unknown type and unknown paths are rejected."""
+    invalid_json = requests.post(f"{server.url}/validate", data=b'{"hi": ', timeout=10)
+    unknown_type = requests.post(f"{server.url}/validate", json={"hi": 1}, timeout=10)
+    unknown_path = requests.get(f"{server.url}/other", timeout=10)
+
+    assert invalid_json.status_code == 400
+    assert unknown_type.status_code == 400
+    assert unknown_type.json() == {"error": "Unable to determine matching schema type from data"}
+    assert unknown_path.status_code == 404
+    assert requests.get(f"{server.url}/health", timeout=10).json() == {"status": "ok"}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [5, {"float_info": "x"}, {"sensor_info": {"format_version": "99.9.9"}}, {"documents": {"a": {"float_info": []}}}],
+)
+def test_server_rejects_malformed_documents(server, body):
+    """Test that documents not structured like any schema type get an error response rather than none."""
+    response = requests.post(f"{server.url}/validate", json=body, timeout=10)
+
+    if isinstance(body, dict):
+        assert response.status_code == 400
+        assert "error" in response.json()
+    else:
+        assert response.status_code == 200
+        assert response.json()["document"]["errors"] == [{"message": NOT_AN_OBJECT_MESSAGE, "path": None}]
+
+
+def test_server_reports_documents_that_are_not_objects(server, files_dir):
+    """Test that each document of a batch that isn't a JSON object has an error, without failing the others."""
+    documents = {"a": 3, "b": load_json(files_dir / "valid_sensor.json"), "c": [1]}
+
+    response = requests.post(f"{server.url}/validate", json={"documents": documents}, timeout=10)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert list(results) == ["a", "b", "c"]
+    assert (
+        results["a"]
+        == results["c"]
+        == {"is_valid": False, "errors": [{"message": NOT_AN_OBJECT_MESSAGE, "path": None}]}
+    )
+
+
+@pytest.mark.parametrize("max_errors", ["0", "-1", "x"])
+def test_server_rejects_invalid_max_errors(server, max_errors):
+    """Test that limits that would hide errors are rejected, leaving the connection usable for the next request."""
+    with requests.Session() as session:
+        response = session.post(
+            f"{server.url}/validate", params={"max_errors": max_errors}, json={"sensor_info": {}}, timeout=10
+        )
+        assert response.status_code == 400
+        assert response.json() == {"error": f"max_errors must be a positive integer, not {max_errors!r}"}
+        assert session.get(f"{server.url}/health", timeout=10).json() == {"status": "ok"}
+
+
+def test_server_max_errors(server, validator, files_dir):
+    """Test that the errors reported are limited, without changing whether the document is valid."""
+    json_data = load_json(files_dir / "invalid_sensor.json")
+
+    response = requests.post(f"{server.url}/validate", params={"max_errors": 1}, json=json_data, timeout=10)
+
+    assert response.json()["document"] == {
+        "is_valid": False,
+        "errors": [x.model_dump() for x in validator.validate_json_data(json_data)[:1]],
+    }
+
+
+def test_server_internal_error(mocker, server, validator):
+    """Test that unexpected errors get a 500 response with a JSON body, rather than a dropped connection."""
+    mocker.patch.object(validator, "validate_json_data", side_effect=RuntimeError("boom"))
+
+    response = requests.post(f"{server.url}/validate", json={"sensor_info": {}}, timeout=10)
+
+    assert response.status_code == 500
+    assert response.json() == {"error": "Internal error: RuntimeError('boom')"}
+
+
+def test_validate_with_server(server, validator, files_dir):
+    """Test that the client gives the same results as validating locally, in batches."""
+    files = [str(x) for x in sorted(files_dir.glob("*.json"))]
+
+    results = list(validate_with_server(server.url, files, max_errors=1, batch_size=2))
+
+    assert results == [(x, validator.validate_json_data(load_json(Path(x)))[:1]) for x in files]
+
+
+def test_main_validates_with_server(server, tmp_path, files_dir):
+    """Test that the CLI can validate files with a server, stopping at the first invalid file with --fail-fast."""
+    output_file = tmp_path / "results.json"
+
+    result = CliRunner().invoke(
+        main,
+        [str(files_dir / "valid_sensor.json"), str(files_dir / "valid_float.json"), "--server", server.url]
+        + ["--fail-fast", "-q", "-f", str(output_file)],
+    )
+
+    assert result.exit_code == 1
+    results = json.loads(output_file.read_text())
+    assert list(results) == [str(files_dir / "valid_sensor.json")]
+    assert len(results[str(files_dir / "valid_sensor.json")]["errors"]) == 1
+
+
+def test_main_server_rejects_local_options(tmp_path):
+    """Test that options only used by local validation can't be combined with --server."""
+    result = CliRunner().invoke(main, ["a.json", "--server", "http://x", "--profile", str(tmp_path / "p.json")])
+
+    assert result.exit_code == 2
+    assert "can't be used with --server" in result.output
@@ -0,0 +1,132 @@
+"""Tests for validating files as they are parsed incrementally."""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from argo_metadata_validator.cli import main
+from argo_metadata_validator.constants import COMPILED_ENGINE, JSONSCHEMA_ENGINE
+from argo_metadata_validator.json_stream import NotStreamableError, iter_json_stream, read_json_skeleton
+from argo_metadata_validator.utils import load_json
+from argo_metadata_validator.validation import ArgoValidator
+from benchmarks.generate import BENCHMARK_SCHEMA_TYPES, generate_document
+from tests.helpers import mutate_document
+
+MUTATIONS = 60
+
+
+@pytest.fixture
+def ijson():
+    """Skip tests that stream if ijson isn't installed."""
+    return pytest.importorskip("ijson")
+
+
+def _documents(files_dir: Path) -> list:
+    """Fixtures, generated documents and invalid copies of them, along with some in an unusual order."""
+    documents = [load_json(x) for x in sorted(files_dir.glob("*.json"))]
+    documents += [generate_document(x, size=3) for x in BENCHMARK_SCHEMA_TYPES]
+    # The arrays come before what the schema type is inferred from
+    documents += [dict(reversed(x.items())) for x in documents[:4]]
+    rng = random.Random(0)
+    return documents + [mutate_document(rng.choice(documents), rng) for _ in range(MUTATIONS)]
+
+
+def test_iter_json_stream(ijson, tmp_path):
+    """Test that the streamed arrays are yielded one element at a time, and everything else whole."""
+    file = tmp_path / "test.json"
+    file.write_text('{"a": 1, "S": [{"x": [1, 2]}, 2.5], "b": {"c": []}, "T": {"d": 1}}')
+
+    assert list(iter_json_stream(file, ["S", "T"])) == [
+        ("a", None, 1),
+        ("S", None, []),
+        ("S", 0, {"x": [1, 2]}),
+        ("S", 1, 2.5),
+        ("b", None, {"c": []}),
+        ("T", None, {"d": 1}),
+    ]
+    assert read_json_skeleton(file, ["S"]) == {"a": 1, "S": [], "b": {"c": []}, "T": {"d": 1}}
+
+
+@pytest.mark.parametrize("content", ["[1]", '{"a": 1} 2', '{"a": NaN}', '{"a": 1', ""])
+def test_iter_json_stream_not_streamable(ijson, tmp_path, content):
+    """Test that documents that aren't JSON objects, or that ijson doesn't accept, are rejected."""
+    file = tmp_path / "test.json"
+    file.write_text(content)
+
+    with pytest.raises(NotStreamableError):
+        list(iter_json_stream(file, ["S"]))
+
+
+def test_streaming_unavailable(mocker):
+    """Test that asking to stream without ijson installed says how to install it."""
+    mocker.patch.dict(sys.modules, {"ijson": None})
+
+    with pytest.raises(ImportError, match=r"argo-metadata-validator\[stream\]"):
+        ArgoValidator(streaming=True)
+
+
+@pytest.mark.parametrize("engine", [JSONSCHEMA_ENGINE, COMPILED_ENGINE])
+@pytest.mark.parametrize("max_errors", [None, 2])
+def test_stream_matches_whole(ijson, no_nvs_terms, tmp_path, files_dir, engine, max_errors):
+    """Test that streaming finds the same errors, in the same order, as validating each document whole."""
+    validator = ArgoValidator(schema_engine=engine, max_errors=max_errors, streaming=True)
+    file = tmp_path / "test.json"
+
+    for document in [*_documents(files_dir), [1], {"float_info": {}, "SENSORS": [1, 1]}]:
+        file.write_text(json.dumps(document))
+        try:
+            expected = validator._validate_json_data_for_cache(load_json(file))
+        except Exception as e:
+            with pytest.raises(type(e)):
+                validator._validate_stream(file)
+        else:
+            assert validator._validate_stream(file) == expected
+
+
+def test_stream_only_keeps_one_element(ijson, no_nvs_terms, mocker, tmp_path):
+    """Test that the streamed arrays aren't kept, nor read again, when their elements are distinct."""
+    document = generate_document("float", size=3)
+    file = tmp_path / "test.json"
+    file.write_text(json.dumps(document))
+    mock_load = mocker.patch("argo_metadata_validator.validation.load_json")
+    mock_read_array = mocker.patch("argo_metadata_validator.validation.read_json_array")
+    validate_skeleton = mocker.spy(ArgoValidator, "_validate_json_data_for_cache")
+
+    result = ArgoValidator(streaming=True)._validate_stream(file)
+
+    assert result.errors
+    assert all(x.path.split(".")[0] in ["SENSORS", "PARAMETERS", "PLATFORM"] for x in result.errors)
+    mock_load.assert_not_called()
+    mock_read_array.assert_not_called()
+    validate_skeleton.assert_not_called()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_iter_validate_streaming(ijson, no_nvs_terms, mocker, jobs, files_dir):
+    """Test that iter_validate streams files, serially or in workers, with the same results as loading them."""
+    files = sorted(files_dir.glob("*.json"))
+    stream = mocker.spy(ArgoValidator, "_validate_stream")
+
+    results = list(ArgoValidator(streaming=True).iter_validate(files, jobs=jobs))
+
+    assert results == list(ArgoValidator().iter_validate(files))
+    if jobs == 1:
+        assert stream.call_count == len(files)
+
+
+def test_main_stream(mocker):
+    """Test that --stream is passed to the validator, and can't be used with --server."""
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.return_value = iter([])
+
+    result = CliRunner().invoke(main, ["a.json", "--stream"])
+
+    assert result.exit_code == 0
+    assert mock_validator.call_args.kwargs["streaming"] is True
+    result = CliRunner().invoke(main, ["a.json", "--stream", "--server", "http://localhost:1"])
+    assert result.exit_code != 0
+    assert "can't be used with --server" in result.output
@@ -1,13 +1,62 @@
 """Tests for utils."""
 
-from argo_metadata_validator.utils import load_json
+import pytest
 
+from argo_metadata_validator import utils
+from argo_metadata_validator.utils import JSON_BACKEND_ENV_VAR, get_json_backend, load_json
 
-def test_load_json(mocker):
-    """Simple test of load_json with a mock object."""
-    mock_path = mocker.Mock()
-    mock_path.read_text.return_value = '{"hi": 123}'
 
-    r = load_json(mock_path)
+@pytest.fixture(params=list(utils.JSON_BACKENDS))
+def json_backend(request, monkeypatch):
+    """Use each of the JSON backends in turn, skipping any that aren't installed."""
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    monkeypatch.setenv(JSON_BACKEND_ENV_VAR, request.param)
+    get_json_backend.cache_clear()
+    yield request.param
+    get_json_backend.cache_clear()
 
-    assert r == {"hi": 123}
+
+def test_load_json(tmp_path, json_backend):
+    """Simple test of load_json."""
+    file = tmp_path / "test.json"
+    file.write_bytes('{"hi": 123, "name": "café", "value": 1.5}'.encode())
+
+    r = load_json(file)
+
+    assert r == {"hi": 123, "name": "café", "value": 1.5}
+
+
+def test_load_json_memory_mapped(mocker, tmp_path, json_backend):
+    """Test that large files are loaded the same way when memory-mapped."""
+    mocker.patch.object(utils, "MMAP_THRESHOLD", 0)
+    file = tmp_path / "test.json"
+    file.write_text('{"hi": [1, 2, 3]}')
+
+    assert load_json(file) == {"hi": [1, 2, 3]}
+
+
+def test_load_json_non_standard(tmp_path, json_backend):
+    """Test that JSON the standard library accepts is accepted by every backend."""
+    file = tmp_path / "test.json"
+    file.write_bytes(b'\xef\xbb\xbf{"value": NaN, "big": 123456789012345678901234567890}')
+
+    r = load_json(file)
+
+    assert r["value"] != r["value"]
+    assert r["big"] == 123456789012345678901234567890
+
+
+def test_load_json_invalid(tmp_path, json_backend):
+    """Test that invalid JSON raises the standard library's error, whichever backend is used."""
+    file = tmp_path / "test.json"
+    file.write_text('{"hi": ')
+
+    with pytest.raises(ValueError):
+        load_json(file)
+
+
+def test_get_json_backend_unknown():
+    """Test that an unknown backend is rejected."""
+    with pytest.raises(ValueError, match="Unknown JSON backend simdjson"):
+        get_json_backend("simdjson")
@@ -2,7 +2,12 @@
 
 import pytest
 
+from argo_metadata_validator.models.float import Float
+from argo_metadata_validator.models.sensor import Sensor
+from argo_metadata_validator.schema_utils import get_json_validator
+from argo_metadata_validator.utils import load_json
 from argo_metadata_validator.validation import ArgoValidator
+from argo_metadata_validator.vocab_utils import NVS_HOST, LazyVocabTerms, TermStatus, VocabTerms
 
 
 def test_model_parsing_invalid_data(mocker):
@@ -27,3 +32,180 @@ def test_model_parsing_invalid_type(mocker):
         validator.parse("123.json")
 
     assert str(exc_info.value) == "Data does not match a defined Python model."
+
+
+def test_vocabs_loaded_on_demand(no_nvs_terms, files_dir):
+    """Test that only the vocabs referred to by a document are loaded, in a single fetch."""
+    validator = ArgoValidator()
+    no_nvs_terms.assert_not_called()
+
+    errors = validator._validate_vocabs(load_json(files_dir / "valid_sensor.json"))
+
+    no_nvs_terms.assert_called_once_with(["R03", "R25", "R26", "R27"], fetch_mode="batched")
+    assert errors[0].message == f"Unknown NSV term: {NVS_HOST}/collection/R25/current/OPTODE_DOXY/"
+
+
+def test_validate_parallel_matches_serial(mocker, files_dir):
+    """Test that validating across several processes gives the same results, in the same order, as in serial."""
+    files = [str(x) for x in sorted(files_dir.glob("*.json"))] * 2
+    mocker.patch(
+        "argo_metadata_validator.validation.get_terms_from_vocabs",
+        side_effect=lambda vocabs, fetch_mode: {
+            x: VocabTerms(active=[f"{NVS_HOST}/collection/{x}/current/CTD_PRES/"], deprecated=[]) for x in vocabs
+        },
+    )
+    validator = ArgoValidator()
+
+    serial = validator.validate(files)
+    parallel = validator.validate(files, jobs=2)
+
+    assert list(parallel.items()) == list(serial.items())
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_iter_validate(jobs, files_dir, no_nvs_terms):
+    """Test that iter_validate yields the same results as validate, consuming the input lazily."""
+    files = [str(x) for x in sorted(files_dir.glob("*.json"))]
+    validator = ArgoValidator()
+    expected = list(validator.validate(files).items())
+    validator.all_json_data = {}
+
+    results = validator.iter_validate(iter(files), jobs=jobs)
+
+    assert list(results) == expected
+    assert validator.all_json_data == {}
+
+
+def test_iter_validate_non_existent_file():
+    """Test that iter_validate raises when it reaches a missing file."""
+    results = ArgoValidator().iter_validate(["not_real.json"])
+
+    with pytest.raises(Exception) as exc_info:
+        next(results)
+
+    assert str(exc_info.value) == "Provided JSON file could not be found: not_real.json"
+
+
+def test_validate_same_filenames_in_different_directories(tmp_path, files_dir, no_nvs_terms):
+    """Test that results are keyed by full path, so same-named files don't overwrite each other."""
+    for sub_dir, fixture in [("a", "valid_sensor.json"), ("b", "invalid_sensor.json")]:
+        (tmp_path / sub_dir).mkdir()
+        (tmp_path / sub_dir / "sensor.json").write_text((files_dir / fixture).read_text())
+
+    errors = ArgoValidator().validate([str(tmp_path / "a" / "sensor.json"), str(tmp_path / "b" / "sensor.json")])
+
+    assert list(errors) == [str(tmp_path / "a" / "sensor.json"), str(tmp_path / "b" / "sensor.json")]
+    assert errors[str(tmp_path / "a" / "sensor.json")] != errors[str(tmp_path / "b" / "sensor.json")]
+
+
+def test_validate_single_pass_max_errors(mocker, files_dir):
+    """Test that schema errors are collected in one pass, stopping once max_errors is reached."""
+    file = files_dir / "invalid_sensor.json"
+    json_validator = mocker.Mock(wraps=get_json_validator("sensor"))
+    mocker.patch("argo_metadata_validator.validation.get_schema_validator", return_value=json_validator)
+
+    all_errors = ArgoValidator().validate([str(file)])[str(file)]
+    capped_errors = ArgoValidator(max_errors=1).validate([str(file)])[str(file)]
+
+    json_validator.is_valid.assert_not_called()
+    assert json_validator.iter_errors.call_count == 2
+    assert len(all_errors) == 2
+    assert capped_errors == all_errors[:1]
+
+
+def test_iter_validate_fail_fast(mocker, files_dir, no_nvs_terms):
+    """Test that iter_validate stops after the first file with errors when fail_fast is set."""
+    files = [files_dir / "valid_sensor.json", files_dir / "invalid_sensor.json", files_dir / "valid_platform.json"]
+    mocker.patch.object(LazyVocabTerms, "status", return_value=TermStatus.ACTIVE)
+
+    results = list(ArgoValidator(max_errors=1).iter_validate(files, fail_fast=True))
+
+    assert [x[0] for x in results] == [str(files[0]), str(files[1])]
+    assert len(results[1][1]) == 1
+
+
+def test_iter_parse(mocker, files_dir, no_nvs_terms):
+    """Test that each file is loaded and validated once, with errors instead of a model for invalid files."""
+    mocker.patch.object(LazyVocabTerms, "status", return_value=TermStatus.ACTIVE)
+    mock_load_json = mocker.patch("argo_metadata_validator.validation.load_json", side_effect=load_json)
+    mock_validate_json = mocker.spy(ArgoValidator, "_validate_json")
+
+    results = list(ArgoValidator().iter_parse([files_dir / "valid_sensor.json", files_dir / "invalid_sensor.json"]))
+
+    assert isinstance(results[0].model, Sensor)
+    assert results[0].errors == []
+    assert results[1].model is None
+    assert len(results[1].errors) == 2
+    assert mock_load_json.call_count == 2
+    assert mock_validate_json.call_count == 2
+
+
+def test_iter_parse_trusted(mocker, files_dir):
+    """Test that trusted files are parsed without validation."""
+    mock_validate = mocker.patch.object(ArgoValidator, "_validate_file")
+
+    results = list(ArgoValidator().iter_parse([files_dir / "valid_float.json"], True))
+
+    assert isinstance(results[0].model, Float)
+    mock_validate.assert_not_called()
+
+
+def test_parse_many_invalid(files_dir):
+    """Test that parse_many raises if any file isn't valid."""
+    file = files_dir / "invalid_sensor.json"
+
+    with pytest.raises(Exception, match="Data not valid in .*invalid_sensor.json"):
+        ArgoValidator().parse_many([file])
+
+
+def test_parse_json_data_unknown_type():
+    """Test that data that isn't any of the schema types can't be parsed."""
+    with pytest.raises(Exception, match="Data does not match a defined Python model."):
+        ArgoValidator.parse_json_data({"unknown_info": {}})
+
+
+def test_vocab_terms_resolved_once(mocker, files_dir, no_nvs_terms):
+    """Test that each distinct vocab term is resolved once however many files use it, with errors fanned out."""
+    mock_status = mocker.spy(LazyVocabTerms, "status")
+    json_data = load_json(files_dir / "valid_sensor.json")
+    validator = ArgoValidator()
+
+    first = validator._validate_vocabs(json_data)
+    n_resolved = mock_status.call_count
+    second = validator._validate_vocabs(json_data)
+
+    assert mock_status.call_count == n_resolved
+    assert second == first
+    assert n_resolved < len(first)
+    assert [x.path for x in first][:2] == ["SENSORS.0.SENSOR", "SENSORS.0.SENSOR_MAKER"]
+
+
+def test_vocab_term_verdicts_reset_with_new_terms(mocker, files_dir):
+    """Test that verdicts aren't reused once the validator's vocab terms are replaced."""
+    json_data = load_json(files_dir / "valid_sensor.json")
+    validator = ArgoValidator()
+    validator.argo_vocabs = LazyVocabTerms(lambda vocabs: {x: VocabTerms(active=[], deprecated=[]) for x in vocabs})
+    assert validator._validate_vocabs(json_data)
+
+    mocker.patch.object(LazyVocabTerms, "status", return_value=TermStatus.ACTIVE)
+    validator.argo_vocabs = LazyVocabTerms(lambda vocabs: {})
+
+    assert validator._validate_vocabs(json_data) == []
+
+
+def test_vocab_term_verdicts_replaced_concurrently(mocker, files_dir):
+    """Test that a call isn't affected by another thread replacing the shared verdicts part way through it."""
+    json_data = load_json(files_dir / "valid_sensor.json")
+    validator = ArgoValidator()
+    validator.argo_vocabs = LazyVocabTerms(lambda vocabs: {x: VocabTerms(active=[], deprecated=[]) for x in vocabs})
+    expected = validator._validate_vocabs(json_data)
+    status = LazyVocabTerms.status
+
+    def status_then_clear(self, *args):
+        validator._term_verdicts = {}
+        return status(self, *args)
+
+    validator.argo_vocabs = LazyVocabTerms(lambda vocabs: {x: VocabTerms(active=[], deprecated=[]) for x in vocabs})
+    mocker.patch.object(LazyVocabTerms, "status", status_then_clear)
+
+    assert validator._validate_vocabs(json_data) == expected
@@ -0,0 +1,137 @@
+"""Tests for the local NVS vocab snapshot, run against a local stand-in SPARQL endpoint."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from argo_metadata_validator.exceptions import VocabSnapshotNotFoundError
+from argo_metadata_validator.vocab_snapshot import (
+    SNAPSHOT_FORMAT_VERSION,
+    load_argo_vocab_terms,
+    read_snapshot,
+    refresh_snapshot,
+    write_snapshot,
+)
+from argo_metadata_validator.vocab_utils import ALL_ARGO_VOCABS, NVS_HOST, close_session
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """Location for the snapshot file."""
+    return tmp_path / "cache" / "nvs_vocabs.json"
+
+
+@pytest.fixture
+def nvs(local_nvs):
+    """Local NVS with a couple of terms."""
+    local_nvs.add_term("R25", "CTD_PRES")
+    local_nvs.add_term("R03", "NB_SAMPLE", deprecated=True)
+    return local_nvs
+
+
+def _count_fetched_vocabs(nvs) -> int:
+    return sum(x.count("/collection/") for x in nvs.queries if "skos:member" in x)
+
+
+def test_refresh_snapshot_creates_file(nvs, snapshot_path):
+    """Test that a new snapshot is written with every vocab."""
+    snapshot = refresh_snapshot(snapshot_path)
+
+    assert read_snapshot(snapshot_path) == snapshot
+    assert set(snapshot.vocabs) == set(ALL_ARGO_VOCABS)
+    assert snapshot.get_terms().active == [f"{NVS_HOST}/collection/R25/current/CTD_PRES/"]
+    assert snapshot.get_terms().deprecated == [f"{NVS_HOST}/collection/R03/current/NB_SAMPLE/"]
+
+
+def test_refresh_snapshot_only_fetches_changed_vocabs(nvs, snapshot_path):
+    """Test that the conditional refresh only re-fetches vocabs whose date changed on NVS."""
+    refresh_snapshot(snapshot_path)
+    nvs.queries.clear()
+    nvs.add_term("R25", "CTD_TEMP")
+    nvs.vocab_dates["R25"] = "2025-02-01 00:00:00.0"
+
+    snapshot = refresh_snapshot(snapshot_path)
+
+    # R25 changed, and vocabs with no date on NVS are always re-fetched
+    assert _count_fetched_vocabs(nvs) == len(ALL_ARGO_VOCABS) - 1
+    assert f"{NVS_HOST}/collection/R25/current/CTD_TEMP/" in snapshot.get_terms().active
+
+
+def test_refresh_snapshot_force(nvs, snapshot_path):
+    """Test that forcing a refresh re-fetches every vocab."""
+    refresh_snapshot(snapshot_path)
+    nvs.queries.clear()
+
+    refresh_snapshot(snapshot_path, force=True)
+
+    assert _count_fetched_vocabs(nvs) == len(ALL_ARGO_VOCABS)
+
+
+def test_load_terms_uses_fresh_snapshot(nvs, snapshot_path):
+    """Test that a snapshot within its TTL is used without contacting NVS."""
+    refresh_snapshot(snapshot_path)
+    nvs.queries.clear()
+
+    terms = load_argo_vocab_terms(snapshot_path, ttl=timedelta(hours=1))
+
+    assert nvs.queries == []
+    assert terms.active == [f"{NVS_HOST}/collection/R25/current/CTD_PRES/"]
+
+
+def test_load_terms_refreshes_expired_snapshot(nvs, snapshot_path):
+    """Test that a snapshot older than its TTL is refreshed."""
+    snapshot = refresh_snapshot(snapshot_path)
+    snapshot.fetched_at = datetime.now(UTC) - timedelta(hours=2)
+    write_snapshot(snapshot, snapshot_path)
+    nvs.queries.clear()
+
+    load_argo_vocab_terms(snapshot_path, ttl=timedelta(hours=1))
+
+    assert nvs.queries
+    assert not read_snapshot(snapshot_path).is_expired(timedelta(hours=1))
+
+
+def test_load_terms_stale_snapshot_when_nvs_unavailable(nvs, snapshot_path, monkeypatch):
+    """Test that an expired snapshot is still used, with a warning, if NVS can't be reached."""
+    snapshot = refresh_snapshot(snapshot_path)
+    snapshot.fetched_at = datetime.now(UTC) - timedelta(hours=2)
+    write_snapshot(snapshot, snapshot_path)
+    monkeypatch.setenv("ARGO_NVS_SPARQL_URL", "http://127.0.0.1:1/sparql/sparql")
+    monkeypatch.setattr("argo_metadata_validator.vocab_utils.NVS_BACKOFF_FACTOR", 0)
+    close_session()
+
+    with pytest.warns(UserWarning, match="Unable to refresh NVS vocab snapshot"):
+        terms = load_argo_vocab_terms(snapshot_path, ttl=timedelta(hours=1))
+
+    assert terms.active == [f"{NVS_HOST}/collection/R25/current/CTD_PRES/"]
+    close_session()
+
+
+def test_load_terms_offline(nvs, snapshot_path):
+    """Test that offline mode uses the snapshot regardless of its age."""
+    snapshot = refresh_snapshot(snapshot_path)
+    snapshot.fetched_at = datetime.now(UTC) - timedelta(days=365)
+    write_snapshot(snapshot, snapshot_path)
+    nvs.queries.clear()
+
+    terms = load_argo_vocab_terms(snapshot_path, offline=True)
+
+    assert nvs.queries == []
+    assert terms.active == [f"{NVS_HOST}/collection/R25/current/CTD_PRES/"]
+
+
+def test_load_terms_offline_no_snapshot(snapshot_path):
+    """Test the error raised when offline without a snapshot."""
+    with pytest.raises(VocabSnapshotNotFoundError) as exc_info:
+        load_argo_vocab_terms(snapshot_path, offline=True)
+
+    assert str(exc_info.value).startswith(f"No usable NVS vocab snapshot found at {snapshot_path}.")
+
+
+def test_read_snapshot_other_format_version(nvs, snapshot_path):
+    """Test that a snapshot written in a different format version is ignored."""
+    snapshot = refresh_snapshot(snapshot_path)
+    snapshot.format_version = SNAPSHOT_FORMAT_VERSION + 1
+    write_snapshot(snapshot, snapshot_path)
+
+    assert read_snapshot(snapshot_path) is None
@@ -5,11 +5,19 @@ import requests_mock
 
 from argo_metadata_validator.vocab_utils import (
     ALL_ARGO_VOCABS,
+    CONCURRENT_FETCH,
     NVS_HOST,
+    ContextExpander,
+    LazyVocabTerms,
+    TermStatus,
     VocabTerms,
     expand_vocab,
     get_all_terms_from_argo_vocabs,
     get_all_terms_from_vocab,
+    get_context_expander,
+    get_session,
+    get_terms_from_vocabs,
+    get_vocab_from_uri,
 )
 
 
@@ -18,6 +26,8 @@ from argo_metadata_validator.vocab_utils import (
     [
         ["SDN:R03::test", "http://vocab.nerc.ac.uk/collection/R03/current/test/"],
         ["SDN:R99::test", "SDN:R99::test"],
+        ["SDN:R03::", "http://vocab.nerc.ac.uk/collection/R03/current/"],
+        ["test SDN:R03::", "test SDN:R03::"],
     ],
 )
 def test_expand_vocab(input_val, expected_result):
@@ -33,6 +43,27 @@ def test_expand_vocab(input_val, expected_result):
     assert result == expected_result
 
 
+def test_expand_vocab_overlapping_prefixes():
+    """Test that the longest matching prefix is used, whatever the order of the context, and only once."""
+    context = {"SDN:": "http://example.com/sdn/", "SDN:R03::": "http://vocab.nerc.ac.uk/collection/R03/current/"}
+
+    for ordered in [context, dict(reversed(context.items()))]:
+        assert expand_vocab(ordered, "SDN:R03::SDN:") == "http://vocab.nerc.ac.uk/collection/R03/current/SDN:/"
+        assert expand_vocab(ordered, "SDN:other") == "http://example.com/sdn/other/"
+
+
+def test_get_context_expander_memoised():
+    """Test that an expander is compiled once for each distinct context."""
+    context = {"SDN:R03::": "http://vocab.nerc.ac.uk/collection/R03/current/"}
+
+    expander = get_context_expander(context)
+
+    assert isinstance(expander, ContextExpander)
+    assert get_context_expander(dict(context)) is expander
+    assert get_context_expander({**context, "SDN:R08::": "http://x/"}) is not expander
+    assert ContextExpander({})("SDN:R03::test") == "SDN:R03::test"
+
+
 def test_get_all_terms_from_argo_vocabs(mocker):
     """Test for get_all_terms_from_argo_vocabs calling mocked version of sub-method."""
     mock_get = mocker.patch(
@@ -40,7 +71,7 @@ def test_get_all_terms_from_argo_vocabs(mocker):
         return_value=VocabTerms(active=["1"], deprecated=[]),
     )
 
-    result = get_all_terms_from_argo_vocabs()
+    result = get_all_terms_from_argo_vocabs(fetch_mode=CONCURRENT_FETCH)
 
     # Check the per-vocab call happens the right number of times
     assert mock_get.call_count == len(ALL_ARGO_VOCABS)
@@ -66,3 +97,134 @@ def test_get_all_terms_from_vocab():
 
     assert result.active == ["http://vocab/hi"]
     assert result.deprecated == ["http://vocab/bye"]
+
+
+def test_get_terms_from_vocabs_batched():
+    """Test that the batched fetch makes a single query and splits the results by vocab."""
+    example_response = {
+        "results": {
+            "bindings": [
+                {
+                    "collection": {"value": f"{NVS_HOST}/collection/R01/current/"},
+                    "uri": {"value": "http://vocab/hi"},
+                    "isDeprecated": {"value": "false"},
+                },
+                {
+                    "collection": {"value": f"{NVS_HOST}/collection/R02/current/"},
+                    "uri": {"value": "http://vocab/bye"},
+                    "isDeprecated": {"value": "true"},
+                },
+            ]
+        }
+    }
+
+    with requests_mock.Mocker() as mock_req:
+        mock_req.post(f"{NVS_HOST}/sparql/sparql", json=example_response)
+        result = get_terms_from_vocabs(["R01", "R02", "R03"])
+
+    assert mock_req.call_count == 1
+    assert "VALUES ?collection" in mock_req.last_request.text
+    assert result == {
+        "R01": VocabTerms(active=["http://vocab/hi"], deprecated=[]),
+        "R02": VocabTerms(active=[], deprecated=["http://vocab/bye"]),
+        "R03": VocabTerms(active=[], deprecated=[]),
+    }
+
+
+def test_get_terms_from_vocabs_bad_mode():
+    """Test get_terms_from_vocabs with an unknown fetch mode."""
+    with pytest.raises(ValueError) as exc_info:
+        get_terms_from_vocabs(["R01"], fetch_mode="not-a-mode")
+
+    assert str(exc_info.value).startswith("Unrecognised fetch mode not-a-mode.")
+
+
+def test_get_session():
+    """Test that the shared session is reused and set up for retries and compressed responses."""
+    session = get_session()
+
+    assert get_session() is session
+    assert "gzip" in session.headers["Accept-Encoding"]
+    assert session.get_adapter(NVS_HOST).max_retries.total > 0
+
+
+@pytest.mark.parametrize(
+    "uri,expected_status",
+    [
+        ["http://vocab/R25/current/CTD_PRES/", TermStatus.ACTIVE],
+        ["http://vocab/R25/current/CTD_PRES_2/", TermStatus.ACTIVE],
+        ["http://vocab/R03/current/NB_SAMPLE/", TermStatus.DEPRECATED],
+        ["http://vocab/R03/current/NB_SAMPLE_12/", TermStatus.DEPRECATED],
+        ["http://vocab/R03/current/OTHER/", TermStatus.UNKNOWN],
+        ["http://vocab/R03/current/OTHER_2/", TermStatus.UNKNOWN],
+    ],
+)
+def test_vocab_terms_status(uri, expected_status):
+    """Test VocabTerms.status with active, deprecated, duplicated and unknown terms."""
+    terms = VocabTerms(
+        active=["http://vocab/R25/current/CTD_PRES/"], deprecated=["http://vocab/R03/current/NB_SAMPLE/"]
+    )
+
+    assert terms.status(uri) == expected_status
+
+
+def test_vocab_terms_status_after_lists_extended():
+    """Test that terms appended to the lists after a lookup are picked up by the index."""
+    terms = VocabTerms(active=[], deprecated=[])
+    assert terms.status("http://vocab/hi/") == TermStatus.UNKNOWN
+
+    terms.active += ["http://vocab/hi/"]
+
+    assert terms.status("http://vocab/hi/") == TermStatus.ACTIVE
+
+
+def test_vocab_terms_status_lookups_bounded(mocker):
+    """Test that the statuses of URIs looked up are forgotten once there are too many, still giving the same result."""
+    mocker.patch("argo_metadata_validator.vocab_utils.TERM_LOOKUP_CACHE_SIZE", 2)
+    terms = VocabTerms(active=["http://vocab/R25/current/CTD_PRES/"], deprecated=[])
+
+    statuses = [terms.status(f"http://vocab/R25/current/{x}/") for x in ["CTD_PRES", "A", "B", "CTD_PRES_2", "C"]]
+
+    assert statuses == [
+        TermStatus.ACTIVE,
+        TermStatus.UNKNOWN,
+        TermStatus.UNKNOWN,
+        TermStatus.ACTIVE,
+        TermStatus.UNKNOWN,
+    ]
+    assert len(terms._lookups) <= 2
+
+
+@pytest.mark.parametrize(
+    "uri,expected_vocab",
+    [
+        [f"{NVS_HOST}/collection/R25/current/CTD_PRES/", "R25"],
+        [f"{NVS_HOST}/collection/R25/current/", "R25"],
+        [f"{NVS_HOST}/collection/P01/current/X/", None],
+        ["SDN:R25::CTD_PRES", None],
+    ],
+)
+def test_get_vocab_from_uri(uri, expected_vocab):
+    """Test get_vocab_from_uri with ARGO, non-ARGO and unexpanded URIs."""
+    assert get_vocab_from_uri(uri) == expected_vocab
+
+
+def test_lazy_vocab_terms(mocker):
+    """Test that LazyVocabTerms only loads vocabs as they are needed, and only checks a term's own vocab."""
+    r25_term = f"{NVS_HOST}/collection/R25/current/CTD_PRES/"
+    loader = mocker.Mock(
+        side_effect=lambda vocabs: {
+            x: VocabTerms(active=[r25_term] if x == "R25" else [], deprecated=[]) for x in vocabs
+        }
+    )
+    terms = LazyVocabTerms(loader)
+
+    terms.load(["R26", "R25", "P01"])
+    assert terms.status(r25_term) == TermStatus.ACTIVE
+    assert terms.status(r25_term, ["R25"]) == TermStatus.ACTIVE
+    assert terms.status(r25_term, ["R26"]) == TermStatus.UNKNOWN
+    assert terms.status(f"{NVS_HOST}/collection/R03/current/PRES/") == TermStatus.UNKNOWN
+
+    # Vocabs requested together are loaded in one call, in ALL_ARGO_VOCABS order, ignoring non-ARGO vocabs
+    assert loader.call_args_list == [((["R25", "R26"],),), ((["R03"],),)]
+    assert terms.loaded_vocabs == ["R25", "R26", "R03"]
@@ -0,0 +1,139 @@
+"""Tests for the writers of validation results."""
+
+import io
+import json
+import xml.etree.ElementTree as ET
+import zlib
+
+import pytest
+from click.testing import CliRunner
+
+from argo_metadata_validator.cli import main, output_to_json_string
+from argo_metadata_validator.models.results import ValidationError
+from argo_metadata_validator.writers import (
+    RESULTS_WRITERS,
+    SARIF_RULE_ID,
+    JunitResultsWriter,
+    NdjsonResultsWriter,
+    ResultsWriter,
+    SarifResultsWriter,
+    open_results_file,
+)
+
+
+@pytest.fixture
+def sample_results() -> dict[str, list[ValidationError]]:
+    """Results of a valid file and an invalid one."""
+    return {
+        "valid.json": [],
+        "invalid & <odd>.json": [
+            ValidationError(message="'x' is a required property\x01", path=None),
+            ValidationError(message="Unknown NSV term: <X>", path="SENSORS.0.SENSOR_MODEL"),
+        ],
+    }
+
+
+def _write(writer_cls, results: dict[str, list[ValidationError]]) -> str:
+    stream = io.StringIO()
+    writer = writer_cls(stream)
+    for file, errors in results.items():
+        writer.write(file, errors)
+    writer.close()
+    return stream.getvalue()
+
+
+@pytest.mark.parametrize("results", [{}, {"valid.json": []}])
+@pytest.mark.parametrize("output_format", list(RESULTS_WRITERS))
+def test_writers_empty_or_valid(output_format, results):
+    """Test that every format is complete however few files and errors there are."""
+    output = _write(RESULTS_WRITERS[output_format], results)
+
+    if output_format == "junit":
+        assert len(ET.fromstring(output).findall("testsuite/testcase")) == len(results)
+    elif output_format == "ndjson":
+        assert len([json.loads(x) for x in output.splitlines()]) == len(results)
+    elif output_format == "sarif":
+        assert json.loads(output)["runs"][0]["results"] == []
+    else:
+        assert list(json.loads(output)) == list(results)
+
+
+def test_ndjson_writer(sample_results):
+    """Test that each file has a complete line of JSON."""
+    lines = _write(NdjsonResultsWriter, sample_results).splitlines()
+
+    assert [json.loads(x)["file"] for x in lines] == list(sample_results)
+    assert json.loads(lines[1])["errors"][1] == {"message": "Unknown NSV term: <X>", "path": "SENSORS.0.SENSOR_MODEL"}
+
+
+def test_junit_writer(sample_results):
+    """Test that each file is a test case, failed if the file has errors, escaping what XML doesn't allow."""
+    suite = ET.fromstring(_write(JunitResultsWriter, sample_results)).find("testsuite")
+    assert suite is not None
+    testcases = suite.findall("testcase")
+
+    assert [x.get("name") for x in testcases] == list(sample_results)
+    assert testcases[0].find("failure") is None
+    failure = testcases[1].find("failure")
+    assert failure is not None
+    assert failure.get("message") == "2 errors"
+    assert (
+        failure.text == "'x' is a required property� at path None\nUnknown NSV term: <X> at path SENSORS.0.SENSOR_MODEL"
+    )
+
+
+def test_sarif_writer(sample_results):
+    """Test that each error is a result, located by file and by path within the file."""
+    log = json.loads(_write(SarifResultsWriter, sample_results))
+
+    assert log["version"] == "2.1.0"
+    (run,) = log["runs"]
+    assert run["tool"]["driver"]["rules"] == [{"id": SARIF_RULE_ID}]
+    assert [x["message"]["text"] for x in run["results"]] == [x.message for x in sample_results["invalid & <odd>.json"]]
+    location = run["results"][1]["locations"][0]
+    assert location["physicalLocation"]["artifactLocation"]["uri"] == "invalid%20%26%20%3Codd%3E.json"
+    assert location["logicalLocations"] == [{"fullyQualifiedName": "SENSORS.0.SENSOR_MODEL"}]
+    assert "logicalLocations" not in run["results"][0]["locations"][0]
+
+
+def test_sarif_writer_archive_member_uri():
+    """Test that archive!member paths are percent-encoded into valid URI references."""
+    errors = [ValidationError(message="m")]
+    log = json.loads(_write(SarifResultsWriter, {"data dir/files.tar.gz!meta/a.json": errors}))
+
+    location = log["runs"][0]["results"][0]["locations"][0]
+    assert location["physicalLocation"]["artifactLocation"]["uri"] == "data%20dir/files.tar.gz%21meta/a.json"
+
+
+def test_results_writer_is_abstract():
+    """Test that writers have to say how to format each file's results."""
+    writer_cls: type = ResultsWriter
+    with pytest.raises(TypeError, match="abstract"):
+        writer_cls(io.StringIO())
+
+
+def test_compressed_output_readable_while_written(tmp_path, sample_results):
+    """Test that a compressed file can be decompressed up to the last file written, before it is closed."""
+    path = tmp_path / "results.ndjson.gz"
+    with open_results_file(str(path)) as stream:
+        writer = NdjsonResultsWriter(stream)
+        writer.write("valid.json", [])
+        partial = zlib.decompressobj(wbits=31).decompress(path.read_bytes())
+        assert [json.loads(x)["file"] for x in partial.decode().splitlines()] == ["valid.json"]
+        writer.close()
+
+
+@pytest.mark.parametrize("output_format", list(RESULTS_WRITERS))
+def test_main_output_format(mocker, tmp_path, sample_results, output_format):
+    """Test that the CLI writes each format, compressed if asked."""
+    mock_validator = mocker.patch("argo_metadata_validator.validation.ArgoValidator")
+    mock_validator.return_value.iter_validate.return_value = iter(sample_results.items())
+    output_file = tmp_path / "results.gz"
+
+    result = CliRunner().invoke(main, ["a.json", "-q", "-f", str(output_file), "--output-format", output_format])
+
+    assert result.exit_code == 0
+    expected = _write(RESULTS_WRITERS[output_format], sample_results)
+    assert zlib.decompress(output_file.read_bytes(), wbits=31).decode() == expected
+    if output_format == "json":
+        assert expected == output_to_json_string(sample_results)